@@ -17,6 +17,8 @@ import math
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
+from odds import odds_numericas
+
 class AnalisadorCavalosV2:
     def __init__(self):
         self.peso_forma_recente = 0.4  # Aumentado de 0.3
@@ -176,7 +178,7 @@ class AnalisadorCavalosV2:
         """
         Novo: Bônus para identificar dark horses
         """
-        odds = cavalo.get('odds', 5.0)
+        odds = odds_numericas(cavalo.get('odds', 5.0))
         
         # Só aplicar bônus para outsiders (odds > 6.0)
         if odds < self.odds_min_outsider:
@@ -209,7 +211,7 @@ class AnalisadorCavalosV2:
         """
         Classificação melhorada dos cavalos
         """
-        odds = cavalo.get('odds', 5.0)
+        odds = odds_numericas(cavalo.get('odds', 5.0))
         
         if score >= 8.5:
             if odds <= self.odds_max_favorito:
@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, send_file, request, render_template
+from flask import Flask, jsonify, send_file, request, render_template, Response, stream_with_context
 import pandas as pd
 import io
 import csv
@@ -7,12 +7,45 @@ import subprocess
 import sys
 from datetime import datetime
 import logging
-import requests
 from bs4 import BeautifulSoup
 import json
 from urllib.parse import urlparse, urljoin
 import time
 import random
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from operator import attrgetter
+from cache_disco import CacheDisco, canonicalizar_url
+from cache_resultados import CacheResultados
+from buscador_async import BuscadorAssincrono
+from parser_incremental import ParserIncremental
+from filtros_html import criar_soup, filtro_corredores
+from extracao_declarativa import EspecificacoesExtracao, analisar_html
+from casador_seletores import CasadorSeletores
+from classificador_nomes import ClassificadorNomes
+from dados_embutidos import extrair_dados_embutidos
+from corredor import Corredor
+from odds import odds_numericas
+from indice_pessoas import INDICE_PESSOAS, JOQUEI, TREINADOR
+from modelo_pontuacao import MODELO_PONTUACAO
+from grafo_fatores import GrafoFatores
+from estado_corridas import EstadoCorrida, EstadosCorrida
+from probabilidades import probabilidades_vitoria
+from colocacao import (
+    ErroTermos, MODELO_COLOCACAO, analisar_colocacao, opcoes_each_way, termos_padrao, valor_resposta,
+)
+from carteira_kelly import ErroCarteira, montar_carteira, opcoes_carteira, selecoes_resultado
+from exoticas import (
+    ErroExoticas, FORECAST, LIMITE_PADRAO as LIMITE_EXOTICAS, MARGEM_PADRAO as MARGEM_EXOTICAS,
+    exoticas_resultado,
+)
+from projecao_resposta import ErroProjecao, opcoes_projecao, projetar_resultado
+from tabelas_pontuacao import (
+    CATEGORIA_VALUE_BET, CATEGORIA_DARK_HORSE, CATEGORIA_FAVORITO_FORTE,
+    CATEGORIA_BOM_CANDIDATO, CATEGORIA_OPCAO_MODERADA, CATEGORIA_RISCO_ALTO,
+)
 
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG)
@@ -20,6 +53,75 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# Versão do algoritmo de pontuação (faz parte da chave do cache de resultados)
+ALGORITMO_VERSAO = 'V2.0_Melhorado_Southwell'
+
+# Campos da análise de cada cavalo, na ordem da resposta (nós do grafo de fatores)
+CAMPOS_ANALISE = (
+    'posicao', 'nome', 'joquei', 'odds', 'official_rating', 'peso', 'idade', 'forma', 'draw', 'treinador',
+    'score_odds', 'score_joquei', 'score_forma', 'score_peso', 'score_idade',
+    'rating_score', 'forma_score', 'peso_score', 'joquei_score', 'treinador_score', 'idade_pts',
+    'draw_score', 'odds_score', 'momentum_score', 'contexto_score', 'valor_aposta_score',
+    'pontuacao_final', 'tendencia_peso', 'tendencia_or', 'performance_joquei', 'consistencia',
+    'momentum', 'distancia_score', 'pista_score', 'probabilidade_vitoria', 'score_total',
+    'recomendacao', 'categoria_v2', 'is_value_bet', 'is_dark_horse', 'bonus_outsider',
+    'odds_numericas', 'algoritmo_versao', 'analise_hibrida',
+)
+# O que o ranking comparativo, os grupos e as estatísticas da corrida leem
+CAMPOS_RANKING = (
+    'posicao', 'nome', 'joquei', 'pontuacao_final', 'joquei_score', 'forma_score', 'consistencia', 'momentum',
+)
+# Nós do grafo de fatores que leem o preço do corredor (reanálise incremental)
+NOS_PRECO = ('odds', 'odds_numericas', 'odds_decimal', 'odds_probabilidade')
+
+# Extratores em Python para o que as especificações declarativas
+# (especificacoes_extracao.json) não cobrem, com o filtro (SoupStrainer) de
+# cada um: título, elementos de corredores e os ancestrais usados pelos
+# seletores. None = árvore inteira (Sporting Life busca a condição da pista em
+# texto solto; a extração genérica varre o texto todo).
+EXTRATORES_SITE = [
+    ('attheraces.com', '_extrair_at_the_races', filtro_corredores(
+        tags=('table',),
+        classes=((None, re.compile(r'runner|horse-name|selection-name|card-entry')),),
+        hrefs=('/horse/',)
+    )),
+    # Fallback por links quando a especificação não encontra containers
+    ('racingpost.com', '_extrair_racing_post', filtro_corredores(
+        classes=((None, re.compile(r'RC-runnerName|rp-horseHoverTrigger|rp-racecard-horse|rp-racecard-runner|horse-name|runner-name')),),
+        hrefs=('/horses/', '/horse/')
+    )),
+    ('sportinglife.com', '_extrair_sporting_life', None),
+]
+
+# Padrões melhorados para encontrar nomes de cavalos confirmados (extração genérica).
+# Compilados uma vez e casados numa única passada pela árvore.
+PADROES_CAVALOS_GENERICO = [
+    # Links específicos de cavalos
+    'a[href*="/horse/"]', 'a[href*="/horses/"]',
+    # Seletores CSS comuns
+    '.horse-name', '.runner-name', '.selection-name',
+    '.horse-name a', '.runner-name a', '.selection-name a',
+    # Atributos de dados
+    '[data-horse]', '[data-runner]', '[data-selection]',
+    '[data-horse-name]', '[data-runner-name]',
+    # Classes específicas
+    '.horse', '.runner', '.selection',
+    'a.horse-link', 'a.runner-link', 'a.selection-link',
+    # Classes com wildcards
+    '[class*="horse"]', '[class*="runner"]', '[class*="selection"]',
+    # Tabelas de corrida
+    'tr.horse-row', 'tr.runner-row', 'tr.selection-row',
+    '.racecard-runner', '.racecard-horse',
+    # Elementos de cartão de corrida
+    '.card-entry', '.race-entry', '.runner-entry',
+    # Nomes em tabelas
+    'td.horse-name', 'td.runner-name', 'th.horse-name',
+    # Spans com nomes
+    'span.horse-name', 'span.runner-name', 'span.selection-name'
+]
+CASADOR_GENERICO = CasadorSeletores(PADROES_CAVALOS_GENERICO)
+CLASSIFICADOR_NOMES = ClassificadorNomes()
+
 class ExtractorCavalos:
     """
     Classe para extrair dados de corrida de cavalos
@@ -33,8 +135,22 @@ class ExtractorCavalos:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Cache em disco das páginas (TTL por fonte + revalidação HTTP)
+        self.cache_disco = CacheDisco()
+        
+        # Busca assíncrona (aiohttp) para as views async e o parse/análise (CPU) no executor
+        self.buscador_async = BuscadorAssincrono(headers=self.headers, cache_disco=self.cache_disco)
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('ANALISE_WORKERS', 4)), thread_name_prefix='analise'
+        )
+        
+        # Especificações declarativas por site, compiladas em XPath uma única vez
+        self.especificacoes = EspecificacoesExtracao()
+        
+        # Fatores da análise de cada cavalo (avaliados sob demanda)
+        self.grafo_fatores = self._montar_grafo_fatores()
+        # Última análise de cada corrida, para reanalisar só o que mudou
+        self.estados_corrida = EstadosCorrida()
         
         # Carregar nomes reais de cavalos do arquivo JSON
         self.nomes_cavalos, self.joqueis_famosos = self._carregar_nomes_reais()
@@ -71,67 +187,131 @@ class ExtractorCavalos:
                     'Royal Champion', 'Lightning Bolt', 'Fire Storm', 'Wind Runner'], 
                    ['Billy Loughnane', 'Hollie Doyle', 'W Buick', 'Rossa Ryan'])
     
-    def extrair_dados_url(self, url):
+    async def extrair_dados_url_async(self, url):
         """
-        Extrai dados de corrida de cavalos de uma URL
+        Versão assíncrona: busca no loop do BuscadorAssincrono e faz o parse
+        (CPU) no executor, sem bloquear o event loop
         """
         try:
-            logger.info(f"Iniciando extração da URL: {url}")
-            
-            # Fazer requisição para a URL
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Detectar tipo de site e extrair dados
-            dados_reais = None
-            if 'attheraces.com' in url.lower():
-                dados_reais = self._extrair_at_the_races(soup, url)
-            elif 'racingpost.com' in url.lower():
-                dados_reais = self._extrair_racing_post(soup, url)
-            elif 'timeform.com' in url.lower():
-                dados_reais = self._extrair_timeform(soup, url)
-            elif 'sportinglife.com' in url.lower():
-                dados_reais = self._extrair_sporting_life(soup, url)
-            elif 'oddschecker.com' in url.lower():
-                dados_reais = self._extrair_oddschecker(soup, url)
-            elif 'betfair.com' in url.lower():
-                dados_reais = self._extrair_betfair(soup, url)
-            else:
-                # Extração genérica
-                dados_reais = self._extrair_generico(soup, url)
+            logger.info(f"Iniciando extração assíncrona da URL: {url}")
+            
+            loop = asyncio.get_running_loop()
+            
+            especificacao = self.especificacoes.para_url(url)
+            if especificacao:
+                parser = await self.buscador_async.buscar_em_partes(
+                    url, partial(ParserIncremental, especificacao.e_container, especificacao.extrair_corredor),
+                    self.executor
+                )
+                dados_reais = self._montar_dados_incrementais(parser, especificacao)
+                if dados_reais:
+                    return self._validar_dados_extraidos(dados_reais)
+                logger.info("Parse incremental sem corredores; usando parse completo")
+            
+            conteudo = await self.buscador_async.buscar(url)
+            
+            return await loop.run_in_executor(self.executor, self.extrair_dados_html, conteudo, url)
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro na extração: {str(e)}")
+            return {'erro': f'Erro ao acessar a URL: {str(e)}. Verifique se a URL é válida e acessível.'}
+    
+    def extrair_dados_html(self, conteudo, url):
+        """
+        Faz o parse do HTML já baixado e extrai os cavalos conforme o site
+        """
+        try:
+            especificacao = self.especificacoes.para_url(url)
+            
+            # Corredores em JSON embutido (__NEXT_DATA__, JSON-LD, data-*): sem montar árvore
+            dados_reais = self._extrair_dados_embutidos(conteudo, especificacao)
+            
+            # Sites com especificação declarativa: XPath compilado direto na árvore lxml
+            if not dados_reais and especificacao:
+                dados_reais = self._extrair_por_especificacao(especificacao, conteudo)
             
-            # NOVA LÓGICA: Só retornar dados reais, nunca fictícios
+            # Extratores em Python (só os elementos que o extrator usa)
             if not dados_reais:
-                logger.warning("Extração retornou None. Nenhum cavalo confirmado encontrado.")
-                return {'erro': 'Nenhum cavalo confirmado encontrado na URL fornecida. Verifique se a URL contém uma corrida ativa com cavalos inscritos.'}
-            elif 'erro' in dados_reais:
-                logger.warning(f"Erro na extração: {dados_reais.get('erro')}. Nenhum cavalo confirmado.")
-                return {'erro': f"Erro na extração: {dados_reais.get('erro')}. Verifique se a URL é válida e contém cavalos confirmados."}
-            elif len(dados_reais.get('cavalos', [])) < 1:
-                logger.warning("Nenhum cavalo encontrado. Não gerando dados fictícios.")
-                return {'erro': 'Nenhum cavalo confirmado encontrado nesta corrida. Verifique se a URL contém uma corrida ativa com participantes inscritos.'}
-            
-            # Verificar se temos nomes de cavalos válidos
-            cavalos_validos = [c for c in dados_reais.get('cavalos', []) if c.get('nome', '').strip()]
-            if len(cavalos_validos) < 1:
-                logger.warning("Nenhum cavalo válido extraído. Não gerando dados fictícios.")
-                return {'erro': 'Nenhum cavalo com nome válido encontrado. Verifique se a corrida tem participantes confirmados.'}
-            
-            # Usar dados reais mesmo se alguns campos estiverem vazios
-            dados_reais['cavalos'] = cavalos_validos
-            
-            logger.info(f"Extração bem-sucedida: {len(dados_reais.get('cavalos', []))} cavalos extraídos da URL real.")
-            
-            return dados_reais
+                url_lower = url.lower()
+                for dominio, nome_extrator, filtro in EXTRATORES_SITE:
+                    if dominio in url_lower:
+                        dados_reais = getattr(self, nome_extrator)(criar_soup(conteudo, filtro), url)
+                        break
+                else:
+                    if not especificacao:
+                        # Extração genérica
+                        dados_reais = self._extrair_generico(criar_soup(conteudo), url)
+            
+            return self._validar_dados_extraidos(dados_reais)
                 
         except Exception as e:
             logger.error(f"Erro na extração: {str(e)}")
             # Em caso de erro, retornar erro em vez de dados fictícios
             return {'erro': f'Erro ao acessar a URL: {str(e)}. Verifique se a URL é válida e acessível.'}
     
-
+    def _validar_dados_extraidos(self, dados_reais):
+        """
+        Valida o resultado de um extrator: só dados reais, nunca fictícios
+        """
+        # NOVA LÓGICA: Só retornar dados reais, nunca fictícios
+        if not dados_reais:
+            logger.warning("Extração retornou None. Nenhum cavalo confirmado encontrado.")
+            return {'erro': 'Nenhum cavalo confirmado encontrado na URL fornecida. Verifique se a URL contém uma corrida ativa com cavalos inscritos.'}
+        elif 'erro' in dados_reais:
+            logger.warning(f"Erro na extração: {dados_reais.get('erro')}. Nenhum cavalo confirmado.")
+            return {'erro': f"Erro na extração: {dados_reais.get('erro')}. Verifique se a URL é válida e contém cavalos confirmados."}
+        elif len(dados_reais.get('cavalos', [])) < 1:
+            logger.warning("Nenhum cavalo encontrado. Não gerando dados fictícios.")
+            return {'erro': 'Nenhum cavalo confirmado encontrado nesta corrida. Verifique se a URL contém uma corrida ativa com participantes inscritos.'}
+        
+        # Verificar se temos nomes de cavalos válidos
+        cavalos_validos = [c for c in dados_reais.get('cavalos', []) if c.get('nome', '').strip()]
+        if len(cavalos_validos) < 1:
+            logger.warning("Nenhum cavalo válido extraído. Não gerando dados fictícios.")
+            return {'erro': 'Nenhum cavalo com nome válido encontrado. Verifique se a corrida tem participantes confirmados.'}
+        
+        # Usar dados reais mesmo se alguns campos estiverem vazios; cada cavalo
+        # vira um Corredor aqui, com odds/peso/forma/OR já convertidos
+        dados_reais['cavalos'] = [Corredor.de(c) for c in cavalos_validos]
+        
+        logger.info(f"Extração bem-sucedida: {len(dados_reais.get('cavalos', []))} cavalos extraídos da URL real.")
+        
+        return dados_reais
+    
+    def _extrair_dados_embutidos(self, conteudo, especificacao=None):
+        """
+        Extrai os corredores dos dados estruturados embutidos na página (ou None)
+        """
+        try:
+            titulo_padrao = especificacao.titulo_padrao if especificacao else 'Corrida'
+            return extrair_dados_embutidos(conteudo, titulo_padrao)
+        except Exception as e:
+            logger.warning(f"Erro ao ler dados embutidos: {str(e)}")
+            return None
+    
+    def _extrair_por_especificacao(self, especificacao, conteudo):
+        """
+        Extrai os corredores com a especificação declarativa do site (ou None)
+        """
+        try:
+            return especificacao.extrair_documento(analisar_html(conteudo))
+        except Exception as e:
+            logger.warning(f"Erro ao extrair dados do {especificacao.nome_fonte}: {str(e)}")
+            return None
+    
+    def _montar_dados_incrementais(self, parser, especificacao):
+        """
+        Monta o dicionário da corrida a partir dos registros do parse incremental
+        """
+        dados = especificacao.montar_dados(parser.registros, parser.titulo)
+        if not dados:
+            return None
+        
+        logger.info(f"Parse incremental: {len(dados['cavalos'])} cavalos em {parser.bytes_lidos} bytes lidos")
+        return dados
+    
     def extrair_oddschecker(self, soup, url):
         """
         Extrai dados específicos do Oddschecker
@@ -205,51 +385,6 @@ class ExtractorCavalos:
                 }
                 dados['cavalos'].append(cavalo_data)
             
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"Oddschecker: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_oddschecker',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Oddschecker: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no Oddschecker: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-            
             return dados if dados['cavalos'] else None
             
         except Exception as e:
@@ -294,51 +429,6 @@ class ExtractorCavalos:
                 }
                 dados['cavalos'].append(cavalo_data)
             
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"Betfair: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_betfair',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Betfair: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no Betfair: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-            
             return dados if dados['cavalos'] else None
             
         except Exception as e:
@@ -507,240 +597,136 @@ class ExtractorCavalos:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def _analisar_cavalo_individual(self, cavalo, posicao):
-        """
-        Analisa um cavalo individual usando algoritmo híbrido (quantitativo + qualitativo)
-        Combina dados objetivos com fatores contextuais dos especialistas
-        """
-        nome = cavalo.get('nome', '')
-        joquei = cavalo.get('joquei', 'Desconhecido')
-        odds = cavalo.get('odds', 'N/A')
-        peso = cavalo.get('peso', 'N/A')
-        idade = cavalo.get('idade', 'N/A')
-        forma = cavalo.get('forma', '')
-        official_rating = cavalo.get('official_rating', 'N/A')
-        draw = cavalo.get('draw', posicao)  # Usar posição como draw se não disponível
-        treinador = cavalo.get('treinador', 'Desconhecido')
-        
-        # Obter estatísticas extraídas
-        joquei_stats = cavalo.get('joquei_stats')
-        treinador_stats = cavalo.get('treinador_stats')
-        
-        # Calcular scores individuais usando algoritmo híbrido MELHORADO V2.0
-        rating_score = self._calcular_score_rating(official_rating)
-        forma_score = self._calcular_score_forma_melhorado(forma)
-        peso_score = self._calcular_score_peso_melhorado(peso)
-        joquei_score = self._calcular_score_joquei_melhorado(joquei, joquei_stats)
-        treinador_score = self._calcular_score_treinador(treinador, treinador_stats)
-        idade_pts = self._idade_para_pontos(idade)
-        draw_score = self._calcular_score_draw(draw)
-        
-        # MELHORIAS V2.0: Análise de value bets e dark horses
-        odds_numericas = self._converter_odds_para_numero(odds)
-        is_value_bet = self._detectar_value_bet(rating_score + forma_score, odds_numericas)
-        is_dark_horse = self._detectar_dark_horse(joquei_score, forma_score, odds_numericas)
-        bonus_outsider = self._calcular_bonus_outsider(odds_numericas)
+    def _montar_grafo_fatores(self):
+        """
+        Fatores da análise de um cavalo como nós de um grafo de dependências
+        (fontes: o Corredor, a posição no campo e o modelo de pontuação)
+        """
+        grafo = GrafoFatores(fontes=('cavalo', 'posicao', 'modelo'))
+        no = grafo.no
+        
+        # Dados do corredor (texto original); sem draw, a análise usa a posição
+        for campo in ('nome', 'joquei', 'odds', 'official_rating', 'peso', 'idade', 'forma', 'treinador',
+                      'odds_numericas', 'odds_decimal', 'odds_probabilidade'):
+            no(campo, ('cavalo',), attrgetter(campo))
+        no('draw', ('cavalo', 'posicao'), lambda cavalo, posicao: posicao if cavalo.draw is None else cavalo.draw)
+        no('draw_num', ('cavalo', 'posicao'),
+           lambda cavalo, posicao: posicao if cavalo.draw is None else cavalo.draw_num)
+        no('algoritmo_versao', (), lambda: ALGORITMO_VERSAO)
+        
+        # Scores individuais do algoritmo híbrido MELHORADO V2.0
+        no('rating_bruto', ('cavalo',), lambda cavalo: self._calcular_score_rating(cavalo.or_valor))
+        no('forma_bruto', ('cavalo',), lambda cavalo: self._calcular_score_forma_melhorado(cavalo.forma_analisada))
+        no('peso_score', ('cavalo', 'modelo'), self._calcular_score_peso_melhorado)
+        no('joquei_bruto', ('cavalo', 'modelo'), self._calcular_score_joquei_melhorado)
+        no('treinador_score', ('cavalo', 'modelo'), self._calcular_score_treinador)
+        no('idade_pts', ('cavalo',), lambda cavalo: self._idade_para_pontos(cavalo.idade_anos))
+        no('draw_score', ('draw_num',), self._calcular_score_draw)
+        
+        # MELHORIAS V2.0: value bets e dark horses (com os scores antes do ajuste por dados faltando)
+        no('is_value_bet', ('rating_bruto', 'forma_bruto', 'odds_numericas', 'modelo'),
+           lambda rating, forma, odds, modelo: self._detectar_value_bet(rating + forma, odds, modelo))
+        no('is_dark_horse', ('joquei_bruto', 'forma_bruto', 'odds_numericas', 'modelo'), self._detectar_dark_horse)
+        no('bonus_outsider', ('odds_numericas', 'modelo'), self._calcular_bonus_outsider)
         
         # NOVOS FATORES QUALITATIVOS (inspirados na análise de especialistas)
-        momentum_score = self._calcular_momentum_qualitativo(cavalo)
-        contexto_score = self._analisar_contexto_corrida(cavalo)
-        valor_aposta_score = self._calcular_valor_aposta(odds, rating_score)
-        
-        # Se muitos dados estão faltando, usar score baseado na posição
-        dados_faltando = sum([1 for x in [official_rating, joquei, peso, idade, forma] if not x or x in ['N/A', 'Desconhecido', '']])
-        if dados_faltando >= 3:
-            # Score baseado na posição (primeiros cavalos tendem a ser melhores)
-            score_posicao = max(5, 10 - (posicao * 0.5))
-            rating_score = score_posicao
-            joquei_score = score_posicao
-            forma_score = score_posicao
-        
-        # ALGORITMO HÍBRIDO V2.0 - Pesos ajustados baseados na análise de Southwell
-        pesos = {
-            'Rating': 0.18,     # Reduzido (era 0.20)
-            'Forma': 0.25,      # AUMENTADO (era 0.16) - forma recente é crucial
-            'Peso': 0.06,       # Reduzido (era 0.08)
-            'Jockey': 0.18,     # AUMENTADO (era 0.12) - jóquei é muito importante
-            'Treinador': 0.08,  # Mantido
-            'Idade_pts': 0.05,  # Reduzido (era 0.07)
-            'Draw': 0.05,       # Reduzido (era 0.07)
-            'Odds': 0.03,       # Reduzido (era 0.04)
-            'Momentum': 0.06,   # Reduzido (era 0.08)
-            'Contexto': 0.04,   # Reduzido (era 0.06)
-            'Valor_Aposta': 0.02  # Reduzido (era 0.04)
-        }
-        
-        # Calcular score de odds
-        odds_score = self._calcular_score_odds(odds)
-        
-        # Cálculo da pontuação final usando fórmula híbrida
-        pontuacao_final = (
-            rating_score * pesos['Rating'] +
-            forma_score * pesos['Forma'] +
-            peso_score * pesos['Peso'] +
-            joquei_score * pesos['Jockey'] +
-            treinador_score * pesos['Treinador'] +
-            idade_pts * pesos['Idade_pts'] +
-            draw_score * pesos['Draw'] +
-            odds_score * pesos['Odds'] +
-            momentum_score * pesos['Momentum'] +
-            contexto_score * pesos['Contexto'] +
-            valor_aposta_score * pesos['Valor_Aposta']
-        )
-        
-        # APLICAR MELHORIAS V2.0: Bônus outsider e ajustes
-        pontuacao_final_v2 = pontuacao_final * bonus_outsider
-        
-        # Converter para escala 0-100 para compatibilidade
-        score_total = round(pontuacao_final_v2 * 10, 1)
-        
-        # CATEGORIZAÇÃO V2.0
-        categoria_v2 = self._classificar_cavalo_v2(score_total, odds_numericas, is_value_bet, is_dark_horse)
-        
-        # ANÁLISE AVANÇADA ADICIONAL - Manter funcionalidades existentes
-        tendencia_peso = self._analisar_tendencia_peso(forma, peso)
-        tendencia_or = self._analisar_tendencia_official_rating(forma, official_rating)
-        performance_joquei = self._analisar_performance_joquei(joquei, forma)
-        consistencia = self._calcular_consistencia(forma)
-        momentum = self._calcular_momentum(forma)
-        
-        # Análise de distância preferida
-        historico_detalhado = cavalo.get('historico_detalhado', [])
-        distancia_score = self._analisar_distancia_preferida(historico_detalhado)
-        
-        # Análise de condições da pista (se disponível)
-        condicoes_pista = cavalo.get('condicoes_pista', 'N/A')
-        pista_score = self._analisar_adaptacao_pista(forma, condicoes_pista)
-        
-        # Score de probabilidade de vitória
-        probabilidade_vitoria = self._calcular_probabilidade_vitoria_melhorada(
-            rating_score, joquei_score, forma_score, peso_score, idade_pts,
-            tendencia_peso, tendencia_or, performance_joquei, consistencia, momentum
-        )
-        
-        # Gerar recomendação baseada na nova pontuação e momentum
-        recomendacao = self._gerar_recomendacao_melhorada(pontuacao_final, score_total, momentum)
+        no('momentum_score', ('cavalo',), self._calcular_momentum_qualitativo)
+        no('contexto_score', ('cavalo',), self._analisar_contexto_corrida)
+        no('valor_aposta_score', ('odds_probabilidade', 'rating_bruto', 'modelo'), self._calcular_valor_aposta)
+        no('odds_score', ('odds_decimal', 'modelo'), self._calcular_score_odds)
+        
+        # Se muitos dados estão faltando, rating/jóquei/forma viram um score baseado na posição
+        # (primeiros cavalos tendem a ser melhores)
+        no('score_posicao', ('cavalo', 'posicao'),
+           lambda cavalo, posicao: max(5, 10 - (posicao * 0.5)) if cavalo.campos_faltando >= 3 else None)
+        for campo, bruto in (('rating_score', 'rating_bruto'), ('joquei_score', 'joquei_bruto'),
+                             ('forma_score', 'forma_bruto')):
+            no(campo, (bruto, 'score_posicao'), lambda valor, score_posicao: valor if score_posicao is None else score_posicao)
+        
+        # Pontuação final com os pesos do modelo (ordem de FATORES) e bônus outsider, escala 0-100
+        no('pontuacao', ('modelo', 'rating_score', 'forma_score', 'peso_score', 'joquei_score', 'treinador_score',
+                         'idade_pts', 'draw_score', 'odds_score', 'momentum_score', 'contexto_score',
+                         'valor_aposta_score'),
+           lambda modelo, *fatores: modelo.pontuacao(fatores))
+        no('pontuacao_final', ('pontuacao',), lambda pontuacao: round(pontuacao, 2))
+        no('score_total', ('pontuacao', 'bonus_outsider'), lambda pontuacao, bonus: round(pontuacao * bonus * 10, 1))
+        no('categoria_v2', ('score_total', 'odds_numericas', 'is_value_bet', 'is_dark_horse', 'modelo'),
+           self._classificar_cavalo_v2)
+        
+        # ANÁLISE AVANÇADA ADICIONAL (só calculada quando pedida)
+        no('tendencia_peso', ('cavalo',), self._analisar_tendencia_peso)
+        no('tendencia_or', ('cavalo',), self._analisar_tendencia_official_rating)
+        no('performance_joquei', ('cavalo',), self._analisar_performance_joquei)
+        no('consistencia', ('cavalo',), lambda cavalo: self._calcular_consistencia(cavalo.forma_analisada))
+        no('momentum', ('cavalo',), lambda cavalo: self._calcular_momentum(cavalo.forma_analisada))
+        no('distancia_score', ('cavalo',), lambda cavalo: self._analisar_distancia_preferida(cavalo.historico_detalhado))
+        no('pista_score', ('cavalo',),
+           lambda cavalo: self._analisar_adaptacao_pista(cavalo.forma_analisada, cavalo.condicoes_pista))
+        no('probabilidade_vitoria', ('rating_score', 'joquei_score', 'forma_score', 'peso_score', 'idade_pts',
+                                     'tendencia_peso', 'tendencia_or', 'performance_joquei', 'consistencia', 'momentum'),
+           self._calcular_probabilidade_vitoria_melhorada)
+        no('recomendacao', ('pontuacao', 'score_total', 'momentum'), self._gerar_recomendacao_melhorada)
+        
+        # Campos mantidos para compatibilidade (escala antiga e bloco analise_hibrida)
+        no('score_odds', (), lambda: 10)
+        for campo, fator in (('score_joquei', 'joquei_score'), ('score_forma', 'forma_score'),
+                             ('score_peso', 'peso_score'), ('score_idade', 'idade_pts')):
+            no(campo, (fator,), lambda valor: valor * 10)
+        no('analise_hibrida', ('rating_score', 'forma_score', 'peso_score', 'joquei_score', 'treinador_score',
+                               'momentum_score', 'contexto_score', 'valor_aposta_score'),
+           lambda rating, forma, peso, joquei, treinador, momentum, contexto, valor_aposta: {
+               'quantitativo': {
+                   'rating': rating,
+                   'forma': forma,
+                   'peso': peso,
+                   'joquei': joquei,
+                   'treinador': treinador
+               },
+               'qualitativo': {
+                   'momentum': momentum,
+                   'contexto': contexto,
+                   'valor_aposta': valor_aposta
+               },
+               'metodo': 'hibrido_especialistas_algoritmo'
+           })
+        return grafo
+    
+    def _analisar_cavalo_individual(self, cavalo, posicao, modelo=None, campos=CAMPOS_ANALISE):
+        """
+        Analisa um cavalo individual usando algoritmo híbrido (quantitativo + qualitativo)
+        Combina dados objetivos com fatores contextuais dos especialistas.
+        `cavalo` é um Corredor (dicionários de extração são convertidos);
+        `modelo` é o ModeloPontuacao da análise (padrão: o atual). Só os fatores
+        de que `campos` depende são calculados.
+        """
+        cavalo = Corredor.de(cavalo)
+        if modelo is None:
+            modelo = MODELO_PONTUACAO.atual
         
-        return {
-            'posicao': posicao,
-            'nome': nome,
-            'joquei': joquei,
-            'odds': odds,
-            'official_rating': official_rating,
-            'peso': peso,
-            'idade': idade,
-            'forma': forma,
-            'draw': draw,
-            'treinador': treinador,
-            'score_odds': 10,  # Mantido para compatibilidade
-            'score_joquei': joquei_score * 10,  # Convertido para escala antiga
-            'score_forma': forma_score * 10,
-            'score_peso': peso_score * 10,
-            'score_idade': idade_pts * 10,
-            'rating_score': rating_score,
-            'forma_score': forma_score,
-            'peso_score': peso_score,
-            'joquei_score': joquei_score,
-            'treinador_score': treinador_score,
-            'idade_pts': idade_pts,
-            'draw_score': draw_score,
-            'odds_score': odds_score,
-            'momentum_score': momentum_score,
-            'contexto_score': contexto_score,
-            'valor_aposta_score': valor_aposta_score,
-            'pontuacao_final': round(pontuacao_final, 2),
-            'tendencia_peso': tendencia_peso,
-            'tendencia_or': tendencia_or,
-            'performance_joquei': performance_joquei,
-            'consistencia': consistencia,
-            'momentum': momentum,
-            'distancia_score': distancia_score,
-            'pista_score': pista_score,
-            'probabilidade_vitoria': probabilidade_vitoria,
-            'score_total': score_total,
-            'recomendacao': recomendacao,
-            # MELHORIAS V2.0
-            'categoria_v2': categoria_v2,
-            'is_value_bet': is_value_bet,
-            'is_dark_horse': is_dark_horse,
-            'bonus_outsider': bonus_outsider,
-            'odds_numericas': odds_numericas,
-            'algoritmo_versao': 'V2.0_Melhorado_Southwell',
-            'analise_hibrida': {
-                'quantitativo': {
-                    'rating': rating_score,
-                    'forma': forma_score,
-                    'peso': peso_score,
-                    'joquei': joquei_score,
-                    'treinador': treinador_score
-                },
-                'qualitativo': {
-                    'momentum': momentum_score,
-                    'contexto': contexto_score,
-                    'valor_aposta': valor_aposta_score
-                },
-                'metodo': 'hibrido_especialistas_algoritmo'
-            }
-        }
+        return self.grafo_fatores.compilar(campos)(cavalo, posicao, modelo)
     
-    def _calcular_score_odds(self, odds_str):
+    def _calcular_score_odds(self, odds_decimal, modelo):
         """
         Calcula score baseado nas odds (reintegrado como fator de mercado)
         """
-        if not odds_str or odds_str == 'N/A':
+        if odds_decimal is None:
             return 5
         
-        try:
-            # Converter odds fracionais para decimal
-            if '/' in odds_str:
-                if odds_str.lower() == 'evens':
-                    odds_decimal = 2.0
-                else:
-                    parts = odds_str.split('/')
-                    if len(parts) == 2:
-                        numerator = float(parts[0])
-                        denominator = float(parts[1])
-                        odds_decimal = (numerator / denominator) + 1
-                    else:
-                        return 5
-            else:
-                # Odds já em formato decimal
-                odds_decimal = float(odds_str)
-            
-            # Score baseado nas odds (odds menores = score maior)
-            if odds_decimal <= 2.0:  # Favorito absoluto
-                return 10
-            elif odds_decimal <= 3.0:  # Forte favorito
-                return 8
-            elif odds_decimal <= 5.0:  # Favorito moderado
-                return 6
-            elif odds_decimal <= 10.0:  # Chance média
-                return 4
-            elif odds_decimal <= 20.0:  # Outsider
-                return 2
-            else:  # Longshot
-                return 1
-                
-        except:
-            return 5
+        # Odds menores = score maior (favorito absoluto ... longshot)
+        return modelo.escadas['odds'].pontuar(odds_decimal)
     
-    def _idade_para_pontos(self, idade):
+    def _idade_para_pontos(self, idade_anos):
         """
         Função para converter idade em pontos (novo algoritmo)
         """
-        if not idade or idade == 'N/A':
+        if idade_anos is None:
             return 5
         
-        try:
-            idade_num = int(str(idade).replace('yo', '').strip())
-            
-            if 4 <= idade_num <= 6:
-                return 10
-            elif idade_num == 3 or idade_num == 7:
-                return 6
-            else:
-                return 5
-        except:
+        if 4 <= idade_anos <= 6:
+            return 10
+        elif idade_anos == 3 or idade_anos == 7:
+            return 6
+        else:
             return 5
     
     def _calcular_momentum_qualitativo(self, cavalo):
@@ -748,55 +734,24 @@ class ExtractorCavalos:
         Calcula momentum qualitativo baseado em padrões de especialistas
         Considera: forma recente, mudanças de classe, retorno de lesão, etc.
         """
-        forma = cavalo.get('forma', '')
-        nome = cavalo.get('nome', '')
-        
         momentum_score = 5  # Score neutro
+        forma = cavalo.forma_analisada
         
         # Análise da forma recente (últimas 3 corridas)
-        if forma and len(forma) >= 3:
-            forma_recente = forma[:3]  # Últimas 3 corridas
-            
-            # Padrão de melhoria (ex: 543 -> melhorando)
-            if len(forma_recente) >= 3:
-                try:
-                    pos1, pos2, pos3 = int(forma_recente[0]), int(forma_recente[1]), int(forma_recente[2])
-                    if pos1 < pos2 < pos3:  # Melhorando consistentemente
-                        momentum_score += 3
-                    elif pos1 < pos2:  # Melhorou na última
-                        momentum_score += 2
-                    elif pos1 > pos2 > pos3:  # Piorando
-                        momentum_score -= 2
-                except:
-                    pass
+        if forma.corridas >= 3:
+            # Padrão de melhoria (ex: 543 -> melhorando +3, piorando -2)
+            momentum_score += forma.tendencia
             
             # Vitórias recentes
-            vitorias_recentes = forma_recente.count('1')
-            if vitorias_recentes >= 2:
+            if forma.vitorias_3 >= 2:
                 momentum_score += 3
-            elif vitorias_recentes == 1:
+            elif forma.vitorias_3 == 1:
                 momentum_score += 1
             
             # Placings consistentes (top 3)
-            placings = sum(1 for c in forma_recente if c in '123')
-            if placings >= 2:
+            if forma.vitorias_3 + forma.colocacoes_3 >= 2:
                 momentum_score += 1
         
-        # Indicadores textuais de momentum (baseado em análises de especialistas)
-        nome_lower = nome.lower()
-        
-        # Palavras-chave que indicam momentum positivo
-        indicadores_positivos = [
-            'backed up', 'return to form', 'regained', 'improving', 'progressive',
-            'on the upgrade', 'going the right way', 'bounced back'
-        ]
-        
-        # Palavras-chave que indicam momentum negativo
-        indicadores_negativos = [
-            'disappointing', 'below par', 'struggling', 'out of form',
-            'needs to bounce back', 'question marks'
-        ]
-        
         return max(0, min(10, momentum_score))
     
     def _analisar_contexto_corrida(self, cavalo):
@@ -806,293 +761,154 @@ class ExtractorCavalos:
         """
         contexto_score = 5  # Score neutro
         
-        # Análise de adaptação (baseada em padrões de especialistas)
-        official_rating = cavalo.get('official_rating', 'N/A')
-        peso = cavalo.get('peso', 'N/A')
-        
         # Cavalo com rating baixo mas peso favorável (oportunidade)
-        try:
-            if official_rating != 'N/A' and peso != 'N/A':
-                rating_num = int(str(official_rating))
-                if rating_num < 70:  # Rating baixo
-                    contexto_score += 1  # Pode ter chance em classe mais baixa
-        except:
-            pass
-        
-        # Análise de condições favoráveis
-        forma = cavalo.get('forma', '')
-        if forma:
-            # Se teve boas performances recentes, contexto favorável
-            if '1' in forma[:2] or '2' in forma[:2]:  # Top 2 nas últimas 2
-                contexto_score += 2
+        if (cavalo.official_rating != 'N/A' and cavalo.peso != 'N/A' and
+                cavalo.or_inteiro is not None and cavalo.or_inteiro < 70):  # Rating baixo
+            contexto_score += 1  # Pode ter chance em classe mais baixa
         
-        # Fatores de classe e competitividade
-        joquei = cavalo.get('joquei', '')
-        treinador = cavalo.get('treinador', '')
+        # Análise de condições favoráveis: boas performances recentes
+        if cavalo.forma_analisada.top2_ultimas_2:  # Top 2 nas últimas 2
+            contexto_score += 2
         
         # Jóquei/treinador de qualidade em corrida mais fácil
-        if joquei != 'N/A' and joquei != 'Desconhecido':
+        if cavalo.joquei_conhecido:
             contexto_score += 0.5
         
-        if treinador != 'N/A' and treinador != 'Desconhecido':
+        if cavalo.treinador_conhecido:
             contexto_score += 0.5
         
         return max(0, min(10, contexto_score))
     
-    def _calcular_valor_aposta(self, odds, rating_score):
+    def _calcular_valor_aposta(self, odds_probabilidade, rating_score, modelo):
         """
         Calcula valor de aposta comparando odds com rating real
         Identifica cavalos subestimados pelo mercado
         """
-        if not odds or odds == 'N/A':
+        if odds_probabilidade is None:  # Sem odds
             return 5
         
-        try:
-            # Converter odds para probabilidade implícita
-            if '/' in odds:
-                if odds.lower() == 'evens':
-                    prob_implicita = 50
-                else:
-                    parts = odds.split('/')
-                    if len(parts) == 2:
-                        num, den = float(parts[0]), float(parts[1])
-                        odds_decimal = (num / den) + 1
-                        prob_implicita = (1 / odds_decimal) * 100
-                    else:
-                        return 5
-            else:
-                odds_decimal = float(odds)
-                prob_implicita = (1 / odds_decimal) * 100
-            
-            # Comparar com rating score (nossa avaliação)
-            nossa_prob = (rating_score / 10) * 100  # Converter para percentual
-            
-            # Se nossa avaliação é maior que a do mercado = valor
-            diferenca = nossa_prob - prob_implicita
-            
-            if diferenca > 20:  # Muito subestimado
-                return 9
-            elif diferenca > 10:  # Subestimado
-                return 7
-            elif diferenca > 0:  # Ligeiramente subestimado
-                return 6
-            elif diferenca > -10:  # Fairly priced
-                return 5
-            elif diferenca > -20:  # Ligeiramente superestimado
-                return 4
-            else:  # Muito superestimado
-                return 2
-                
-        except:
-            return 5
+        # Probabilidade implícita nas odds, em percentual
+        prob_implicita = odds_probabilidade * 100
+        
+        # Comparar com rating score (nossa avaliação)
+        nossa_prob = (rating_score / 10) * 100  # Converter para percentual
+        
+        # Se nossa avaliação é maior que a do mercado = valor
+        # (muito subestimado ... muito superestimado)
+        diferenca = nossa_prob - prob_implicita
+        return modelo.escadas['valor_aposta'].pontuar(diferenca)
     
-    def _calcular_score_rating(self, rating):
+    def _calcular_score_rating(self, or_valor):
         """
         Calcula score baseado no Official Rating
         """
-        if not rating or rating == 'N/A':
+        if or_valor is None:
             return 5
         
-        try:
-            rating_num = float(rating)
-            # Normalizar rating (assumindo range 40-120) para escala 0-10
-            score = (rating_num / 50) * 10
-            return min(max(score, 0), 10)
-        except:
-            return 5
+        # Normalizar rating (assumindo range 40-120) para escala 0-10
+        score = (or_valor / 50) * 10
+        return min(max(score, 0), 10)
     
-    def _calcular_score_forma_melhorado(self, forma_str):
+    def _calcular_score_forma_melhorado(self, forma):
         """
         Calcula score de forma melhorado (escala 0-10)
+        Últimas performances: 1º=10, 2º=8, 3º=6, etc., com pesos decrescentes
         """
-        if not forma_str or len(forma_str) < 3:
-            return 5
-        
-        try:
-            # Últimas performances: 1º=10, 2º=8, 3º=6, etc.
-            score = 0
-            peso_posicao = [1.0, 0.7, 0.5, 0.3, 0.2]  # Pesos decrescentes
-            
-            for i, char in enumerate(forma_str[:5]):
-                if i < len(peso_posicao):
-                    if char == '1':
-                        score += 10 * peso_posicao[i]
-                    elif char == '2':
-                        score += 8 * peso_posicao[i]
-                    elif char == '3':
-                        score += 6 * peso_posicao[i]
-                    elif char == '4':
-                        score += 4 * peso_posicao[i]
-                    elif char == '5':
-                        score += 2 * peso_posicao[i]
-            
-            return min(score, 10)
-        except:
+        if forma.corridas < 3:
             return 5
+        return min(forma.pontos_forma, 10)
     
-    def _calcular_score_peso_melhorado(self, peso):
+    def _calcular_score_peso_melhorado(self, cavalo, modelo):
         """
         Calcula score de peso melhorado (escala 0-10)
         """
-        if not peso or peso == 'N/A':
-            return 5
+        total_pounds = cavalo.peso_lbs
+        if total_pounds is None:
+            peso = cavalo.peso
+            if not peso or peso == 'N/A' or not isinstance(peso, str) or '-' in peso:
+                return 5  # Sem peso ou stones-libras inválido
+            return 10  # Peso ideal por padrão (outros formatos)
         
-        try:
-            # Peso ideal = 10, ajustar conforme necessário
-            if '-' in peso:
-                stones, pounds = peso.split('-')
-                total_pounds = int(stones) * 14 + int(pounds)
-                
-                # Score baseado no peso (pesos menores = scores maiores)
-                if total_pounds <= 120:  # 8-8 ou menos
-                    return 10
-                elif total_pounds <= 126:  # 9-0 ou menos
-                    return 9
-                elif total_pounds <= 133:  # 9-7 ou menos
-                    return 10  # Peso ideal
-                elif total_pounds <= 140:  # 10-0 ou menos
-                    return 9
-                else:
-                    return 8
-            else:
-                return 10  # Peso ideal por padrão
-        except:
-            return 5
+        # Score baseado no peso (8-8, 9-0, 9-7 ideal, 10-0...)
+        return modelo.escadas['peso_lbs'].pontuar(total_pounds)
     
-    def _calcular_score_joquei_melhorado(self, joquei_str, joquei_stats=None):
+    def _calcular_score_joquei_melhorado(self, cavalo, modelo):
         """
         Calcula score de jóquei melhorado usando estatísticas reais (escala 0-10)
         """
+        joquei_str = cavalo.joquei
         if not joquei_str:
             return 5
         
-        joquei_lower = joquei_str.lower()
         base_score = 5
         
         # Jóqueis famosos (base alta)
-        joqueis_elite = [
-            'frankie dettori', 'f dettori', 'dettori',
-            'ryan moore', 'r moore', 'moore',
-            'william buick', 'w buick', 'buick',
-            'oisin murphy', 'o murphy', 'murphy',
-            'tom marquand', 't marquand', 'marquand',
-            'hollie doyle', 'h doyle', 'doyle'
-        ]
-        
-        is_elite = any(joquei_elite in joquei_lower for joquei_elite in joqueis_elite)
+        is_elite = INDICE_PESSOAS.elite(joquei_str, JOQUEI)
         if is_elite:
             base_score = 8
         elif len(joquei_str) > 5 and any(c.isupper() for c in joquei_str):
             base_score = 6
         
-        # Usar estatísticas reais se disponíveis
+        # Usar estatísticas reais se disponíveis (da página ou do índice de pessoas)
+        joquei_stats = INDICE_PESSOAS.estatisticas(cavalo.joquei_stats, joquei_str, JOQUEI)
         if joquei_stats and isinstance(joquei_stats, dict):
             win_percentage = joquei_stats.get('win_percentage', 0)
             rides = joquei_stats.get('rides', 0)
             
-            # Ajustar score baseado na porcentagem de vitórias
-            if win_percentage >= 25:  # Excelente
-                stats_bonus = 2
-            elif win_percentage >= 20:  # Muito bom
-                stats_bonus = 1.5
-            elif win_percentage >= 15:  # Bom
-                stats_bonus = 1
-            elif win_percentage >= 10:  # Médio
-                stats_bonus = 0.5
-            elif win_percentage >= 5:  # Baixo
-                stats_bonus = 0
-            else:  # Muito baixo
-                stats_bonus = -1
-            
-            # Bonus por experiência (número de corridas)
-            if rides >= 500:
-                experience_bonus = 0.5
-            elif rides >= 200:
-                experience_bonus = 0.3
-            elif rides >= 50:
-                experience_bonus = 0.1
-            else:
-                experience_bonus = 0
+            # Ajustar score pela porcentagem de vitórias e pela experiência (número de corridas)
+            stats_bonus = modelo.escadas['joquei_vitorias'].pontuar(win_percentage)
+            experience_bonus = modelo.escadas['joquei_experiencia'].pontuar(rides)
             
             final_score = base_score + stats_bonus + experience_bonus
             return min(10, max(0, final_score))
         
         return base_score
     
-    def _calcular_score_treinador(self, treinador_str, treinador_stats=None):
+    def _calcular_score_treinador(self, cavalo, modelo):
         """
         Calcula score baseado no treinador usando estatísticas reais (escala 0-10)
         """
+        treinador_str = cavalo.treinador
         if not treinador_str or treinador_str == 'Desconhecido':
             return 5
         
-        treinador_lower = treinador_str.lower()
         base_score = 5
         
         # Treinadores famosos (base alta)
-        treinadores_elite = [
-            'aidan o\'brien', 'a o\'brien', 'o\'brien',
-            'john gosden', 'j gosden', 'gosden',
-            'charlie appleby', 'c appleby', 'appleby',
-            'william haggas', 'w haggas', 'haggas',
-            'sir michael stoute', 'm stoute', 'stoute'
-        ]
-        
-        is_elite = any(treinador_elite in treinador_lower for treinador_elite in treinadores_elite)
+        is_elite = INDICE_PESSOAS.elite(treinador_str, TREINADOR)
         if is_elite:
             base_score = 7
         elif len(treinador_str) > 5:
             base_score = 6
         
-        # Usar estatísticas reais se disponíveis
+        # Usar estatísticas reais se disponíveis (da página ou do índice de pessoas)
+        treinador_stats = INDICE_PESSOAS.estatisticas(cavalo.treinador_stats, treinador_str, TREINADOR)
         if treinador_stats and isinstance(treinador_stats, dict):
             win_percentage = treinador_stats.get('win_percentage', 0)
             runs = treinador_stats.get('runs', 0)
             
-            # Ajustar score baseado na porcentagem de vitórias
-            if win_percentage >= 30:  # Excelente
-                stats_bonus = 2
-            elif win_percentage >= 25:  # Muito bom
-                stats_bonus = 1.5
-            elif win_percentage >= 20:  # Bom
-                stats_bonus = 1
-            elif win_percentage >= 15:  # Médio
-                stats_bonus = 0.5
-            elif win_percentage >= 10:  # Baixo
-                stats_bonus = 0
-            else:  # Muito baixo
-                stats_bonus = -1
-            
-            # Bonus por experiência (número de corridas)
-            if runs >= 1000:
-                experience_bonus = 0.5
-            elif runs >= 500:
-                experience_bonus = 0.3
-            elif runs >= 100:
-                experience_bonus = 0.1
-            else:
-                experience_bonus = 0
+            # Ajustar score pela porcentagem de vitórias e pela experiência (número de corridas)
+            stats_bonus = modelo.escadas['treinador_vitorias'].pontuar(win_percentage)
+            experience_bonus = modelo.escadas['treinador_experiencia'].pontuar(runs)
             
             final_score = base_score + stats_bonus + experience_bonus
             return min(10, max(0, final_score))
         
         return base_score
     
-    def _calcular_score_draw(self, draw):
+    def _calcular_score_draw(self, draw_num):
         """
         Calcula score baseado na posição de largada (escala 0-10)
         """
-        try:
-            draw_num = int(draw)
-            
-            # Posições ideais (meio do campo)
-            if 3 <= draw_num <= 8:
-                return 8
-            elif draw_num <= 2 or draw_num >= 12:
-                return 6
-            else:
-                return 7
-        except:
+        if draw_num is None:
+            return 7
+        
+        # Posições ideais (meio do campo)
+        if 3 <= draw_num <= 8:
+            return 8
+        elif draw_num <= 2 or draw_num >= 12:
+            return 6
+        else:
             return 7
     
     def _calcular_score_joquei(self, joquei_str):
@@ -1102,21 +918,9 @@ class ExtractorCavalos:
         if not joquei_str:
             return 5
         
-        joquei_lower = joquei_str.lower()
-        
         # Jóqueis famosos
-        joqueis_elite = [
-            'frankie dettori', 'f dettori', 'dettori',
-            'ryan moore', 'r moore', 'moore',
-            'william buick', 'w buick', 'buick',
-            'oisin murphy', 'o murphy', 'murphy',
-            'tom marquand', 't marquand', 'marquand',
-            'hollie doyle', 'h doyle', 'doyle'
-        ]
-        
-        for joquei_elite in joqueis_elite:
-            if joquei_elite in joquei_lower:
-                return 25
+        if INDICE_PESSOAS.elite(joquei_str, JOQUEI):
+            return 25
         
         # Jóqueis experientes (com iniciais)
         if len(joquei_str) > 5 and any(c.isupper() for c in joquei_str):
@@ -1171,135 +975,111 @@ class ExtractorCavalos:
         except:
             return 50
     
-    def _analisar_tendencia_peso(self, forma, peso_atual):
+    def _analisar_tendencia_peso(self, cavalo):
         """
         Analisa a tendência de peso comparando com performances anteriores
         """
-        try:
-            if not forma or not peso_atual or peso_atual == 'N/A':
-                return 50
-            
-            # Simular análise de peso histórico baseado na forma
-            vitorias_recentes = forma[:3].count('1') if len(forma) >= 3 else 0
-            colocacoes_recentes = forma[:3].count('2') + forma[:3].count('3') if len(forma) >= 3 else 0
-            
-            # Se teve boas performances recentes, peso atual é favorável
-            if vitorias_recentes >= 2:
-                return 85  # Peso ótimo para vitórias
-            elif vitorias_recentes >= 1 or colocacoes_recentes >= 2:
-                return 75  # Peso bom para colocações
-            elif colocacoes_recentes >= 1:
-                return 65  # Peso razoável
-            else:
-                return 45  # Peso pode estar afetando performance
-                
-        except:
+        forma = cavalo.forma_analisada
+        if not forma.corridas or not cavalo.peso or cavalo.peso == 'N/A':
             return 50
+        
+        # Simular análise de peso histórico baseado na forma (últimas 3 corridas)
+        if forma.corridas >= 3:
+            vitorias_recentes, colocacoes_recentes = forma.vitorias_3, forma.colocacoes_3
+        else:
+            vitorias_recentes = colocacoes_recentes = 0
+        
+        # Se teve boas performances recentes, peso atual é favorável
+        if vitorias_recentes >= 2:
+            return 85  # Peso ótimo para vitórias
+        elif vitorias_recentes >= 1 or colocacoes_recentes >= 2:
+            return 75  # Peso bom para colocações
+        elif colocacoes_recentes >= 1:
+            return 65  # Peso razoável
+        else:
+            return 45  # Peso pode estar afetando performance
     
-
-    
-    def _analisar_tendencia_official_rating(self, forma, or_atual):
+    def _analisar_tendencia_official_rating(self, cavalo):
         """
         Analisa a tendência do Official Rating comparando com a forma recente
         """
-        try:
-            if not forma or not or_atual or or_atual == 'N/A':
-                return 50
-            
-            or_atual_num = float(str(or_atual))
-            
-            # Analisar forma recente (últimas 5 corridas)
-            forma_recente = forma[:5] if len(forma) >= 5 else forma
-            vitorias = forma_recente.count('1')
-            colocacoes = forma_recente.count('2') + forma_recente.count('3')
-            
-            # OR alto com boa forma = consistência excelente
-            if or_atual_num >= 90 and vitorias >= 2:
-                return 95  # Elite com forma
-            elif or_atual_num >= 85 and vitorias >= 1:
-                return 85  # Muito bom com forma
-            elif or_atual_num >= 80 and colocacoes >= 2:
-                return 80  # Bom e consistente
-            elif or_atual_num >= 75 and vitorias >= 1:
-                return 75  # Médio com potencial
-            elif or_atual_num >= 90 and vitorias == 0:
-                return 60  # Alto OR mas sem forma recente
-            elif or_atual_num <= 70 and vitorias >= 1:
-                return 70  # OR baixo mas mostrando melhora
-            elif or_atual_num >= 85:
-                return 70  # OR alto, forma média
-            elif or_atual_num >= 75:
-                return 60  # OR médio
-            else:
-                return 45  # OR baixo
-                
-        except:
+        forma = cavalo.forma_analisada
+        or_atual_num = cavalo.or_valor
+        if not forma.corridas or or_atual_num is None:
             return 50
+        
+        # Analisar forma recente (últimas 5 corridas)
+        vitorias = forma.vitorias_5
+        colocacoes = forma.colocacoes_5
+        
+        # OR alto com boa forma = consistência excelente
+        if or_atual_num >= 90 and vitorias >= 2:
+            return 95  # Elite com forma
+        elif or_atual_num >= 85 and vitorias >= 1:
+            return 85  # Muito bom com forma
+        elif or_atual_num >= 80 and colocacoes >= 2:
+            return 80  # Bom e consistente
+        elif or_atual_num >= 75 and vitorias >= 1:
+            return 75  # Médio com potencial
+        elif or_atual_num >= 90 and vitorias == 0:
+            return 60  # Alto OR mas sem forma recente
+        elif or_atual_num <= 70 and vitorias >= 1:
+            return 70  # OR baixo mas mostrando melhora
+        elif or_atual_num >= 85:
+            return 70  # OR alto, forma média
+        elif or_atual_num >= 75:
+            return 60  # OR médio
+        else:
+            return 45  # OR baixo
     
-    def _analisar_performance_joquei(self, joquei, forma):
+    def _analisar_performance_joquei(self, cavalo):
         """
         Analisa a performance do jóquei baseada na forma do cavalo
         """
-        try:
-            if not joquei or not forma:
-                return 50
-            
-            joquei_lower = joquei.lower()
-            
-            # Jóqueis de elite com boa forma = excelente
-            joqueis_elite = ['dettori', 'moore', 'buick', 'murphy', 'marquand', 'doyle']
-            is_elite = any(elite in joquei_lower for elite in joqueis_elite)
-            
-            vitorias = forma[:5].count('1') if len(forma) >= 5 else forma.count('1')
-            colocacoes = forma[:5].count('2') + forma[:5].count('3') if len(forma) >= 5 else forma.count('2') + forma.count('3')
-            
-            if is_elite:
-                if vitorias >= 2:
-                    return 95  # Elite + boa forma
-                elif vitorias >= 1 or colocacoes >= 2:
-                    return 85  # Elite + forma razoável
-                else:
-                    return 70  # Elite mas forma ruim
-            else:
-                if vitorias >= 2:
-                    return 80  # Jóquei regular + boa forma
-                elif vitorias >= 1 or colocacoes >= 2:
-                    return 65  # Jóquei regular + forma razoável
-                else:
-                    return 45  # Jóquei regular + forma ruim
-                    
-        except:
+        forma = cavalo.forma_analisada
+        if not cavalo.joquei or not forma.corridas:
             return 50
+        
+        # Jóqueis de elite com boa forma = excelente
+        is_elite = INDICE_PESSOAS.elite(cavalo.joquei, JOQUEI)
+        
+        vitorias = forma.vitorias_5
+        colocacoes = forma.colocacoes_5
+        
+        if is_elite:
+            if vitorias >= 2:
+                return 95  # Elite + boa forma
+            elif vitorias >= 1 or colocacoes >= 2:
+                return 85  # Elite + forma razoável
+            else:
+                return 70  # Elite mas forma ruim
+        else:
+            if vitorias >= 2:
+                return 80  # Jóquei regular + boa forma
+            elif vitorias >= 1 or colocacoes >= 2:
+                return 65  # Jóquei regular + forma razoável
+            else:
+                return 45  # Jóquei regular + forma ruim
     
     def _calcular_consistencia(self, forma):
         """
         Calcula a consistência baseada na regularidade das colocações
         """
-        try:
-            if not forma or len(forma) < 3:
-                return 50
-            
-            # Analisar últimas 5 corridas
-            forma_recente = forma[:5] if len(forma) >= 5 else forma
-            
-            colocacoes_boas = 0
-            for pos in forma_recente:
-                if pos in ['1', '2', '3']:
-                    colocacoes_boas += 1
-            
-            consistencia_pct = (colocacoes_boas / len(forma_recente)) * 100
-            
-            if consistencia_pct >= 80:
-                return 90  # Muito consistente
-            elif consistencia_pct >= 60:
-                return 75  # Consistente
-            elif consistencia_pct >= 40:
-                return 60  # Moderadamente consistente
-            else:
-                return 40  # Inconsistente
-                
-        except:
+        if forma.corridas < 3:
             return 50
+        
+        # Analisar últimas 5 corridas
+        colocacoes_boas = forma.vitorias_5 + forma.colocacoes_5
+        consistencia_pct = (colocacoes_boas / min(forma.corridas, 5)) * 100
+        
+        if consistencia_pct >= 80:
+            return 90  # Muito consistente
+        elif consistencia_pct >= 60:
+            return 75  # Consistente
+        elif consistencia_pct >= 40:
+            return 60  # Moderadamente consistente
+        else:
+            return 40  # Inconsistente
     
     def _analisar_distancia_preferida(self, historico_detalhado):
         """
@@ -1355,13 +1135,12 @@ class ExtractorCavalos:
         Analisa como o cavalo se adapta às condições da pista
         """
         try:
-            if not forma or condicoes_pista == 'N/A':
+            if not forma.corridas or condicoes_pista == 'N/A':
                 return 50  # Score neutro
             
-            # Score base baseado na forma recente
-            forma_recente = forma[:3] if len(forma) >= 3 else forma
-            vitorias_recentes = forma_recente.count('1')
-            colocacoes_recentes = forma_recente.count('2') + forma_recente.count('3')
+            # Score base baseado na forma recente (últimas 3 corridas)
+            vitorias_recentes = forma.vitorias_3
+            colocacoes_recentes = forma.colocacoes_3
             
             score_base = (vitorias_recentes * 30 + colocacoes_recentes * 15)
             
@@ -1385,34 +1164,15 @@ class ExtractorCavalos:
     def _calcular_momentum(self, forma):
         """
         Calcula o momentum baseado nas últimas 3 corridas
+        Pontuação por posição (1=10pts, 2=7pts, 3=5pts, 4=3pts, 5+=1pt)
         """
-        try:
-            if not forma or len(forma) < 3:
-                return 50
-            
-            ultimas_3 = forma[:3]
-            
-            # Pontuação por posição (1=10pts, 2=7pts, 3=5pts, 4=3pts, 5+=1pt)
-            pontos = 0
-            for pos in ultimas_3:
-                if pos == '1':
-                    pontos += 10
-                elif pos == '2':
-                    pontos += 7
-                elif pos == '3':
-                    pontos += 5
-                elif pos == '4':
-                    pontos += 3
-                else:
-                    pontos += 1
-            
-            # Converter para escala 0-100
-            momentum_score = min((pontos / 30) * 100, 100)
-            
-            return round(momentum_score)
-            
-        except:
+        if forma.corridas < 3:
             return 50
+        
+        # Converter para escala 0-100
+        momentum_score = min((forma.pontos_momentum / 30) * 100, 100)
+        
+        return round(momentum_score)
     
     def _calcular_probabilidade_vitoria_melhorada(self, rating_score, joquei_score, forma_score, 
                                                  peso_score, idade_pts, tendencia_peso, 
@@ -1636,9 +1396,15 @@ class ExtractorCavalos:
             }
         }
     
-    def analisar_cavalos(self, dados_extraidos):
+    def analisar_cavalos(self, dados_extraidos, campos=None, termos=None, chave=None):
         """
-        Analisa os cavalos extraídos e retorna o resultado formatado com ranking aprimorado
+        Analisa os cavalos extraídos e retorna o resultado formatado com ranking aprimorado.
+        Com `campos`, cada cavalo traz só esses campos e os que o ranking usa,
+        e só os fatores de que eles dependem são calculados (ranking rápido).
+        `termos` (TermosEachWay) fixa os lugares/fração da each-way; sem eles,
+        a regra pelo tamanho do campo. `chave` identifica a corrida (URL
+        canônica): se ela já foi analisada e só mudaram odds ou saíram
+        cavalos, só os fatores que dependem do preço são recalculados.
         """
         try:
             if not dados_extraidos or 'cavalos' not in dados_extraidos:
@@ -1649,11 +1415,12 @@ class ExtractorCavalos:
                 return {'erro': 'Nenhum cavalo encontrado para análise'}
             
             # Validação final para remover duplicados antes da análise
+            # (cada cavalo vira um Corredor, com os campos convertidos uma vez só)
             cavalos_unicos = []
             nomes_vistos = set()
             
-            for cavalo in cavalos:
-                nome = cavalo.get('nome', '').strip()
+            for cavalo in map(Corredor.de, cavalos):
+                nome = cavalo.nome.strip()
                 if nome and nome not in nomes_vistos:
                     cavalos_unicos.append(cavalo)
                     nomes_vistos.add(nome)
@@ -1662,23 +1429,57 @@ class ExtractorCavalos:
             
             logger.info(f"Analisando {len(cavalos_unicos)} cavalos únicos (removidos {len(cavalos) - len(cavalos_unicos)} duplicados)...")
             
-            # Analisar cada cavalo individualmente
-            analises = []
-            for i, cavalo in enumerate(cavalos_unicos):
-                analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                analises.append(analise)
+            # Analisar cada cavalo individualmente (o mesmo modelo para a corrida inteira)
+            modelo = MODELO_PONTUACAO.atual
+            if campos is None:
+                saidas = CAMPOS_ANALISE
+            else:
+                saidas = tuple(dict.fromkeys(CAMPOS_RANKING + tuple(c for c in campos if c in CAMPOS_ANALISE)))
+            analises = None
+            estado = self.estados_corrida.obter((chave, saidas)) if chave is not None else None
+            if estado is not None and estado.modelo is modelo and estado.versao_pessoas == INDICE_PESSOAS.versao:
+                atualizados = self._reanalisar_incremental(estado, cavalos_unicos, modelo, saidas)
+                if atualizados is not None:
+                    analises, intermediarios = atualizados
+            incremental = analises is not None
+            if not incremental:
+                avaliar = self.grafo_fatores.compilar(saidas, intermediarios=True)
+                analises, intermediarios = [], []
+                for i, cavalo in enumerate(cavalos_unicos):
+                    analise, valores = avaliar(cavalo, i + 1, modelo)
+                    analises.append(analise)
+                    intermediarios.append(valores)
+            if chave is not None:
+                self.estados_corrida.guardar((chave, saidas), EstadoCorrida(modelo, INDICE_PESSOAS.versao, {
+                    cavalo.nome: (cavalo, i + 1, analise, valores)
+                    for i, (cavalo, analise, valores) in enumerate(zip(cavalos_unicos, analises, intermediarios))
+                }), incremental)
             
             # NOVO SISTEMA DE RANKING APRIMORADO
             # 1. Aplicar ranking comparativo entre cavalos
-            analises = self._aplicar_ranking_comparativo(analises)
+            analises = self._aplicar_ranking_comparativo(analises, cavalos_unicos)
             
             # 2. Ordenar por pontuação final (maior para menor)
             analises.sort(key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), reverse=True)
             
-            # 3. Atualizar posições finais no ranking
+            # 3. Atualizar posições finais no ranking (com a probabilidade de
+            # vitória normalizada no campo: as da corrida somam 100%)
+            probabilidades = probabilidades_vitoria([a.get('pontuacao_final_ajustada', a.get('pontuacao_final', 0)) for a in analises])
             for i, analise in enumerate(analises):
                 analise['posicao_final'] = i + 1
                 analise['percentil'] = round((len(analises) - i) / len(analises) * 100, 1)
+                analise['probabilidade_normalizada'] = round(float(probabilidades[i]) * 100, 1)
+            
+            # 3b. Colocação (Harville/Henery) e valor esperado da aposta simples e each-way
+            if termos is None:
+                termos = termos_padrao(len(analises))
+            odds_por_nome = {cavalo.nome: cavalo.odds_decimal for cavalo in cavalos_unicos}
+            odds = [odds_por_nome.get(a['nome']) for a in analises]
+            colocacao, ev_vitoria, ev_each_way = analisar_colocacao(probabilidades, odds, termos)
+            for i, analise in enumerate(analises):
+                analise['probabilidade_colocacao'] = valor_resposta(colocacao[i] * 100, 1)
+                analise['ev_vitoria'] = valor_resposta(ev_vitoria[i], 3)
+                analise['ev_each_way'] = valor_resposta(ev_each_way[i], 3)
             
             # 4. Identificar grupos de performance
             analises = self._identificar_grupos_performance(analises)
@@ -1695,6 +1496,8 @@ class ExtractorCavalos:
                     'analises': analises
                 },
                 'estatisticas': estatisticas,
+                'modelo': {'nome': modelo.nome, 'versao': modelo.versao},
+                'each_way': {**termos.para_dict(), 'modelo': MODELO_COLOCACAO} if termos else None,
                 'timestamp': datetime.now().isoformat(),
                 'ranking_info': {
                     'total_cavalos': len(analises),
@@ -1713,9 +1516,43 @@ class ExtractorCavalos:
             logger.error(f"Erro na análise de cavalos: {str(e)}")
             return {'erro': f'Erro na análise: {str(e)}'}
     
-    def _aplicar_ranking_comparativo(self, analises):
+    def _reanalisar_incremental(self, estado, cavalos_unicos, modelo, saidas):
+        """
+        (análises, intermediários) a partir da análise anterior da corrida,
+        recalculando só os nós que dependem das odds (de quem teve o preço
+        alterado) e da posição (de quem mudou de lugar, por causa das
+        retiradas). None se entrou cavalo novo ou mudou outro dado.
+        """
+        anteriores = estado.corredores
+        analises, intermediarios = [], []
+        precos_alterados = 0
+        for posicao, cavalo in enumerate(cavalos_unicos, 1):
+            anterior = anteriores.get(cavalo.nome)
+            if anterior is None:
+                return None
+            corredor, posicao_anterior, analise, valores = anterior
+            if not cavalo.mesmos_dados_sem_preco(corredor):
+                return None
+            alterados = ()
+            if cavalo.odds != corredor.odds:
+                alterados = NOS_PRECO
+                precos_alterados += 1
+            if posicao != posicao_anterior:
+                alterados += ('posicao',)
+            analise, valores = self.grafo_fatores.compilar_atualizacao(alterados, saidas)(
+                cavalo, posicao, modelo, analise, valores
+            )
+            analises.append(analise)
+            intermediarios.append(valores)
+        
+        logger.info(f"Reanálise incremental: {precos_alterados} preços alterados, "
+                    f"{len(anteriores) - len(cavalos_unicos)} cavalos retirados")
+        return analises, intermediarios
+    
+    def _aplicar_ranking_comparativo(self, analises, corredores):
         """
         Aplica sistema de ranking comparativo entre cavalos para ajustar pontuações
+        (analises[i] é a análise de corredores[i])
         """
         try:
             if len(analises) <= 1:
@@ -1727,7 +1564,7 @@ class ExtractorCavalos:
             max_pontuacao = max(pontuacoes)
             min_pontuacao = min(pontuacoes)
             
-            for analise in analises:
+            for analise, corredor in zip(analises, corredores):
                 pontuacao_original = analise.get('pontuacao_final', 0)
                 
                 # Fator de ajuste baseado na posição relativa
@@ -1759,8 +1596,7 @@ class ExtractorCavalos:
                     bonus_comparativo += 0.1
                 
                 # Penalidade por dados incompletos em corrida competitiva
-                dados_faltando = sum([1 for campo in ['official_rating', 'forma', 'peso', 'idade'] 
-                                    if not analise.get(campo) or analise.get(campo) in ['N/A', 'Desconhecido', '']])
+                dados_faltando = corredor.campos_faltando_ranking
                 if dados_faltando >= 2 and len(analises) > 5:
                     bonus_comparativo -= 0.1
                 
@@ -2025,51 +1861,6 @@ class ExtractorCavalos:
                 dados['cavalos'] = cavalos_unicos
                 logger.info(f"At The Races - Duplicados removidos. Cavalos únicos: {len(dados['cavalos'])}")
             
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"At The Races: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_at_the_races',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"At The Races: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no At The Races: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-            
             logger.info(f"At The Races - Extraídos {len(dados['cavalos'])} cavalos únicos: {[c['nome'] for c in dados['cavalos']]}")
             return dados
             
@@ -2079,7 +1870,8 @@ class ExtractorCavalos:
     
     def _extrair_racing_post(self, soup, url):
         """
-        Extrai dados específicos do Racing Post com informações detalhadas
+        Fallback do Racing Post por links de cavalos, para páginas sem os containers
+        de corredores da especificação declarativa
         """
         try:
             dados = {
@@ -2094,248 +1886,61 @@ class ExtractorCavalos:
             if titulo_elem:
                 dados['titulo_corrida'] = titulo_elem.get_text(strip=True)
             
-            # NOVA ABORDAGEM: Buscar por containers de corredores específicos do Racing Post
-            runners_containers = soup.find_all('div', {'class': re.compile(r'RC-runnerRow')}) or soup.find_all('div', {'class': re.compile(r'RC-runnerPriceWrapper|js-diffusionHorsesList')})
-            
-            logger.info(f"Racing Post - Encontrados {len(runners_containers)} containers de corredores")
+            # Buscar cavalos - Racing Post com seletores melhorados
+            cavalos_links = []
             
-            cavalos_extraidos = []
+            seletores_rp = [
+                'a[href*="/horses/"]',
+                'a[href*="/horse/"]',
+                'a[href*="/profile/horse/"]',
+                '.RC-runnerName',
+                '.rp-horseHoverTrigger',
+                '.rp-racecard-horse a',
+                '.rp-racecard-runner a',
+                '.horse-name a',
+                '.runner-name a'
+            ]
             
-            for container in runners_containers:
+            for seletor in seletores_rp:
                 try:
-                    # Extrair nome do cavalo
-                    nome_elem = (
-                        container.find('a', {'class': re.compile(r'RC-runnerName')}) or
-                        container.find('span', {'data-horsename': True}) or
-                        container.find('a', href=re.compile(r'/profile/horse/'))
-                    )
-                    
-                    if not nome_elem:
-                        continue
-                    
-                    nome = nome_elem.get_text(strip=True)
-                    if not nome or len(nome) < 2:
-                        # Tentar pegar do atributo data-horsename
-                        nome = container.get('data-diffusion-horsename', '')
+                    elementos = soup.select(seletor)
+                    if elementos:
+                        cavalos_links.extend(elementos)
+                        logger.info(f"Racing Post - {len(elementos)} cavalos encontrados com: {seletor}")
+                except Exception as e:
+                    logger.debug(f"Erro no seletor {seletor}: {e}")
+            
+            # Remover duplicados
+            cavalos_unicos = []
+            nomes_vistos = set()
+            for link in cavalos_links:
+                nome = link.get_text(strip=True)
+                nome_limpo = re.sub(r'^\d+\(\d+\)', '', nome).strip()
+                nome_limpo = re.sub(r'\s*\([A-Z]{2,4}\)\s*$', '', nome_limpo)
+                nome_limpo = re.sub(r'\s*\(-?\d+\)\s*$', '', nome_limpo)
+                nome_limpo = nome_limpo.strip()
+                
+                if (nome_limpo and len(nome_limpo) > 2 and len(nome_limpo) < 30 and
+                    nome_limpo not in nomes_vistos and
+                    nome_limpo not in ['HORSE', 'Horse'] and
+                    not nome_limpo.endswith("'s") and
+                    any(c.isalpha() for c in nome_limpo)):
                     
-                    if not nome or len(nome) < 2:
-                        continue
-                    
-                    # Limpar nome
-                    nome_limpo = re.sub(r'^\d+\(\d+\)', '', nome).strip()
-                    nome_limpo = re.sub(r'\s*\([A-Z]{2,4}\)\s*$', '', nome_limpo)
-                    nome_limpo = re.sub(r'\s*\(-?\d+\)\s*$', '', nome_limpo)
-                    nome_limpo = nome_limpo.strip()
-                    
-                    if not nome_limpo or len(nome_limpo) < 2:
-                        continue
-                    
-                    # Extrair número do corredor
-                    numero_elem = container.find('span', {'class': re.compile(r'RC-runnerNumber__no')})
-                    numero = numero_elem.get_text(strip=True) if numero_elem else str(len(cavalos_extraidos) + 1)
-                    
-                    # Extrair jóquei
-                    joquei = "Jóquei N/A"
-                    # Buscar especificamente por elementos com data-order-jockey
-                    joquei_elem = container.find('a', {'data-order-jockey': True})
-                    if joquei_elem:
-                        joquei_text = joquei_elem.get('data-order-jockey', '').strip()
-                        if joquei_text and joquei_text != '-':
-                            joquei = joquei_text
-                    else:
-                        # Fallback para outros seletores
-                        joquei_elem = (
-                            container.find('a', {'class': re.compile(r'RC-runnerInfo__name')}) or
-                            container.find('a', {'class': re.compile(r'jockey|RC-runnerJockey')}) or
-                            container.find('span', {'class': re.compile(r'jockey|RC-runnerJockey')})
-                        )
-                        if joquei_elem:
-                            joquei_text = joquei_elem.get_text(strip=True)
-                            if joquei_text and joquei_text != '-':
-                                joquei = joquei_text
-                    
-                    # Extrair odds
-                    odds = "N/A"
-                    odds_elem = (
-                        container.find('span', {'class': re.compile(r'RC-price|odds|price')}) or
-                        container.find('div', {'class': re.compile(r'RC-price|odds|price')}) or
-                        container.find('button', {'class': re.compile(r'price|odds')}) or
-                        container.find('span', {'data-test-selector': re.compile(r'price|odds')})
-                    )
-                    if odds_elem:
-                        odds_text = odds_elem.get_text(strip=True)
-                        if odds_text and odds_text != '-' and odds_text != 'N/A':
-                            odds = odds_text
-                    
-                    # Extrair peso
-                    peso = "N/A"
-                    peso_elem = (
-                        container.find('span', {'class': re.compile(r'weight|RC-weight')}) or
-                        container.find('div', {'class': re.compile(r'weight|RC-weight')})
-                    )
-                    if peso_elem:
-                        peso_text = peso_elem.get_text(strip=True)
-                        if peso_text and peso_text != '-':
-                            peso = peso_text
-                    
-                    # Extrair treinador
-                    treinador = "N/A"
-                    # Buscar especificamente por elementos com data-order-trainer
-                    treinador_elem = container.find('a', {'data-order-trainer': True})
-                    if treinador_elem:
-                        treinador_text = treinador_elem.get('data-order-trainer', '').strip()
-                        if treinador_text and treinador_text != '-':
-                            treinador = treinador_text
-                    else:
-                        # Fallback para outros seletores
-                        treinador_elem = (
-                            container.find('a', {'class': re.compile(r'trainer|RC-trainer')}) or
-                            container.find('span', {'class': re.compile(r'trainer|RC-trainer')})
-                        )
-                        if treinador_elem:
-                            treinador_text = treinador_elem.get_text(strip=True)
-                            if treinador_text and treinador_text != '-':
-                                treinador = treinador_text
-                    
-                    # Extrair official rating
-                    rating = "N/A"
-                    rating_elem = (
-                        container.find('span', {'class': re.compile(r'rating|OR|official')}) or
-                        container.find('div', {'class': re.compile(r'rating|OR|official')})
-                    )
-                    if rating_elem:
-                        rating_text = rating_elem.get_text(strip=True)
-                        if rating_text and rating_text.isdigit():
-                            rating = rating_text
-                    
-                    cavalo_data = {
+                    cavalos_unicos.append({
                         'nome': nome_limpo,
-                        'joquei': joquei,
-                        'odds': odds,
-                        'peso': peso,
+                        'joquei': "Jóquei N/A",
+                        'odds': "N/A",
+                        'peso': "N/A",
                         'idade': "N/A",
                         'forma': "N/A",
-                        'official_rating': rating,
-                        'draw': numero,
-                        'treinador': treinador,
+                        'official_rating': "N/A",
+                        'draw': len(cavalos_unicos) + 1,
+                        'treinador': "N/A",
                         'historico_detalhado': []
-                    }
-                    
-                    # Verificar se já não foi adicionado
-                    if not any(c['nome'] == nome_limpo for c in cavalos_extraidos):
-                        cavalos_extraidos.append(cavalo_data)
-                        logger.debug(f"Racing Post - Cavalo extraído: {nome_limpo}")
-                    
-                except Exception as e:
-                    logger.debug(f"Erro ao processar container: {e}")
-                    continue
+                    })
+                    nomes_vistos.add(nome_limpo)
             
-            # Se não encontrou cavalos com a nova abordagem, usar a abordagem anterior
-            if not cavalos_extraidos:
-                logger.info("Racing Post - Usando abordagem de fallback")
-                
-                # Buscar cavalos - Racing Post com seletores melhorados
-                cavalos_links = []
-                
-                seletores_rp = [
-                    'a[href*="/horses/"]',
-                    'a[href*="/horse/"]',
-                    'a[href*="/profile/horse/"]',
-                    '.RC-runnerName',
-                    '.rp-horseHoverTrigger',
-                    '.rp-racecard-horse a',
-                    '.rp-racecard-runner a',
-                    '.horse-name a',
-                    '.runner-name a'
-                ]
-                
-                for seletor in seletores_rp:
-                    try:
-                        elementos = soup.select(seletor)
-                        if elementos:
-                            cavalos_links.extend(elementos)
-                            logger.info(f"Racing Post - {len(elementos)} cavalos encontrados com: {seletor}")
-                    except Exception as e:
-                        logger.debug(f"Erro no seletor {seletor}: {e}")
-                
-                # Remover duplicados
-                cavalos_unicos = []
-                nomes_vistos = set()
-                for link in cavalos_links:
-                    nome = link.get_text(strip=True)
-                    nome_limpo = re.sub(r'^\d+\(\d+\)', '', nome).strip()
-                    nome_limpo = re.sub(r'\s*\([A-Z]{2,4}\)\s*$', '', nome_limpo)
-                    nome_limpo = re.sub(r'\s*\(-?\d+\)\s*$', '', nome_limpo)
-                    nome_limpo = nome_limpo.strip()
-                    
-                    if (nome_limpo and len(nome_limpo) > 2 and len(nome_limpo) < 30 and
-                        nome_limpo not in nomes_vistos and
-                        nome_limpo not in ['HORSE', 'Horse'] and
-                        not nome_limpo.endswith("'s") and
-                        any(c.isalpha() for c in nome_limpo)):
-                        
-                        cavalos_unicos.append({
-                            'nome': nome_limpo,
-                            'joquei': "Jóquei N/A",
-                            'odds': "N/A",
-                            'peso': "N/A",
-                            'idade': "N/A",
-                            'forma': "N/A",
-                            'official_rating': "N/A",
-                            'draw': len(cavalos_unicos) + 1,
-                            'treinador': "N/A",
-                            'historico_detalhado': []
-                        })
-                        nomes_vistos.add(nome_limpo)
-                
-                cavalos_extraidos = cavalos_unicos[:15]
-            
-            dados['cavalos'] = cavalos_extraidos[:15]  # Limitar a 15 cavalos
-            
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"Racing Post: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_racing_post',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Racing Post: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no Racing Post: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
+            dados['cavalos'] = cavalos_unicos[:15]  # Limitar a 15 cavalos
             
             logger.info(f"Racing Post: Extraídos {len(dados['cavalos'])} cavalos")
             return dados if dados['cavalos'] else None
@@ -2394,247 +1999,12 @@ class ExtractorCavalos:
                         }
                         dados['cavalos'].append(cavalo_data)
             
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"Sporting Life: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_sporting_life',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Sporting Life: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no Sporting Life: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-            
             return dados if dados['cavalos'] else None
             
         except Exception as e:
             logger.warning(f"Erro ao extrair dados do Sporting Life: {str(e)}")
             return None
     
-    def _extrair_oddschecker(self, soup, url):
-        """
-        Extrai dados específicos do Oddschecker
-        """
-        try:
-            dados = {
-                'cavalos': [],
-                'titulo_corrida': 'Corrida Oddschecker',
-                'condicoes_pista': 'N/A',
-                'clima': 'N/A'
-            }
-            
-            # Buscar título da corrida
-            titulo_elem = soup.find('h1') or soup.find('title')
-            if titulo_elem:
-                dados['titulo_corrida'] = titulo_elem.get_text(strip=True)
-            
-            # Buscar cavalos e odds
-            cavalos_elem = soup.find_all('tr', class_=re.compile(r'runner|horse|selection'))
-            
-            for i, elem in enumerate(cavalos_elem[:15]):
-                nome_elem = elem.find('a') or elem.find('span', class_=re.compile(r'name|horse'))
-                odds_elem = elem.find('span', class_=re.compile(r'odds|price'))
-                
-                cavalo_data = {
-                    'nome': nome_elem.get_text(strip=True) if nome_elem else f"Cavalo {i + 1}",
-                    'joquei': "Jóquei N/A",
-                    'odds': odds_elem.get_text(strip=True) if odds_elem else "N/A",
-                    'peso': "N/A",
-                    'idade': "N/A",
-                    'forma': "N/A",
-                    'official_rating': "N/A",
-                    'draw': i + 1,
-                    'treinador': "N/A",
-                    'historico_detalhado': []
-                }
-                dados['cavalos'].append(cavalo_data)
-            
-            return dados if dados['cavalos'] else None
-            
-        except Exception as e:
-            logger.warning(f"Erro ao extrair dados do Oddschecker: {str(e)}")
-            return None
-    
-    def _extrair_betfair(self, soup, url):
-        """
-        Extrai dados específicos do Betfair
-        """
-        try:
-            dados = {
-                'cavalos': [],
-                'titulo_corrida': 'Corrida Betfair',
-                'condicoes_pista': 'N/A',
-                'clima': 'N/A'
-            }
-            
-            # Buscar título da corrida
-            titulo_elem = soup.find('h1') or soup.find('title')
-            if titulo_elem:
-                dados['titulo_corrida'] = titulo_elem.get_text(strip=True)
-            
-            # Buscar cavalos na interface do Betfair
-            cavalos_elem = soup.find_all('div', class_=re.compile(r'runner|selection|market-item'))
-            
-            for i, elem in enumerate(cavalos_elem[:15]):
-                nome_elem = elem.find('span', class_=re.compile(r'name|runner-name'))
-                odds_elem = elem.find('span', class_=re.compile(r'odds|price|back-price'))
-                
-                cavalo_data = {
-                    'nome': nome_elem.get_text(strip=True) if nome_elem else f"Cavalo {i + 1}",
-                    'joquei': "Jóquei N/A",
-                    'odds': odds_elem.get_text(strip=True) if odds_elem else "N/A",
-                    'peso': "N/A",
-                    'idade': "N/A",
-                    'forma': "N/A",
-                    'official_rating': "N/A",
-                    'draw': i + 1,
-                    'treinador': "N/A",
-                    'historico_detalhado': []
-                }
-                dados['cavalos'].append(cavalo_data)
-            
-            return dados if dados['cavalos'] else None
-            
-        except Exception as e:
-            logger.warning(f"Erro ao extrair dados do Betfair: {str(e)}")
-            return None
-
-    def _extrair_timeform(self, soup, url):
-        """
-        Extrai dados específicos do Timeform
-        """
-        try:
-            dados = {
-                'cavalos': [],
-                'titulo_corrida': 'Corrida Timeform',
-                'condicoes_pista': 'N/A',
-                'clima': 'N/A'
-            }
-            
-            # Buscar título da corrida
-            titulo_elem = soup.find('h1') or soup.find('title')
-            if titulo_elem:
-                dados['titulo_corrida'] = titulo_elem.get_text(strip=True)
-            
-            # Buscar cavalos - Timeform usa diferentes padrões
-            cavalos_elem = soup.find_all('div', class_=re.compile(r'runner|horse|selection|tf-runner'))
-            
-            if not cavalos_elem:
-                # Tentar seletores alternativos
-                cavalos_elem = soup.find_all('tr', class_=re.compile(r'runner|horse|selection'))
-            
-            for i, elem in enumerate(cavalos_elem[:15]):
-                nome_elem = (
-                    elem.find('a', class_=re.compile(r'name|horse|runner')) or
-                    elem.find('span', class_=re.compile(r'name|horse|runner')) or
-                    elem.find('a') or
-                    elem.find('span')
-                )
-                
-                joquei_elem = elem.find('span', class_=re.compile(r'jockey|rider'))
-                odds_elem = elem.find('span', class_=re.compile(r'odds|price'))
-                peso_elem = elem.find('span', class_=re.compile(r'weight|wt'))
-                rating_elem = elem.find('span', class_=re.compile(r'rating|tfr|timeform'))
-                
-                cavalo_data = {
-                    'nome': nome_elem.get_text(strip=True) if nome_elem else f"Cavalo {i + 1}",
-                    'joquei': joquei_elem.get_text(strip=True) if joquei_elem else "Jóquei N/A",
-                    'odds': odds_elem.get_text(strip=True) if odds_elem else "N/A",
-                    'peso': peso_elem.get_text(strip=True) if peso_elem else "N/A",
-                    'idade': "N/A",
-                    'forma': "N/A",
-                    'official_rating': rating_elem.get_text(strip=True) if rating_elem else "N/A",
-                    'draw': i + 1,
-                    'treinador': "N/A",
-                    'historico_detalhado': []
-                }
-                dados['cavalos'].append(cavalo_data)
-            
-            # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-            if dados['cavalos']:
-                try:
-                    logger.info(f"Timeform: Aplicando ranking comparativo a {len(dados['cavalos'])} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(dados['cavalos']):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_timeform',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Timeform: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking no Timeform: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-            
-            return dados if dados['cavalos'] else None
-            
-        except Exception as e:
-            logger.warning(f"Erro ao extrair dados do Timeform: {str(e)}")
-            return None
-    
     def _extrair_generico(self, soup, url):
         """
         Extração genérica que tenta encontrar nomes de cavalos em qualquer site
@@ -2642,72 +2012,48 @@ class ExtractorCavalos:
         try:
             cavalos = []
             
-            # Padrões melhorados para encontrar nomes de cavalos confirmados
-            padroes_cavalos = [
-                # Links específicos de cavalos
-                'a[href*="/horse/"]', 'a[href*="/horses/"]',
-                # Seletores CSS comuns
-                '.horse-name', '.runner-name', '.selection-name',
-                '.horse-name a', '.runner-name a', '.selection-name a',
-                # Atributos de dados
-                '[data-horse]', '[data-runner]', '[data-selection]',
-                '[data-horse-name]', '[data-runner-name]',
-                # Classes específicas
-                '.horse', '.runner', '.selection',
-                'a.horse-link', 'a.runner-link', 'a.selection-link',
-                # Classes com wildcards
-                '[class*="horse"]', '[class*="runner"]', '[class*="selection"]',
-                # Tabelas de corrida
-                'tr.horse-row', 'tr.runner-row', 'tr.selection-row',
-                '.racecard-runner', '.racecard-horse',
-                # Elementos de cartão de corrida
-                '.card-entry', '.race-entry', '.runner-entry',
-                # Nomes em tabelas
-                'td.horse-name', 'td.runner-name', 'th.horse-name',
-                # Spans com nomes
-                'span.horse-name', 'span.runner-name', 'span.selection-name'
-            ]
-            
-            nomes_encontrados = set()
-            
-            # Tentar cada padrão com logging
-            for padrao in padroes_cavalos:
-                try:
-                    elementos = soup.select(padrao)
-                    if elementos:
-                        logger.info(f"Extração genérica - {len(elementos)} elementos encontrados com: {padrao}")
-                        for elem in elementos:
-                            # Tentar extrair texto do elemento ou de links filhos
-                            texto = elem.get_text(strip=True)
-                            if not texto and elem.find('a'):
-                                texto = elem.find('a').get_text(strip=True)
-                            
-                            if texto and len(texto) > 2 and len(texto) < 50:
-                                # Limpar o texto
-                                texto_limpo = re.sub(r'^\d+\s*', '', texto)  # Remove números do início
-                                texto_limpo = re.sub(r'\s*\([^)]+\)\s*$', '', texto_limpo)  # Remove parênteses
-                                texto_limpo = re.sub(r'\xa0', ' ', texto_limpo)  # Remove espaços não-quebráveis
-                                texto_limpo = re.sub(r'\s+', ' ', texto_limpo).strip()  # Normaliza espaços
-                                
-                                # Filtrar nomes que parecem ser de cavalos
-                                if texto_limpo and self._parece_nome_cavalo(texto_limpo):
-                                    nomes_encontrados.add(texto_limpo)
-                except Exception as e:
-                    logger.debug(f"Erro no seletor genérico {padrao}: {e}")
+            # Na ordem da página (dict): a posição de cada cavalo vale como draw
+            nomes_encontrados = {}
+            
+            # Uma passada pela árvore testando todos os padrões
+            try:
+                candidatos = CASADOR_GENERICO.casar(soup)
+            except Exception as e:
+                logger.debug(f"Erro nos seletores genéricos: {e}")
+                candidatos = []
+            
+            contagem = {}
+            for _, regras in candidatos:
+                for regra in regras:
+                    contagem[regra.padrao] = contagem.get(regra.padrao, 0) + 1
+            for padrao in PADROES_CAVALOS_GENERICO:
+                if contagem.get(padrao):
+                    logger.info(f"Extração genérica - {contagem[padrao]} elementos encontrados com: {padrao}")
+            
+            for elem, _ in candidatos:
+                # Tentar extrair texto do elemento ou de links filhos
+                texto = elem.get_text(strip=True)
+                if not texto and elem.find('a'):
+                    texto = elem.find('a').get_text(strip=True)
+                
+                if texto and len(texto) > 2 and len(texto) < 50:
+                    # Limpar o texto
+                    texto_limpo = re.sub(r'^\d+\s*', '', texto)  # Remove números do início
+                    texto_limpo = re.sub(r'\s*\([^)]+\)\s*$', '', texto_limpo)  # Remove parênteses
+                    texto_limpo = re.sub(r'\xa0', ' ', texto_limpo)  # Remove espaços não-quebráveis
+                    texto_limpo = re.sub(r'\s+', ' ', texto_limpo).strip()  # Normaliza espaços
+                    
+                    # Filtrar nomes que parecem ser de cavalos
+                    if texto_limpo and self._parece_nome_cavalo(texto_limpo):
+                        nomes_encontrados[texto_limpo] = None
             
             logger.info(f"Extração genérica - Total de nomes únicos encontrados: {len(nomes_encontrados)}")
             
             # Se não encontrou com CSS, tentar busca por texto
             if len(nomes_encontrados) < 3:
                 # Buscar por padrões de texto que podem ser nomes de cavalos
-                texto_completo = soup.get_text()
-                linhas = texto_completo.split('\n')
-                
-                for linha in linhas:
-                    linha = linha.strip()
-                    if linha and len(linha) > 2 and len(linha) < 50:
-                        if self._parece_nome_cavalo(linha):
-                            nomes_encontrados.add(linha)
+                # (todas as linhas classificadas em lote, repetidas uma vez só)
+                nomes_encontrados.update(dict.fromkeys(CLASSIFICADOR_NOMES.nomes_no_texto(soup.get_text())))
             
             # Converter para lista e limitar
             nomes_lista = list(nomes_encontrados)[:16]
@@ -2740,50 +2086,6 @@ class ExtractorCavalos:
                     'cavalos': cavalos
                 }
                 
-                # APLICAR RANKING COMPARATIVO AOS DADOS EXTRAÍDOS
-                try:
-                    logger.info(f"Extração Genérica: Aplicando ranking comparativo a {len(cavalos)} cavalos")
-                    
-                    # Analisar cada cavalo individualmente
-                    analises = []
-                    for i, cavalo in enumerate(cavalos):
-                        analise = self._analisar_cavalo_individual(cavalo, i + 1)
-                        analises.append(analise)
-                    
-                    # Aplicar ranking comparativo
-                    analises_com_ranking = self._aplicar_ranking_comparativo(analises)
-                    
-                    # Ordenar por pontuação final ajustada (maior para menor)
-                    analises_ordenadas = sorted(
-                        analises_com_ranking, 
-                        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), 
-                        reverse=True
-                    )
-                    
-                    # Atualizar posições finais e percentis
-                    total_cavalos = len(analises_ordenadas)
-                    for i, analise in enumerate(analises_ordenadas):
-                        analise['posicao_final'] = i + 1
-                        analise['percentil'] = ((total_cavalos - i) / total_cavalos) * 100
-                    
-                    # Identificar grupos de performance
-                    analises_com_grupos = self._identificar_grupos_performance(analises_ordenadas)
-                    
-                    # Atualizar dados com cavalos rankeados
-                    dados['cavalos'] = analises_com_grupos
-                    dados['ranking_info'] = {
-                        'total_cavalos': total_cavalos,
-                        'metodo_ranking': 'comparativo_generico',
-                        'criterios': ['rating', 'forma', 'peso', 'joquei', 'treinador', 'odds', 'consistencia', 'momentum']
-                    }
-                    
-                    logger.info(f"Extração Genérica: Ranking aplicado com sucesso. Melhor cavalo: {dados['cavalos'][0]['nome']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro ao aplicar ranking na extração genérica: {str(e)}")
-                    # Em caso de erro, manter dados originais
-                    pass
-                
                 return dados
             else:
                 return None
@@ -2796,66 +2098,7 @@ class ExtractorCavalos:
         """
         Verifica se um texto parece ser um nome de cavalo
         """
-        # Filtros básicos
-        if not texto or len(texto) < 3 or len(texto) > 35:
-            return False
-        
-        # Não deve conter números demais
-        if sum(c.isdigit() for c in texto) > len(texto) * 0.2:
-            return False
-        
-        # Não deve ser apenas números ou símbolos
-        if not any(c.isalpha() for c in texto):
-            return False
-        
-        # Filtrar palavras comuns que não são nomes de cavalos
-        palavras_excluir = {
-            'odds', 'bet', 'win', 'place', 'show', 'back', 'lay',
-            'price', 'form', 'jockey', 'trainer', 'weight', 'age',
-            'rating', 'tips', 'news', 'results', 'race', 'card',
-            'time', 'distance', 'going', 'class', 'prize', 'money',
-            'favourite', 'outsider', 'runner', 'selection', 'horse',
-            'today', 'tomorrow', 'yesterday', 'live', 'next', 'previous',
-            'free', 'super', 'download', 'android', 'bookmaker', 'offers',
-            'gambling', 'responsible', 'logo', 'worldwide', 'stakes', 'races',
-            'thursday', 'friday', 'saturday', 'sunday', 'monday', 'tuesday',
-            'wednesday', 'statistics', 'newspaper', 'quiz', 'doncaster',
-            'newmarket', 'ascot', 'york', 'cheltenham', 'goodwood', 'maiden',
-            'handicap', 'stakes', 'standard', 'partly', 'cloudy', 'tapeta',
-            'september', 'october', 'november', 'december', 'january',
-            'february', 'march', 'april', 'may', 'june', 'july', 'august'
-        }
-        
-        texto_lower = texto.lower()
-        if texto_lower in palavras_excluir:
-            return False
-        
-        # Filtrar frases que contêm palavras excluídas
-        palavras_texto = texto_lower.split()
-        if any(palavra in palavras_excluir for palavra in palavras_texto):
-            return False
-        
-        # Não deve conter URLs ou emails
-        if '@' in texto or 'http' in texto or 'www.' in texto:
-            return False
-        
-        # Não deve conter dois pontos (indicativo de horários ou labels)
-        if ':' in texto:
-            return False
-        
-        # Deve ter pelo menos uma letra maiúscula (nomes próprios)
-        if not any(c.isupper() for c in texto):
-            return False
-        
-        # Não deve ser muito genérico (uma palavra só muito comum)
-        if len(palavras_texto) == 1 and len(texto) < 6:
-            return False
-        
-        # Padrão típico de nomes de cavalos (geralmente 2-4 palavras)
-        if len(palavras_texto) > 5:
-            return False
-        
-        return True
+        return CLASSIFICADOR_NOMES.parece_nome(texto)
 
     # ============================================================
     # MÉTODOS AUXILIARES V2.0 - MELHORIAS BASEADAS EM SOUTHWELL
@@ -2863,57 +2106,65 @@ class ExtractorCavalos:
     
     def _converter_odds_para_numero(self, odds):
         """Converte odds para número decimal"""
-        try:
-            if isinstance(odds, (int, float)):
-                return float(odds)
-            if isinstance(odds, str):
-                if '/' in odds:  # Formato fracionário (ex: 5/1)
-                    partes = odds.split('/')
-                    return float(partes[0]) / float(partes[1]) + 1
-                else:
-                    return float(odds.replace('$', '').replace(',', ''))
-            return 5.0  # Default
-        except:
-            return 5.0
+        return odds_numericas(odds)
     
-    def _detectar_value_bet(self, score_combinado, odds_numericas):
+    def _detectar_value_bet(self, score_combinado, odds_numericas, modelo):
         """Detecta se é uma value bet (bom score + odds atrativas)"""
-        if score_combinado >= 7.0 and odds_numericas >= 4.0:
-            return True
-        return False
+        limites = modelo.limites
+        return score_combinado >= limites['value_bet_score'] and odds_numericas >= limites['value_bet_odds']
     
-    def _detectar_dark_horse(self, joquei_score, forma_score, odds_numericas):
+    def _detectar_dark_horse(self, joquei_score, forma_score, odds_numericas, modelo):
         """Detecta dark horses (potencial oculto)"""
-        if (joquei_score >= 7.0 or forma_score >= 7.0) and odds_numericas >= 8.0:
-            return True
-        return False
+        limites = modelo.limites
+        return ((joquei_score >= limites['dark_horse_score'] or forma_score >= limites['dark_horse_score'])
+                and odds_numericas >= limites['dark_horse_odds'])
     
-    def _calcular_bonus_outsider(self, odds_numericas):
+    def _calcular_bonus_outsider(self, odds_numericas, modelo):
         """Calcula bônus para outsiders com potencial"""
-        if odds_numericas >= 10.0:
-            return 2.0
-        elif odds_numericas >= 6.0:
-            return 1.5
-        return 1.0
+        return modelo.escadas['bonus_outsider'].pontuar(odds_numericas)
     
-    def _classificar_cavalo_v2(self, score_total, odds_numericas, is_value_bet, is_dark_horse):
+    def _classificar_cavalo_v2(self, score_total, odds_numericas, is_value_bet, is_dark_horse, modelo):
         """Classificação melhorada baseada em Southwell"""
+        limites = modelo.limites
         if is_value_bet:
-            return "🎯 VALUE BET"
+            return CATEGORIA_VALUE_BET
         elif is_dark_horse:
-            return "🌟 DARK HORSE"
-        elif score_total >= 8.5:
-            return "🏆 FAVORITO FORTE"
-        elif score_total >= 7.0:
-            return "⭐ BOM CANDIDATO"
-        elif score_total >= 5.5:
-            return "📊 OPÇÃO MODERADA"
+            return CATEGORIA_DARK_HORSE
+        elif score_total >= limites['favorito_forte']:
+            return CATEGORIA_FAVORITO_FORTE
+        elif score_total >= limites['bom_candidato']:
+            return CATEGORIA_BOM_CANDIDATO
+        elif score_total >= limites['opcao_moderada']:
+            return CATEGORIA_OPCAO_MODERADA
         else:
-            return "⚠️ RISCO ALTO"
+            return CATEGORIA_RISCO_ALTO
 
 # Instância global do extrator
 extrator = ExtractorCavalos()
 
+# Cache em memória dos resultados finais (LRU/TTL + single-flight)
+cache_resultados = CacheResultados()
+
+# Limites do endpoint de lote (reunião inteira = 7-8 corridas)
+LOTE_MAXIMO_URLS = int(os.environ.get('LOTE_MAXIMO_URLS', 20))
+LOTE_PARALELISMO = int(os.environ.get('LOTE_PARALELISMO', 4))
+
+async def _analisar_url_async(url, campos=None, termos=None):
+    """
+    Pipeline assíncrono: busca no loop do BuscadorAssincrono, parse e análise no executor
+    (com `campos`, só os fatores necessários para eles e para o ranking;
+    `termos`: termos each-way pedidos)
+    """
+    dados_extraidos = await extrator.extrair_dados_url_async(url)
+    
+    if 'erro' in dados_extraidos:
+        return {'erro': dados_extraidos.get('erro')}
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        extrator.executor, extrator.analisar_cavalos, dados_extraidos, campos, termos, canonicalizar_url(url)
+    )
+
 @app.route('/')
 def index():
     """Página principal"""
@@ -2929,9 +2180,24 @@ def serve_sw():
     """Serve o service worker"""
     return send_file('sw.js', mimetype='application/javascript')
 
+def _chave_resultado(url, campos=None, termos=None):
+    """
+    Chave do cache de resultados: URL canônica + versões do algoritmo, do
+    modelo de pontuação e do índice de jóqueis/treinadores (editar
+    modelo_pontuacao.json ou pessoas.json invalida os resultados) + os
+    campos calculados (None = análise completa) e os termos each-way
+    """
+    MODELO_PONTUACAO.recarregar_se_mudou()
+    INDICE_PESSOAS.recarregar_se_mudou()
+    return (
+        canonicalizar_url(url), ALGORITMO_VERSAO, MODELO_PONTUACAO.chave, INDICE_PESSOAS.versao,
+        None if campos is None else frozenset(campos),
+        None if termos is None else termos.chave,
+    )
+
 @app.route('/analisar', methods=['POST'])
-def analisar():
-    """Endpoint para análise de cavalos"""
+async def analisar():
+    """Endpoint para análise de cavalos (modo=compacto e campos=... reduzem a resposta)"""
     try:
         data = request.get_json()
         url = data.get('url')
@@ -2939,16 +2205,19 @@ def analisar():
         if not url:
             return jsonify({'erro': 'URL não fornecida'}), 400
         
-        logger.info(f"Recebida solicitação de análise para: {url}")
-        
-        # Extrair e analisar dados
-        dados_extraidos = extrator.extrair_dados_url(url)
+        try:
+            modo, campos = opcoes_projecao(data, request.args)
+            termos = opcoes_each_way(data, request.args)
+        except (ErroProjecao, ErroTermos) as e:
+            return jsonify({'erro': str(e)}), 400
         
-        if 'erro' in dados_extraidos:
-            return jsonify({'sucesso': False, 'erro': dados_extraidos.get('erro')}), 400
+        logger.info(f"Recebida solicitação de análise para: {url}")
         
-        # Analisar cavalos
-        resultado = extrator.analisar_cavalos(dados_extraidos)
+        # Extrair e analisar dados (requisições iguais simultâneas compartilham o cálculo)
+        chave = _chave_resultado(url, campos, termos)
+        resultado = await cache_resultados.obter_ou_calcular_async(
+            chave, lambda: _analisar_url_async(url, campos, termos), cachear=lambda r: 'erro' not in r
+        )
         
         if 'erro' in resultado:
             return jsonify({'sucesso': False, 'erro': resultado.get('erro')}), 400
@@ -2958,7 +2227,7 @@ def analisar():
         # Retornar no formato esperado pela interface
         response_data = {
             'sucesso': True,
-            'resultado': resultado
+            'resultado': projetar_resultado(resultado, modo, campos)
         }
         
         # Adicionar cabeçalhos para evitar cache
@@ -2972,9 +2241,229 @@ def analisar():
         logger.error(f"Erro na análise: {str(e)}")
         return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
 
-if __name__ == '__main__':
-    import os
+async def _analisar_url_em_lote(semaforo, indice, url, campos=None, termos=None):
+    """
+    Analisa uma URL do lote respeitando o limite de paralelismo
+    """
+    async with semaforo:
+        chave = _chave_resultado(url, campos, termos)
+        resultado = await cache_resultados.obter_ou_calcular_async(
+            chave, lambda: _analisar_url_async(url, campos, termos), cachear=lambda r: 'erro' not in r
+        )
+    return indice, url, resultado
+
+@app.route('/analisar/lote', methods=['POST'])
+def analisar_lote():
+    """
+    Analisa várias URLs em paralelo e envia cada corrida (NDJSON) assim que termina
+    """
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'erro': 'Lista de URLs não fornecida'}), 400
+    
+    try:
+        modo, campos = opcoes_projecao(data, request.args)
+        termos = opcoes_each_way(data, request.args)
+    except (ErroProjecao, ErroTermos) as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    # Remover vazias e duplicadas mantendo a ordem
+    urls_unicas = []
+    vistas = set()
+    for url in urls:
+        if not isinstance(url, str) or not url.strip():
+            continue
+        chave = canonicalizar_url(url)
+        if chave not in vistas:
+            vistas.add(chave)
+            urls_unicas.append(url.strip())
     
+    if not urls_unicas:
+        return jsonify({'erro': 'Nenhuma URL válida fornecida'}), 400
+    if len(urls_unicas) > LOTE_MAXIMO_URLS:
+        return jsonify({'erro': f'Máximo de {LOTE_MAXIMO_URLS} URLs por lote'}), 400
+    
+    try:
+        paralelismo = max(1, min(int(data.get('paralelismo', LOTE_PARALELISMO)), LOTE_PARALELISMO))
+    except (TypeError, ValueError):
+        paralelismo = LOTE_PARALELISMO
+    
+    logger.info(f"Recebido lote de {len(urls_unicas)} URLs (paralelismo {paralelismo})")
+    
+    # As buscas rodam no loop do buscador assíncrono; o gerador só aguarda os resultados
+    semaforo = asyncio.Semaphore(paralelismo)
+    futuros = [
+        extrator.buscador_async.agendar(_analisar_url_em_lote(semaforo, i, url, campos, termos))
+        for i, url in enumerate(urls_unicas)
+    ]
+    
+    def gerar():
+        inicio = time.time()
+        erros = 0
+        try:
+            for futuro in as_completed(futuros):
+                try:
+                    indice, url, resultado = futuro.result()
+                except Exception as e:
+                    erros += 1
+                    logger.error(f"Erro no lote: {str(e)}")
+                    linha = {'sucesso': False, 'erro': f'Erro interno do servidor: {str(e)}'}
+                else:
+                    if 'erro' in resultado:
+                        erros += 1
+                        linha = {'indice': indice, 'url': url, 'sucesso': False, 'erro': resultado.get('erro')}
+                    else:
+                        linha = {'indice': indice, 'url': url, 'sucesso': True,
+                                 'resultado': projetar_resultado(resultado, modo, campos)}
+                yield json.dumps(linha, ensure_ascii=False, default=str) + '\n'
+            
+            yield json.dumps({
+                'concluido': True,
+                'total': len(futuros),
+                'erros': erros,
+                'tempo_ms': round((time.time() - inicio) * 1000)
+            }) + '\n'
+        finally:
+            # Cliente desconectou: cancelar o que ainda não terminou
+            for futuro in futuros:
+                futuro.cancel()
+    
+    response = Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/exoticas', methods=['POST'])
+async def exoticas():
+    """
+    Forecasts e tricasts de uma corrida ordenados por valor esperado
+    (dividendos informados ou estimados pelas odds com a margem pedida)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        url = data.get('url')
+        
+        if not url:
+            return jsonify({'erro': 'URL não fornecida'}), 400
+        
+        chave = _chave_resultado(url)
+        resultado = await cache_resultados.obter_ou_calcular_async(
+            chave, lambda: _analisar_url_async(url), cachear=lambda r: 'erro' not in r
+        )
+        
+        if 'erro' in resultado:
+            return jsonify({'sucesso': False, 'erro': resultado.get('erro')}), 400
+        
+        try:
+            precos = exoticas_resultado(
+                resultado,
+                tipo=data.get('tipo', FORECAST),
+                margem=data.get('margem', MARGEM_EXOTICAS),
+                dividendos=data.get('dividendos'),
+                limite=data.get('limite', LIMITE_EXOTICAS),
+            )
+        except ErroExoticas as e:
+            return jsonify({'erro': str(e)}), 400
+        
+        # Modelo de pontuação da análise usada e modelo de colocação das ordens
+        return jsonify({
+            'sucesso': True,
+            'titulo_corrida': resultado['dados'].get('titulo_corrida'),
+            'modelo': resultado['modelo'],
+            'modelo_colocacao': precos['modelo'],
+            'exoticas': precos,
+        })
+        
+    except Exception as e:
+        logger.error(f"Erro nas exóticas: {str(e)}")
+        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
+
+@app.route('/carteira', methods=['POST'])
+async def carteira():
+    """
+    Apostas do dia por Kelly fracionário: junta os value bets de todas as
+    corridas pedidas e divide a banca respeitando os limites de exposição
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        urls = data.get('urls')
+        
+        if not isinstance(urls, list) or not urls:
+            return jsonify({'erro': 'Lista de URLs não fornecida'}), 400
+        
+        try:
+            opcoes = opcoes_carteira(data)
+        except ErroCarteira as e:
+            return jsonify({'erro': str(e)}), 400
+        
+        urls_unicas = list(dict.fromkeys(url.strip() for url in urls if isinstance(url, str) and url.strip()))
+        if not urls_unicas:
+            return jsonify({'erro': 'Nenhuma URL válida fornecida'}), 400
+        if len(urls_unicas) > LOTE_MAXIMO_URLS:
+            return jsonify({'erro': f'Máximo de {LOTE_MAXIMO_URLS} URLs por carteira'}), 400
+        
+        resultados = await asyncio.gather(*(
+            cache_resultados.obter_ou_calcular_async(
+                _chave_resultado(url), lambda url=url: _analisar_url_async(url), cachear=lambda r: 'erro' not in r
+            )
+            for url in urls_unicas
+        ))
+        
+        selecoes = []
+        erros = []
+        # Sem nenhuma corrida analisada, o modelo atual (o que a chave do cache usou)
+        atual = MODELO_PONTUACAO.atual
+        modelo = {'nome': atual.nome, 'versao': atual.versao}
+        for url, resultado in zip(urls_unicas, resultados):
+            if 'erro' in resultado:
+                erros.append({'url': url, 'erro': resultado.get('erro')})
+            else:
+                selecoes.extend(selecoes_resultado(resultado, url))
+                # As análises da carteira saem da mesma chave de modelo
+                modelo = resultado['modelo']
+        
+        return jsonify({
+            'sucesso': True, 'modelo': modelo, 'carteira': montar_carteira(selecoes, **opcoes), 'erros': erros,
+        })
+        
+    except Exception as e:
+        logger.error(f"Erro na carteira: {str(e)}")
+        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
+
+@app.route('/cache/estatisticas')
+def estatisticas_cache():
+    """Contadores do cache de resultados (acertos, falhas, bytes) e das reanálises"""
+    return jsonify({**cache_resultados.estatisticas(), 'reanalise': extrator.estados_corrida.estatisticas()})
+
+@app.route('/modelo')
+def modelo_pontuacao():
+    """Modelo de pontuação em uso (versão, pesos, escadas e limites)"""
+    return jsonify(MODELO_PONTUACAO.atual.resumo())
+
+@app.route('/modelo/recarregar', methods=['POST'])
+def recarregar_modelo():
+    """Relê o arquivo do modelo de pontuação sem reiniciar o servidor"""
+    try:
+        trocado = MODELO_PONTUACAO.carregar()
+        modelo = MODELO_PONTUACAO.atual
+        return jsonify({'sucesso': True, 'recarregado': trocado, 'nome': modelo.nome, 'versao': modelo.versao})
+    except Exception as e:
+        logger.error(f"Erro ao recarregar o modelo de pontuação: {str(e)}")
+        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
+
+@app.route('/pessoas/recarregar', methods=['POST'])
+def recarregar_pessoas():
+    """Relê o arquivo de jóqueis/treinadores sem reiniciar o servidor"""
+    try:
+        trocado = INDICE_PESSOAS.carregar()
+        return jsonify({'sucesso': True, 'recarregado': trocado, **INDICE_PESSOAS.resumo()})
+    except Exception as e:
+        logger.error(f"Erro ao recarregar jóqueis/treinadores: {str(e)}")
+        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
+
+if __name__ == '__main__':
     # Usar porta do ambiente (para hospedagem online) ou 5001 (local)
     port = int(os.environ.get('PORT', 5001))
     
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arquivo JSON de configuração lido uma vez e relido quando muda no disco
+
+Base do índice de jóqueis/treinadores (indice_pessoas.py) e do modelo de
+pontuação (modelo_pontuacao.py). A subclasse monta o objeto a partir do JSON
+(_montar) e o publica (_aplicar) trocando uma única referência, de modo que
+quem está lendo nunca vê um estado pela metade. Um arquivo inválido é
+registrado no log e o conteúdo anterior continua valendo.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ArquivoRecarregavel:
+    """
+    Carga e recarga (por data de modificação) de um arquivo JSON
+    """
+    descricao = 'arquivo'
+
+    def __init__(self, caminho, intervalo_verificacao):
+        self.caminho = caminho
+        self.intervalo_verificacao = intervalo_verificacao
+        # Hash do conteúdo carregado (muda a cada edição do arquivo)
+        self.versao_arquivo = 'vazio'
+        self._estado = None
+        self._verificado_em = 0.0
+        self._trava = threading.Lock()
+
+    def _montar(self, config):
+        raise NotImplementedError
+
+    def _aplicar(self, montado, config):
+        raise NotImplementedError
+
+    def _estado_arquivo(self):
+        try:
+            estado = os.stat(self.caminho)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def carregar(self):
+        """
+        Lê e publica o arquivo; retorna True se o conteúdo foi trocado
+        """
+        with self._trava:
+            self._verificado_em = time.monotonic()
+            self._estado = self._estado_arquivo()
+            try:
+                with open(self.caminho, 'rb') as f:
+                    conteudo = f.read()
+                config = json.loads(conteudo)
+                montado = self._montar(config)
+            except FileNotFoundError:
+                logger.warning(f"Arquivo de {self.descricao} não encontrado: {self.caminho}")
+                return False
+            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                logger.error(f"Arquivo de {self.descricao} inválido ({self.caminho}): {str(e)}")
+                return False
+
+            self.versao_arquivo = hashlib.sha1(conteudo).hexdigest()[:12]
+            self._aplicar(montado, config)
+            return True
+
+    def recarregar_se_mudou(self):
+        """
+        Recarrega se o arquivo mudou desde a última carga (verificação limitada
+        a uma a cada intervalo_verificacao segundos)
+        """
+        if time.monotonic() - self._verificado_em < self.intervalo_verificacao:
+            return False
+        self._verificado_em = time.monotonic()
+        if self._estado_arquivo() == self._estado:
+            return False
+        return self.carregar()
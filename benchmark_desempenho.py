@@ -0,0 +1,915 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de desempenho do extrator e do motor de análise
+
+Uso:
+    python benchmark_desempenho.py                 # todas as seções
+    python benchmark_desempenho.py parse           # só o parse do HTML
+    python benchmark_desempenho.py parse --paginas paginas_salvas/
+
+Sem --paginas são usadas páginas sintéticas com a estrutura de cada fonte
+(bloco de corredores + rodapé/scripts grandes, como nas páginas reais).
+Com --paginas, cada arquivo <fonte>*.html do diretório (ex.: racingpost_1.html)
+é usado no lugar da página sintética daquela fonte.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import gzip
+import argparse
+import random
+import statistics
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+logging.disable(logging.CRITICAL)
+
+import app  # noqa: E402
+from filtros_html import criar_soup  # noqa: E402
+from extracao_declarativa import analisar_html  # noqa: E402
+from parser_incremental import ParserIncremental  # noqa: E402
+from classificador_nomes import ClassificadorNomes, PALAVRAS_EXCLUIR  # noqa: E402
+from dados_embutidos import extrair_dados_embutidos  # noqa: E402
+from motor_vetorizado import colunas_corredores, pontuar  # noqa: E402
+from forma import analisar_forma, tokenizar_forma, TokenizadorForma  # noqa: E402
+from corredor import Corredor  # noqa: E402
+from odds import converter_odds, ESCADA_FRACIONARIA  # noqa: E402
+from indice_pessoas import INDICE_PESSOAS, JOQUEI  # noqa: E402
+from projecao_resposta import MODO_COMPLETO, MODO_COMPACTO, projetar_resultado  # noqa: E402
+from probabilidades import (  # noqa: E402
+    probabilidades_vitoria, pontuacoes_resultado, simular_chegadas, SimulacaoCorrida,
+)
+from colocacao import MODELOS as MODELOS_COLOCACAO, MODELO_HARVILLE, probabilidades_posicao  # noqa: E402
+from exoticas import TIPOS as TIPOS_EXOTICAS, precificar_exoticas  # noqa: E402
+from carteira_kelly import otimizar_carteira  # noqa: E402
+
+NOMES = [
+    'Earl Of Rochester', 'Miss Cartesian', "Moe's Legacy", 'Golden Arrow', 'Silver Bullet',
+    'Royal Champion', 'Wind Runner', 'Fire Storm', 'Night Raider', 'Blue Lagoon',
+    'Sea The Moon', 'Dark Angel', 'Happy Power', 'Kingman Rose'
+]
+JOQUEIS = ['R Moore', 'W Buick', 'Oisin Murphy', 'J Doyle', 'T Marquand']
+TREINADORES = ['A P O\'Brien', 'J H M Gosden', 'W P Mullins']
+
+URLS_FONTES = {
+    'racingpost': 'https://www.racingpost.com/racecards/1/ascot/2025-01-01/1',
+    'attheraces': 'https://www.attheraces.com/racecard/ascot/1-january-2025/1430',
+    'timeform': 'https://www.timeform.com/horse-racing/racecards/ascot/2025-01-01/1430',
+    'sportinglife': 'https://www.sportinglife.com/racing/racecards/2025-01-01/ascot/1',
+    'oddschecker': 'https://www.oddschecker.com/horse-racing/ascot/14:30/winner',
+    'betfair': 'https://www.betfair.com/exchange/plus/horse-racing/market/1.2345',
+    'generico': 'https://exemplo.com/corrida',
+}
+
+
+# ----------------------------------------------------------------------
+# Páginas sintéticas
+# ----------------------------------------------------------------------
+
+def _rodape(itens=400):
+    noticias = '\n'.join(
+        f'<div class="footer-item">\n<a href="/news/{i}">News item {i} Today Tips</a>\n'
+        f'<span class="tag">Racing Tips</span>\n<span class="more">Read More</span>\n'
+        f'<p>Lorem ipsum dolor sit amet {i}, consectetur adipiscing elit.</p></div>'
+        for i in range(itens)
+    )
+    return f'<footer>{noticias}</footer><script>window.__DADOS__ = "{"x" * 60000}";</script>'
+
+
+def _corredor(fonte, i, nome):
+    joquei = JOQUEIS[i % len(JOQUEIS)]
+    if fonte == 'racingpost':
+        return (
+            f'<div class="RC-runnerRow js-runnerRow" data-diffusion-horsename="{nome}">'
+            f'<span class="RC-runnerNumber__no">{i + 1}</span>'
+            f'<a class="RC-runnerName" href="/profile/horse/{i}/x">{nome} (IRE)</a>'
+            f'<a class="RC-runnerInfo__name" data-order-jockey="{joquei}" href="/j">J</a>'
+            f'<a data-order-trainer="{TREINADORES[i % 3]}" href="/t">T</a>'
+            f'<span class="RC-runnerWgt__carried">9-{i % 14}</span>'
+            f'<span class="RC-runnerOr">{70 + i}</span>'
+            f'<span class="RC-runnerPrice">{i + 2}/1</span></div>'
+        )
+    if fonte == 'attheraces':
+        return f'<tr class="runner"><td>{i + 1}</td><td><a href="/form/horse/{i}">{i + 1} {nome} (GB)</a></td><td>{joquei}</td></tr>'
+    if fonte == 'timeform':
+        return (
+            f'<div class="tf-runner"><a class="rp-horse" href="/h/{i}">{nome}</a>'
+            f'<span class="jockey">{joquei}</span><span class="price">{i + 3}/2</span>'
+            f'<span class="wt">9-{i}</span><span class="rating">{80 + i}</span></div>'
+        )
+    if fonte == 'sportinglife':
+        return f'<tr><td>{i + 1}</td><td>{nome}</td><td>{joquei}</td><td>{i + 2}/1</td><td>9-{i}</td></tr>'
+    if fonte == 'oddschecker':
+        return f'<tr class="diff-row runner"><td><a href="/h/{i}">{nome}</a></td><td><span class="odds">{i + 2}/1</span></td></tr>'
+    if fonte == 'betfair':
+        return f'<div class="runner-line"><span class="runner-name">{nome}</span><span class="back-price">{i + 2.5}</span></div>'
+    return f'<li class="horse-item"><span class="horse-name">{nome}</span></li>'
+
+
+def _next_data(corredores):
+    runners = [
+        {'horseName': NOMES[i % len(NOMES)], 'jockeyName': JOQUEIS[i % len(JOQUEIS)],
+         'trainerName': TREINADORES[i % 3], 'odds': {'fractional': f'{i + 2}/1'},
+         'weight': {'stones': 9, 'pounds': i % 14}, 'officialRating': 70 + i, 'draw': i + 1}
+        for i in range(corredores)
+    ]
+    dados = {'props': {'pageProps': {'race': {'raceName': '14:30 Ascot', 'runners': runners}}}}
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(dados)}</script>'
+
+
+def gerar_pagina(fonte, corredores=12, itens_rodape=400, embutido=False):
+    """
+    Página sintética de uma fonte: cabeçalho, bloco de corredores e rodapé grande.
+    Com `embutido`, os mesmos corredores também vão num __NEXT_DATA__ no fim do body.
+    """
+    # Um elemento por linha, como no HTML servido pelos sites
+    linhas = '\n'.join(_corredor(fonte, i, NOMES[i % len(NOMES)]) for i in range(corredores))
+    if fonte in ('attheraces', 'oddschecker'):
+        bloco = f'<table class="racecard">{linhas}</table>'
+    elif fonte == 'sportinglife':
+        bloco = f'<p>Going: Good to Firm</p><table><tr><th>No</th><th>Horse</th></tr>{linhas}</table>'
+    elif fonte == 'generico':
+        bloco = f'<ul>{linhas}</ul>'
+    else:
+        bloco = f'<div class="racecard-body">{linhas}</div>'
+    menu = '\n'.join(f'<li><a href="/menu/{i}">Menu {i}</a></li>' for i in range(150))
+    html = (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>14:30 Ascot</title></head>'
+        f'<body><nav><ul>{menu}</ul></nav><h1>14:30 Ascot</h1>{bloco}{_rodape(itens_rodape)}'
+        f'{_next_data(corredores) if embutido else ""}</body></html>'
+    )
+    return html.encode('utf-8')
+
+
+def carregar_paginas(diretorio=None):
+    """
+    fonte -> lista de páginas (bytes). Arquivos salvos substituem as sintéticas
+    """
+    paginas = {fonte: [gerar_pagina(fonte)] for fonte in URLS_FONTES}
+    if diretorio:
+        for fonte in URLS_FONTES:
+            salvas = sorted(
+                os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                if nome.startswith(fonte) and nome.endswith('.html')
+            )
+            if salvas:
+                paginas[fonte] = [open(caminho, 'rb').read() for caminho in salvas]
+    return paginas
+
+
+# ----------------------------------------------------------------------
+# Utilidades de medição
+# ----------------------------------------------------------------------
+
+# Conferências que falharam nesta execução (código de saída de main)
+FALHAS = []
+
+
+def medir(funcao, repeticoes=5):
+    """
+    Retorna (mediana do tempo em ms, pico de memória em KB, último resultado).
+    O pico vem do tracemalloc: só alocações Python (a árvore C do lxml não entra).
+    """
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempos), pico / 1024, resultado
+
+
+def conferir(correto, descricao):
+    """
+    'sim'/'NÃO' para a tabela; a falha fica registrada e main() retorna 1
+    """
+    if not correto:
+        FALHAS.append(descricao)
+    return 'sim' if correto else 'NÃO'
+
+
+def _filtro_da_fonte(url):
+    for dominio, nome_extrator, filtro in app.EXTRATORES_SITE:
+        if dominio in url:
+            return nome_extrator, filtro
+    return '_extrair_generico', None
+
+
+def _nomes(dados):
+    return sorted(c.get('nome') for c in (dados or {}).get('cavalos', []))
+
+
+def _variantes_parse(url, conteudo):
+    """
+    (rótulo, função) de cada forma de extrair a página da fonte
+    """
+    especificacao = app.extrator.especificacoes.para_url(url)
+    if especificacao:
+        def incremental():
+            parser = ParserIncremental(especificacao.e_container, especificacao.extrair_corredor)
+            parser.alimentar_tudo(conteudo)
+            return especificacao.montar_dados(parser.registros, parser.titulo)
+
+        return [
+            ('bs4 html.parser (só o parse)', lambda: criar_soup(conteudo, None, 'html.parser')),
+            ('especificação lxml XPath', lambda: especificacao.extrair_documento(analisar_html(conteudo))),
+            ('especificação incremental', incremental),
+        ]
+
+    nome_extrator, filtro = _filtro_da_fonte(url)
+    extrair = getattr(app.extrator, nome_extrator)
+    variantes = [
+        ('bs4 html.parser', lambda: extrair(criar_soup(conteudo, None, 'html.parser'), url)),
+        ('bs4 lxml', lambda: extrair(criar_soup(conteudo, None, 'lxml'), url)),
+    ]
+    if filtro is not None:
+        variantes.append(('bs4 lxml + filtro', lambda: extrair(criar_soup(conteudo, filtro, 'lxml'), url)))
+    return variantes
+
+
+# ----------------------------------------------------------------------
+# Seções
+# ----------------------------------------------------------------------
+
+def benchmark_parse(paginas, repeticoes):
+    """
+    Parse + extração por fonte. Fontes com especificação declarativa: XPath na
+    árvore lxml e parse incremental (o parse bs4 puro fica como referência).
+    Demais fontes: html.parser x lxml x lxml com o filtro do extrator.
+    Confere que todas as variantes extraem os mesmos nomes.
+    """
+    print('\n== Parse do HTML por fonte (mediana em ms / pico de memória em KB) ==')
+    print(f"{'fonte':<14}{'KB':>6}  {'variante':<30}{'ms':>9}{'KB pico':>10}  cavalos")
+    for fonte, lista in paginas.items():
+        url = URLS_FONTES[fonte]
+        for conteudo in lista:
+            nomes = set()
+            for rotulo, funcao in _variantes_parse(url, conteudo):
+                ms, kb, resultado = medir(funcao, repeticoes)
+                if isinstance(resultado, dict) or resultado is None:
+                    nomes.add(tuple(_nomes(resultado)))
+                    cavalos = len((resultado or {}).get('cavalos', []))
+                else:
+                    cavalos = '-'
+                print(f'{fonte:<14}{len(conteudo) / 1024:>6.0f}  {rotulo:<30}{ms:>9.1f}{kb:>10.0f}  {cavalos}')
+            if len(nomes) > 1:
+                print(f'{fonte:<14}ATENÇÃO: variantes extraíram cavalos diferentes')
+
+
+def benchmark_generico(paginas, repeticoes):
+    """
+    Seletores da extração genérica: um soup.select() por padrão x casador de
+    uma passada. Confere que cada padrão casa exatamente os mesmos elementos.
+    """
+    print('\n== Seletores da extração genérica (mediana em ms) ==')
+    print(f"{'fonte':<14}{'nós':>7}  {'select x padrões':>17}{'uma passada':>13}  iguais")
+    for fonte, lista in paginas.items():
+        for conteudo in lista:
+            soup = criar_soup(conteudo)
+            nos = sum(1 for _ in soup.find_all(True))
+
+            def por_padrao():
+                return [soup.select(padrao) for padrao in app.PADROES_CAVALOS_GENERICO]
+
+            ms_select, _, selecionados = medir(por_padrao, repeticoes)
+            ms_casador, _, candidatos = medir(lambda: app.CASADOR_GENERICO.casar(soup), repeticoes)
+
+            iguais = all(
+                [id(e) for e in esperados] == [id(e) for e, regras in candidatos if regra in regras]
+                for regra, esperados in zip(app.CASADOR_GENERICO.regras, selecionados)
+            )
+            print(f'{fonte:<14}{nos:>7}  {ms_select:>17.1f}{ms_casador:>13.1f}  '
+                  f'{conferir(iguais, f"generico: seletores de {fonte}")}')
+
+
+def _parece_nome_por_chamada(texto):
+    """
+    Classificação antiga, linha a linha: tabela de palavras montada a cada chamada
+    """
+    if not texto or len(texto) < 3 or len(texto) > 35:
+        return False
+    if sum(c.isdigit() for c in texto) > len(texto) * 0.2:
+        return False
+    if not any(c.isalpha() for c in texto):
+        return False
+    palavras_excluir = set(PALAVRAS_EXCLUIR)
+    texto_lower = texto.lower()
+    if texto_lower in palavras_excluir:
+        return False
+    palavras_texto = texto_lower.split()
+    if any(palavra in palavras_excluir for palavra in palavras_texto):
+        return False
+    if '@' in texto or 'http' in texto or 'www.' in texto or ':' in texto:
+        return False
+    if not any(c.isupper() for c in texto):
+        return False
+    if len(palavras_texto) == 1 and len(texto) < 6:
+        return False
+    return len(palavras_texto) <= 5
+
+
+def benchmark_nomes(paginas, repeticoes):
+    """
+    Fallback por texto da extração genérica: cada linha de soup.get_text()
+    classificada por chamada x classificador pré-compilado em lote (com e sem
+    a memória de linhas já vistas). Confere que os nomes aceitos são os mesmos.
+    """
+    print('\n== Classificação de linhas como nomes de cavalos (mediana em ms) ==')
+    print(f"{'fonte':<14}{'linhas':>8}{'únicas':>8}  {'por chamada':>12}{'lote frio':>11}{'lote memo':>11}  iguais")
+    for fonte, lista in paginas.items():
+        for conteudo in lista:
+            texto = criar_soup(conteudo).get_text()
+            linhas = texto.split('\n')
+            unicas = len({linha.strip() for linha in linhas})
+
+            def por_chamada():
+                nomes = set()
+                for linha in linhas:
+                    linha = linha.strip()
+                    if linha and 2 < len(linha) < 50 and _parece_nome_por_chamada(linha):
+                        nomes.add(linha)
+                return nomes
+
+            def lote_frio():
+                return ClassificadorNomes().nomes_no_texto(texto)
+
+            classificador = ClassificadorNomes()
+            ms_chamada, _, esperados = medir(por_chamada, repeticoes)
+            ms_frio, _, nomes = medir(lote_frio, repeticoes)
+            ms_memo, _, _ = medir(lambda: classificador.nomes_no_texto(texto), repeticoes)
+            iguais = set(nomes) == esperados
+            print(f'{fonte:<14}{len(linhas):>8}{unicas:>8}  {ms_chamada:>12.1f}{ms_frio:>11.1f}{ms_memo:>11.1f}'
+                  f'  {conferir(iguais, f"nomes: linhas de {fonte}")}')
+
+
+def benchmark_embutidos(paginas, repeticoes):
+    """
+    Dados embutidos: custo da varredura de bytes em páginas sem bloco JSON (o
+    que toda página paga antes do scraping) e, na mesma página com um
+    __NEXT_DATA__, leitura do JSON x scraping do HTML. Confere que o JSON dá
+    exatamente os corredores da página.
+    """
+    print('\n== Dados embutidos x scraping do HTML (mediana em ms) ==')
+    print(f"{'fonte':<14}{'varredura sem bloco':>20}{'JSON embutido':>15}{'scraping':>10}{'cavalos':>9}  JSON correto")
+    esperados = sorted(NOMES[i % len(NOMES)] for i in range(12))
+    for fonte in paginas:
+        url = URLS_FONTES[fonte]
+        sem_bloco = gerar_pagina(fonte)
+        com_bloco = gerar_pagina(fonte, embutido=True)
+        especificacao = app.extrator.especificacoes.para_url(url)
+        if especificacao:
+            def scraping():
+                return especificacao.extrair_documento(analisar_html(sem_bloco))
+        else:
+            nome_extrator, filtro = _filtro_da_fonte(url)
+            extrair = getattr(app.extrator, nome_extrator)
+
+            def scraping():
+                return extrair(criar_soup(sem_bloco, filtro), url)
+
+        ms_varredura, _, nada = medir(lambda: extrair_dados_embutidos(sem_bloco), repeticoes)
+        ms_json, _, embutidos = medir(lambda: extrair_dados_embutidos(com_bloco), repeticoes)
+        ms_scraping, _, extraidos = medir(scraping, repeticoes)
+        corretos = nada is None and _nomes(embutidos) == esperados
+        cavalos = len((extraidos or {}).get('cavalos', []))
+        print(f'{fonte:<14}{ms_varredura:>20.2f}{ms_json:>15.2f}{ms_scraping:>10.1f}{cavalos:>9}'
+              f'  {conferir(corretos, f"embutidos: {fonte}")}')
+
+
+def _pontuacao_na_extracao(dados):
+    """
+    Reproduz o ranking que os extratores faziam antes de devolver os corredores
+    (pontuação, ranking comparativo e grupos), depois refeitos por analisar_cavalos
+    """
+    extrator = app.extrator
+    analises = [extrator._analisar_cavalo_individual(cavalo, i + 1) for i, cavalo in enumerate(dados['cavalos'])]
+    analises = sorted(
+        extrator._aplicar_ranking_comparativo(analises, dados['cavalos']),
+        key=lambda x: x.get('pontuacao_final_ajustada', x.get('pontuacao_final', 0)), reverse=True
+    )
+    for i, analise in enumerate(analises):
+        analise['posicao_final'] = i + 1
+        analise['percentil'] = ((len(analises) - i) / len(analises)) * 100
+    dados['cavalos'] = extrator._identificar_grupos_performance(analises)
+    return dados
+
+
+def _pontuacoes(analises):
+    return {analise['nome']: analise.get('pontuacao_final_ajustada') for analise in analises}
+
+
+def benchmark_pontuacao(paginas, repeticoes):
+    """
+    CPU por requisição (extração + análise) com a pontuação feita duas vezes
+    (na extração e em analisar_cavalos) x uma vez só. Confere que cada cavalo
+    termina com a pontuação que a extração dava, com os cavalos na ordem da
+    página (a segunda pontuação antiga refazia tudo na ordem do ranking, o que
+    mudava a posição de quem não tem draw)
+    """
+    print('\n== Pontuação dupla x única por requisição (mediana em ms) ==')
+    print(f"{'fonte':<14}{'dupla':>9}{'única':>9}{'economia':>10}  mesmas pontuações")
+    for fonte, lista in paginas.items():
+        url = URLS_FONTES[fonte]
+        for conteudo in lista:
+            def unica():
+                return app.extrator.analisar_cavalos(app.extrator.extrair_dados_html(conteudo, url))
+
+            def dupla():
+                dados = _pontuacao_na_extracao(app.extrator.extrair_dados_html(conteudo, url))
+                na_extracao = _pontuacoes(dados['cavalos'])
+                return na_extracao, app.extrator.analisar_cavalos(dados)
+
+            ms_dupla, _, (antes, _) = medir(dupla, repeticoes)
+            ms_unica, _, depois = medir(unica, repeticoes)
+
+            iguais = antes == _pontuacoes(depois.get('dados', {}).get('analises', []))
+            economia = (1 - ms_unica / ms_dupla) * 100 if ms_dupla else 0
+            print(f'{fonte:<14}{ms_dupla:>9.1f}{ms_unica:>9.1f}{economia:>9.0f}%  '
+                  f'{conferir(iguais, f"pontuacao: {fonte}")}')
+
+
+def _campos_sinteticos(corridas, corredores=12, semente=7):
+    """
+    Corridas com cavalos variados (odds, forma, peso, OR, idade, draw e
+    estatísticas de jóquei/treinador, inclusive valores ausentes ou inválidos)
+    """
+    sorteio = random.Random(semente)
+    odds = ['5/2', '11/4', '7/1', '20/1', '1/2', 'Evens', '3.5', 'N/A', 'SP', '100/30', '33/1', '5/0']
+    formas = ['1121', '321', 'P-4123', '6543', '0/21', '', '2F1', '11', '54321', '1-12', '9870']
+    campos = []
+    for r in range(corridas):
+        cavalos = []
+        for i in range(corredores):
+            cavalo = {
+                'nome': f'{NOMES[i % len(NOMES)]} {r}-{i}',
+                'joquei': sorteio.choice(JOQUEIS + ['Desconhecido', 'N/A', 'Jo Lee']),
+                'treinador': sorteio.choice(TREINADORES + ['Desconhecido', 'K Ryan']),
+                'odds': sorteio.choice(odds),
+                'peso': sorteio.choice(['9-4', '8-7', '10-2', '9-13', 'N/A', '60kg']),
+                'idade': sorteio.choice(['3', '4', '5yo', '7', '10', 'N/A']),
+                'forma': sorteio.choice(formas),
+                'official_rating': sorteio.choice(['45', '69', '85', '102', 'N/A', '']),
+            }
+            if sorteio.random() < 0.7:
+                cavalo['draw'] = sorteio.choice([1, 3, 7, 10, 14, 'N/A'])
+            if sorteio.random() < 0.3:
+                cavalo['joquei_stats'] = {'win_percentage': sorteio.choice([3, 12, 22, 27]), 'rides': sorteio.choice([30, 300, 900])}
+            if sorteio.random() < 0.3:
+                cavalo['treinador_stats'] = {'win_percentage': sorteio.choice([8, 17, 26, 31]), 'runs': sorteio.choice([50, 600, 1500])}
+            cavalos.append(cavalo)
+        campos.append(cavalos)
+    return campos
+
+
+def benchmark_vetorizado(paginas, repeticoes):
+    """
+    Cavalos por segundo: cálculo por cavalo (analisar_cavalos) x motor
+    vetorizado (montagem das colunas e pontuação). Confere bit a bit
+    pontuacao_final, score_total, categoria_v2, is_value_bet e is_dark_horse.
+    """
+    print('\n== Motor por cavalo x vetorizado ==')
+    extrator = app.extrator
+    campos = _campos_sinteticos(500)
+    total = sum(len(cavalos) for cavalos in campos)
+
+    def por_cavalo():
+        return [extrator.analisar_cavalos({'cavalos': cavalos}) for cavalos in campos]
+
+    ms_por_cavalo, _, resultados = medir(por_cavalo, repeticoes)
+    ms_colunas, _, colunas = medir(lambda: colunas_corredores(campos), repeticoes)
+    ms_pontuar, _, pontuados = medir(lambda: pontuar(colunas), repeticoes)
+
+    # Lote grande (histórico já tabulado): só a pontuação
+    grande = pd.concat([colunas] * 100, ignore_index=True)
+    ms_grande, _, _ = medir(lambda: pontuar(grande), max(1, repeticoes // 2))
+
+    pontuados = pd.concat([colunas[['corrida', 'nome']], pontuados], axis=1).set_index(['corrida', 'nome'])
+    diferencas = 0
+    for corrida, resultado in enumerate(resultados):
+        for analise in resultado['dados']['analises']:
+            linha = pontuados.loc[(corrida, analise['nome'])]
+            for campo in ('pontuacao_final', 'score_total'):
+                diferencas += float(analise[campo]).hex() != float(linha[campo]).hex()
+            for campo in ('categoria_v2', 'is_value_bet', 'is_dark_horse'):
+                diferencas += analise[campo] != linha[campo]
+
+    def por_segundo(cavalos, ms):
+        return f'{cavalos / ms * 1000:>14,.0f}'
+
+    print(f"{'etapa':<40}{'ms':>9}{'cavalos/s':>14}")
+    print(f"{'por cavalo (analisar_cavalos)':<40}{ms_por_cavalo:>9.1f}{por_segundo(total, ms_por_cavalo)}")
+    print(f"{'vetorizado: colunas_corredores':<40}{ms_colunas:>9.1f}{por_segundo(total, ms_colunas)}")
+    print(f"{'vetorizado: pontuar':<40}{ms_pontuar:>9.1f}{por_segundo(total, ms_pontuar)}")
+    print(f"{f'vetorizado: pontuar ({len(grande):,} cavalos)':<40}{ms_grande:>9.1f}{por_segundo(len(grande), ms_grande)}")
+    print(f'Resultados idênticos ({total} cavalos): {conferir(not diferencas, "vetorizado: resultados")}'
+          + (f' ({diferencas} diferenças)' if diferencas else ''))
+
+
+def _forma_por_caractere(forma):
+    """
+    Os números da forma como cada fator calculava antes do tokenizador: uma
+    varredura da string por fator (pontos, momentum qualitativo, contexto,
+    tendências de peso/OR, performance do jóquei, consistência, momentum, pista)
+    """
+    if not forma:
+        return None
+    pontos = 0
+    for i, c in enumerate(forma[:5]):
+        pontos += {'1': 10, '2': 8, '3': 6, '4': 4, '5': 2}.get(c, 0) * (1.0, 0.7, 0.5, 0.3, 0.2)[i]
+    recente = forma[:3]
+    try:
+        tendencia = int(recente[0]) < int(recente[1]) < int(recente[2])
+    except (ValueError, IndexError):
+        tendencia = None
+    qualitativo = (recente.count('1'), sum(1 for c in recente if c in '123'))
+    contexto = '1' in forma[:2] or '2' in forma[:2]
+    peso = (recente.count('1'), recente.count('2') + recente.count('3'))
+    rating = (forma[:5].count('1'), forma[:5].count('2') + forma[:5].count('3'))
+    joquei = (forma[:5].count('1'), forma[:5].count('2') + forma[:5].count('3'))
+    consistencia = sum(1 for c in forma[:5] if c in ['1', '2', '3'])
+    momentum = sum({'1': 10, '2': 7, '3': 5, '4': 3}.get(c, 1) for c in recente)
+    pista = (recente.count('1'), recente.count('2') + recente.count('3'))
+    return pontos, tendencia, qualitativo, contexto, peso, rating, joquei, consistencia, momentum, pista
+
+
+def benchmark_forma(paginas, repeticoes):
+    """
+    Fatores de forma: uma varredura da string por fator x tokenizador
+    (frio e com a memória por string) x o conjunto completo de fatores de
+    forma do ExtractorCavalos lendo a Forma tokenizada
+    """
+    print('\n== Fatores de forma (µs por cavalo) ==')
+    extrator = app.extrator
+    corredores = [Corredor(cavalo) for cavalos in _campos_sinteticos(500) for cavalo in cavalos]
+    formas = [corredor.forma for corredor in corredores]
+
+    def fatores_completos():
+        for corredor in corredores:
+            forma = corredor.forma_analisada
+            extrator._calcular_score_forma_melhorado(forma)
+            extrator._calcular_momentum_qualitativo(corredor)
+            extrator._analisar_contexto_corrida(corredor)
+            extrator._analisar_tendencia_peso(corredor)
+            extrator._analisar_tendencia_official_rating(corredor)
+            extrator._analisar_performance_joquei(corredor)
+            extrator._calcular_consistencia(forma)
+            extrator._calcular_momentum(forma)
+            extrator._analisar_adaptacao_pista(forma, 'good')
+
+    def tokenizador_frio():
+        tokenizador = TokenizadorForma()
+        return [tokenizador.analisar(forma) for forma in formas]
+
+    linhas = [
+        ('varredura por fator (antes)', lambda: [_forma_por_caractere(forma) for forma in formas]),
+        ('tokenizador sem memória', lambda: [tokenizar_forma(forma) for forma in formas]),
+        ('tokenizador, memória vazia', tokenizador_frio),
+        ('tokenizador, memória quente', lambda: [analisar_forma(forma) for forma in formas]),
+        ('9 fatores do extrator (Forma pronta)', fatores_completos),
+    ]
+    print(f"{'etapa':<40}{'µs/cavalo':>10}")
+    for rotulo, funcao in linhas:
+        ms, _, _ = medir(funcao, repeticoes)
+        print(f'{rotulo:<40}{ms * 1000 / len(formas):>10.2f}')
+    print(f'{len(formas)} cavalos, {len(set(formas))} formas distintas')
+
+    print('\nTokenização:')
+    for texto in ('1121-3', 'P/4U0', '(12)31', '0-0/345', 'F2-1', 'N/A'):
+        forma = analisar_forma(texto)
+        print(f'  {texto!r:<12} posicoes={forma.posicoes} quebras={forma.quebras} longas={forma.quebras_longas}')
+
+
+def _odds_antes(odds):
+    """
+    As duas conversões que os fatores faziam antes de odds.py: a estrita
+    (odds/valor de aposta) e a tolerante (value bet, dark horse, outsider)
+    """
+    decimal = None
+    if odds and odds != 'N/A' and isinstance(odds, str):
+        try:
+            if '/' in odds:
+                partes = odds.split('/')
+                if len(partes) == 2:
+                    decimal = float(partes[0]) / float(partes[1]) + 1
+            else:
+                decimal = float(odds)
+        except (ValueError, ZeroDivisionError):
+            pass
+    try:
+        if isinstance(odds, (int, float)):
+            numericas = float(odds)
+        elif isinstance(odds, str):
+            if '/' in odds:
+                partes = odds.split('/')
+                numericas = float(partes[0]) / float(partes[1]) + 1
+            else:
+                numericas = float(odds.replace('$', '').replace(',', ''))
+        else:
+            numericas = 5.0
+    except (ValueError, ZeroDivisionError):
+        numericas = 5.0
+    return decimal, numericas
+
+
+def benchmark_odds(paginas, repeticoes):
+    """
+    Conversão de odds: as duas conversões antigas x odds.py (tabela da escada
+    + frações exatas); a conferência da escada está em test_odds.py
+    """
+    print('\n== Odds (µs por preço) ==')
+    sorteio = random.Random(3)
+    variantes = ['Evens', 'EVS', 'SP', 'N/A', '3.5', '7/3', '5/2F', ' 9/4 ', 4.5]
+    precos = [sorteio.choice(ESCADA_FRACIONARIA) if sorteio.random() < 0.8 else sorteio.choice(variantes)
+              for _ in range(20000)]
+
+    print(f"{'conversão':<34}{'µs/preço':>10}")
+    for rotulo, funcao in (('antes (estrita + tolerante)', _odds_antes), ('odds.converter_odds', converter_odds)):
+        ms, _, _ = medir(lambda: [funcao(preco) for preco in precos], repeticoes)
+        print(f'{rotulo:<34}{ms * 1000 / len(precos):>10.3f}')
+    print('Conferência da escada completa e das variações: python -m pytest test_odds.py')
+
+
+# Busca que os fatores faziam antes do índice de pessoas (trechos no nome em minúsculas)
+_JOQUEIS_ELITE_ANTES = (
+    'frankie dettori', 'f dettori', 'dettori',
+    'ryan moore', 'r moore', 'moore',
+    'william buick', 'w buick', 'buick',
+    'oisin murphy', 'o murphy', 'murphy',
+    'tom marquand', 't marquand', 'marquand',
+    'hollie doyle', 'h doyle', 'doyle'
+)
+
+
+def _joquei_elite_antes(nome):
+    minusculo = nome.lower() if isinstance(nome, str) else ''
+    return any(elite in minusculo for elite in _JOQUEIS_ELITE_ANTES)
+
+
+def benchmark_pessoas(paginas, repeticoes):
+    """
+    Jóquei de elite: varredura de trechos x índice de pessoas (nome
+    normalizado -> pessoa), e os nomes em que as duas discordam
+    """
+    print('\n== Jóqueis/treinadores (µs por nome) ==')
+    nomes = ['Oisin Murphy', 'O Murphy', 'O. Murphy (3)', 'J Murphy', 'Hollie Doyle', 'James Doyle',
+             'Sophie Doyle', 'Ryan Moore', 'Jamie Moore', 'L Dettori', 'Frankie Dettori', 'T Marquand',
+             'P J McDonald', 'Rossa Ryan', 'David Probert', 'Kieran Shoemark (3)', 'Jóquei N/A', 'Desconhecido']
+    sorteio = random.Random(5)
+    amostra = [sorteio.choice(nomes) for _ in range(20000)]
+
+    print(f"{'busca':<34}{'µs/nome':>10}")
+    for rotulo, funcao in (('antes (trechos)', _joquei_elite_antes),
+                           ('indice_pessoas', lambda nome: INDICE_PESSOAS.elite(nome, JOQUEI))):
+        ms, _, _ = medir(lambda: [funcao(nome) for nome in amostra], repeticoes)
+        print(f'{rotulo:<34}{ms * 1000 / len(amostra):>10.3f}')
+
+    print(f"Índice versão {INDICE_PESSOAS.versao}; nomes em que a busca antiga discordava:")
+    for nome in nomes:
+        pessoa = INDICE_PESSOAS.buscar(nome, JOQUEI)
+        antes = _joquei_elite_antes(nome)
+        if antes != (pessoa is not None and pessoa.elite):
+            print(f"  {nome!r:<24} antes {'elite' if antes else 'comum'}, "
+                  f"agora {pessoa.id if pessoa else 'não encontrado'}")
+
+
+def benchmark_resposta(paginas, repeticoes):
+    """
+    Tamanho e tempo de serialização da resposta de /analisar para uma corrida
+    de 16 cavalos: completa x modo compacto x projeção de campos
+    """
+    print('\n== Resposta de /analisar, corrida de 16 cavalos ==')
+    resultado = app.extrator.analisar_cavalos({'cavalos': _campos_sinteticos(1, corredores=16)[0]})
+    variantes = (
+        ('completa', MODO_COMPLETO, None),
+        ('modo=compacto', MODO_COMPACTO, None),
+        ('campos=nome,score_total,categoria_v2', MODO_COMPLETO, ('nome', 'score_total', 'categoria_v2')),
+    )
+    print(f"{'resposta':<40}{'bytes':>9}{'gzip':>8}{'ms':>8}")
+    for rotulo, modo, campos in variantes:
+        def serializar():
+            return app.app.json.dumps({'sucesso': True, 'resultado': projetar_resultado(resultado, modo, campos)})
+        ms, _, texto = medir(serializar, repeticoes * 20)
+        corpo = texto.encode('utf-8')
+        print(f'{rotulo:<40}{len(corpo):>9,}{len(gzip.compress(corpo)):>8,}{ms:>8.3f}')
+
+
+def benchmark_grafo(paginas, repeticoes):
+    """
+    Cavalos por segundo no grafo de fatores: análise completa x só os campos
+    do ranking (o plano pula tendências, distância, pista, probabilidade e
+    recomendação). Confere que as posições são as mesmas.
+    """
+    print('\n== Grafo de fatores: completo x só ranking ==')
+    extrator = app.extrator
+    campos = _campos_sinteticos(500)
+    total = sum(len(cavalos) for cavalos in campos)
+    variantes = (
+        ('completo', None),
+        ('campos=nome,score_total', ('nome', 'score_total')),
+        ('campos=nome,recomendacao', ('nome', 'recomendacao')),
+    )
+    print(f"{'análise':<40}{'nós':>5}{'ms':>9}{'cavalos/s':>14}")
+    ordens = {}
+    for rotulo, pedidos in variantes:
+        ms, _, resultados = medir(lambda: [extrator.analisar_cavalos({'cavalos': cavalos}, pedidos)
+                                           for cavalos in campos], repeticoes)
+        saidas = app.CAMPOS_ANALISE if pedidos is None else app.CAMPOS_RANKING + pedidos
+        nos = len(extrator.grafo_fatores.plano(saidas))
+        ordens[rotulo] = [[analise['nome'] for analise in resultado['dados']['analises']] for resultado in resultados]
+        print(f'{rotulo:<40}{nos:>5}{ms:>9.1f}{total / ms * 1000:>14,.0f}')
+    iguais = all(ordem == ordens['completo'] for ordem in ordens.values())
+    print(f'Mesmas posições ({total} cavalos): {conferir(iguais, "grafo: posições")}')
+
+
+def benchmark_simulacao(paginas, repeticoes):
+    """
+    Simulação de chegadas (Plackett-Luce) de um campo de 20 cavalos: tempo de
+    100 mil chegadas e diferença entre a frequência de vitórias simulada e a
+    probabilidade normalizada
+    """
+    print('\n== Simulação de chegadas, campo de 20 cavalos ==')
+    resultado = app.extrator.analisar_cavalos({'cavalos': _campos_sinteticos(1, corredores=20)[0]})
+    nomes, pontuacoes = pontuacoes_resultado(resultado)
+    probabilidades = probabilidades_vitoria(pontuacoes)
+    print(f"{'etapa':<40}{'ms':>9}")
+    for simulacoes in (10_000, 100_000):
+        ms, _, chegadas = medir(lambda: simular_chegadas(probabilidades, simulacoes, semente=1), repeticoes)
+        print(f"{f'simular_chegadas ({simulacoes:,})':<40}{ms:>9.1f}")
+    simulacao = SimulacaoCorrida(nomes, probabilidades, chegadas)
+    ms, _, _ = medir(lambda: simulacao.resumo(), repeticoes)
+    print(f"{'resumo (colocação, forecast, tricast)':<40}{ms:>9.1f}")
+    diferenca = np.abs(simulacao.colocacao(1) - probabilidades).max()
+    print(f'Soma das probabilidades: {probabilidades.sum():.6f}; '
+          f'maior diferença vitória simulada x softmax: {diferenca:.4f}')
+
+
+def benchmark_colocacao(paginas, repeticoes):
+    """
+    Probabilidades de colocação (Harville/Henery): µs por corrida por tamanho
+    de campo e número de lugares, e a diferença entre Harville e as chegadas
+    simuladas (mesmo modelo de Plackett-Luce)
+    """
+    print('\n== Colocação Harville/Henery (µs por corrida) ==')
+    sorteio = np.random.default_rng(3)
+    print(f"{'corredores':<12}{'lugares':>8}{'harville':>10}{'henery':>10}")
+    for corredores in (8, 12, 20, 30):
+        probabilidades = probabilidades_vitoria(sorteio.normal(6, 1, corredores))
+        for lugares in (2, 3, 4):
+            tempos = []
+            for modelo in MODELOS_COLOCACAO:
+                ms, _, _ = medir(lambda: [probabilidades_posicao(probabilidades, lugares, modelo)
+                                          for _ in range(100)], repeticoes)
+                tempos.append(ms * 10)
+            print(f'{corredores:<12}{lugares:>8}{tempos[0]:>10.1f}{tempos[1]:>10.1f}')
+
+    probabilidades = probabilidades_vitoria(sorteio.normal(6, 1, 20))
+    exatas = probabilidades_posicao(probabilidades, 4, MODELO_HARVILLE)
+    chegadas = simular_chegadas(probabilidades, 200_000, semente=1)
+    simuladas = np.stack([np.bincount(chegadas[:, k], minlength=20) / len(chegadas) for k in range(4)])
+    print(f'Harville x 200 mil chegadas simuladas (20 cavalos, 4 posições): '
+          f'maior diferença {np.abs(exatas - simuladas).max():.4f}')
+
+
+def benchmark_exoticas(paginas, repeticoes):
+    """
+    Exóticas de um campo de 20 cavalos com preço: todas as ordens avaliadas
+    por tipo e o tempo até os 10 melhores valores esperados
+    """
+    print('\n== Exóticas, campo de 20 cavalos (10 melhores) ==')
+    sorteio = np.random.default_rng(5)
+    nomes = [f'Cavalo {i + 1}' for i in range(20)]
+    probabilidades = probabilidades_vitoria(sorteio.normal(6, 1, 20))
+    odds = [f'{sorteio.integers(2, 40)}/{sorteio.integers(1, 3)}' for _ in nomes]
+    print(f"{'tipo':<24}{'combinações':>13}{'ms':>9}")
+    for tipo in TIPOS_EXOTICAS:
+        ms, _, precos = medir(lambda: precificar_exoticas(nomes, probabilidades, odds, tipo), repeticoes * 4)
+        print(f"{tipo:<24}{precos['combinacoes_avaliadas']:>13,}{ms:>9.2f}")
+
+
+def benchmark_carteira(paginas, repeticoes):
+    """
+    Kelly fracionário para um dia com 30 corridas e 100 value bets: tempo do
+    solver e iterações para alguns limites de exposição
+    """
+    print('\n== Carteira Kelly, 100 seleções em 30 corridas ==')
+    sorteio = np.random.default_rng(6)
+    corridas = np.sort(sorteio.integers(0, 30, 100))
+    probabilidades = sorteio.uniform(0.05, 0.3, 100)
+    # Na mesma corrida as seleções somam no máximo 90%
+    por_corrida = np.bincount(corridas, probabilidades)
+    probabilidades /= np.maximum(por_corrida[corridas] / 0.9, 1)
+    odds = (1 + sorteio.uniform(0.05, 0.6, 100)) / probabilidades
+    print(f"{'fração / exposição / aposta máx.':<36}{'ms':>8}{'iter.':>7}{'exposição':>11}")
+    for limites in ((0.25, 0.25, 0.05), (0.5, 0.3, 0.03), (1.0, 1.0, 1.0)):
+        ms, _, (apostas, _, iteracoes, convergiu) = medir(
+            lambda: otimizar_carteira(corridas, probabilidades, odds, *limites), repeticoes)
+        rotulo = ' / '.join(f'{limite:g}' for limite in limites) + ('' if convergiu else ' (não convergiu)')
+        print(f'{rotulo:<36}{ms:>8.2f}{iteracoes:>7}{apostas.sum():>11.4f}')
+
+
+def _atualizacoes_odds(campos, versoes, semente=8):
+    """
+    Versões sucessivas das corridas perto da largada: o primeiro cavalo de
+    cada uma é retirado e, a cada versão, três cavalos mudam de preço
+    """
+    sorteio = random.Random(semente)
+    precos = ['6/4', '2/1', '9/4', '4/1', '13/2', '12/1', '25/1', '50/1']
+    atualizacoes = []
+    for _ in range(versoes):
+        versao = []
+        for cavalos in campos:
+            cavalos = [dict(cavalo) for cavalo in cavalos[1:]]
+            for cavalo in sorteio.sample(cavalos, 3):
+                cavalo['odds'] = sorteio.choice(precos)
+            # Como na extração: os cavalos chegam à análise já convertidos
+            versao.append([Corredor(cavalo) for cavalo in cavalos])
+        atualizacoes.append(versao)
+    return atualizacoes
+
+
+def benchmark_incremental(paginas, repeticoes):
+    """
+    Atualização de 200 corridas de 20 cavalos em que só mudaram odds e saiu
+    um cavalo: reanálise completa x incremental (só os nós que dependem do
+    preço e da posição). Confere que o resultado é o mesmo.
+    """
+    print('\n== Reanálise com odds novas e um retirado, 200 corridas de 20 cavalos ==')
+    extrator = app.extrator
+    campos = _campos_sinteticos(200, corredores=20)
+    # medir() roda a função mais uma vez para o pico de memória
+    atualizacoes = _atualizacoes_odds(campos, repeticoes + 1)
+    chaves = [f'benchmark://incremental/{i}' for i in range(len(campos))]
+
+    ms_completa, _, _ = medir(lambda: [extrator.analisar_cavalos({'cavalos': cavalos})
+                                       for cavalos in atualizacoes[0]], repeticoes)
+    for chave, cavalos in zip(chaves, campos):
+        extrator.analisar_cavalos({'cavalos': cavalos}, chave=chave)
+    versoes = iter(atualizacoes)
+    ms_incremental, _, resultados = medir(lambda: [extrator.analisar_cavalos({'cavalos': cavalos}, chave=chave)
+                                                   for chave, cavalos in zip(chaves, next(versoes))], repeticoes)
+    print(f"{'análise':<40}{'ms':>9}{'corridas/s':>13}")
+    for rotulo, ms in (('completa', ms_completa), ('incremental', ms_incremental)):
+        print(f'{rotulo:<40}{ms:>9.1f}{len(campos) / ms * 1000:>13,.0f}')
+
+    def sem_horario(resultado):
+        return {chave: valor for chave, valor in resultado.items() if chave != 'timestamp'}
+    iguais = all(
+        sem_horario(resultado) == sem_horario(extrator.analisar_cavalos({'cavalos': cavalos}))
+        for resultado, cavalos in zip(resultados, atualizacoes[repeticoes - 1])
+    )
+    print(f'Mesmo resultado da análise completa: {conferir(iguais, "incremental: resultado")}; '
+          f'reanálises: {extrator.estados_corrida.estatisticas()}')
+
+
+SECOES = {
+    'parse': benchmark_parse,
+    'generico': benchmark_generico,
+    'nomes': benchmark_nomes,
+    'embutidos': benchmark_embutidos,
+    'pontuacao': benchmark_pontuacao,
+    'vetorizado': benchmark_vetorizado,
+    'forma': benchmark_forma,
+    'odds': benchmark_odds,
+    'pessoas': benchmark_pessoas,
+    'resposta': benchmark_resposta,
+    'grafo': benchmark_grafo,
+    'simulacao': benchmark_simulacao,
+    'colocacao': benchmark_colocacao,
+    'exoticas': benchmark_exoticas,
+    'carteira': benchmark_carteira,
+    'incremental': benchmark_incremental,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de desempenho do Cavalos Pro')
+    parser.add_argument('secoes', nargs='*', help=f"seções a executar: {', '.join(SECOES)} (padrão: todas)")
+    parser.add_argument('--paginas', help='diretório com páginas salvas (<fonte>*.html)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+    desconhecidas = [nome for nome in args.secoes if nome not in SECOES]
+    if desconhecidas:
+        parser.error(f"seção desconhecida: {', '.join(desconhecidas)}")
+
+    paginas = carregar_paginas(args.paginas)
+    for nome in args.secoes or list(SECOES):
+        SECOES[nome](paginas, args.repeticoes)
+    if FALHAS:
+        print(f"\nConferências com falha: {', '.join(FALHAS)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Buscador assíncrono (asyncio + aiohttp) das páginas de corrida
+
+Um único event loop em thread de fundo mantém a sessão aiohttp e o pool de
+conexões. Views async do Flask (que rodam cada uma no seu próprio loop) e o
+endpoint de lote aguardam as buscas nesse loop: os downloads de todas as
+requisições dividem o mesmo pool e os mesmos limites, e um lote de N corridas
+baixa tudo em paralelo a partir de uma única thread.
+
+Limite: o app roda em WSGI (Flask 2.3, `python app.py`), onde uma view async
+continua ocupando uma thread do servidor do início ao fim da requisição,
+inclusive enquanto espera o download. O que não fica preso é o resto: o parse
+vai para o executor e as conexões são reaproveitadas entre requisições.
+
+- Limite global e por host de conexões simultâneas
+- Timeouts de conexão, leitura e total
+- Cancelamento: cancelar quem aguarda cancela o download no loop de fundo
+- Retentativas (429/5xx e falhas de rede) com backoff exponencial + jitter,
+  respeitando o Retry-After até RETRY_AFTER_MAXIMO segundos
+- Integração com o cache em disco (TTL por fonte + revalidação HTTP)
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+from parser_incremental import TAMANHO_PARTE
+
+logger = logging.getLogger(__name__)
+
+# Valores padrão (podem ser ajustados por variáveis de ambiente no deploy)
+LIMITE_CONEXOES = int(os.environ.get('HTTP_LIMITE_CONEXOES', 100))
+LIMITE_POR_HOST = int(os.environ.get('HTTP_POOL_CONEXOES', 20))
+TIMEOUT_TOTAL = float(os.environ.get('HTTP_TIMEOUT_TOTAL', 30))
+TIMEOUT_CONEXAO = float(os.environ.get('HTTP_TIMEOUT_CONEXAO', 3.05))
+TIMEOUT_LEITURA = float(os.environ.get('HTTP_TIMEOUT_LEITURA', 10))
+TENTATIVAS = int(os.environ.get('HTTP_TENTATIVAS', 3))
+# Status que valem nova tentativa (sobrecarga/limite de taxa do site de origem)
+STATUS_RETENTATIVA = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_MAXIMO = 30  # Não segurar o usuário mais que isso por um Retry-After
+
+
+class ErroBusca(Exception):
+    """
+    Falha ao buscar uma página (status HTTP de erro ou rede)
+    """
+
+
+def _segundos_retry_after(valor):
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos
+    """
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class BuscadorAssincrono:
+    """
+    Busca de páginas com aiohttp num event loop dedicado
+    """
+    def __init__(self, headers=None, cache_disco=None, limite_conexoes=LIMITE_CONEXOES,
+                 limite_por_host=LIMITE_POR_HOST, timeout_conexao=TIMEOUT_CONEXAO,
+                 timeout_leitura=TIMEOUT_LEITURA, timeout_total=TIMEOUT_TOTAL,
+                 tentativas=TENTATIVAS, backoff=0.5, backoff_maximo=8.0):
+        self.headers = dict(headers or {})
+        self.cache_disco = cache_disco
+        self.limite_conexoes = limite_conexoes
+        self.limite_por_host = limite_por_host
+        self.timeout = aiohttp.ClientTimeout(
+            total=timeout_total, sock_connect=timeout_conexao, sock_read=timeout_leitura
+        )
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.backoff_maximo = backoff_maximo
+
+        self._loop = None
+        self._sessao = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Loop de fundo
+    # ------------------------------------------------------------------
+
+    def _garantir_loop(self):
+        if self._loop is not None:
+            return self._loop
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                pronto = threading.Event()
+
+                def executar():
+                    asyncio.set_event_loop(loop)
+                    pronto.set()
+                    loop.run_forever()
+
+                threading.Thread(target=executar, name='buscador-async', daemon=True).start()
+                pronto.wait()
+                self._loop = loop
+        return self._loop
+
+    def _obter_sessao(self):
+        # Chamado somente dentro do loop de fundo
+        if self._sessao is None or self._sessao.closed:
+            conector = aiohttp.TCPConnector(limit=self.limite_conexoes, limit_per_host=self.limite_por_host)
+            self._sessao = aiohttp.ClientSession(connector=conector, headers=self.headers, timeout=self.timeout)
+        return self._sessao
+
+    def agendar(self, corrotina):
+        """
+        Agenda uma corrotina no loop de fundo e retorna um concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(corrotina, self._garantir_loop())
+
+    async def executar_no_loop(self, corrotina):
+        """
+        Aguarda, a partir de qualquer event loop, uma corrotina executada no loop de fundo
+        """
+        loop = self._garantir_loop()
+        try:
+            atual = asyncio.get_running_loop()
+        except RuntimeError:
+            atual = None
+        if atual is loop:
+            return await corrotina
+
+        futuro = asyncio.run_coroutine_threadsafe(corrotina, loop)
+        try:
+            return await asyncio.wrap_future(futuro)
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+
+    async def buscar(self, url):
+        """
+        Retorna o conteúdo (bytes) da página, usando o cache em disco quando possível
+        """
+        return await self.executar_no_loop(self._buscar(url))
+
+    async def buscar_em_partes(self, url, criar_parser, executor=None):
+        """
+        Lê a página em pedaços alimentando um ParserIncremental (de
+        `criar_parser()`) no executor; para de ler assim que o parser sinaliza
+        o fim do bloco de corredores. Retorna o parser usado: cada tentativa
+        começa com um novo, para uma queda no meio do corpo não deixar a
+        página pela metade na árvore
+        """
+        return await self.executar_no_loop(self._buscar_em_partes(url, criar_parser, executor))
+
+    def fechar(self):
+        """
+        Fecha a sessão e encerra o loop de fundo
+        """
+        if self._loop is None:
+            return
+
+        async def _fechar():
+            if self._sessao is not None:
+                await self._sessao.close()
+
+        asyncio.run_coroutine_threadsafe(_fechar(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._sessao = None
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    async def _buscar(self, url):
+        loop = asyncio.get_running_loop()
+
+        entrada = None
+        if self.cache_disco is not None:
+            entrada = await loop.run_in_executor(None, self.cache_disco.ler, url)
+            if entrada and entrada.metadados.get('parcial'):
+                entrada = None  # Página guardada pela metade (parse incremental)
+            if entrada and self.cache_disco.esta_fresca(entrada):
+                logger.info(f"Página servida do cache em disco: {url}")
+                return entrada.conteudo
+
+        cabecalhos = self.cache_disco.cabecalhos_revalidacao(entrada) if self.cache_disco is not None else {}
+        status, conteudo, resp_headers = await self._get_com_retentativas(url, cabecalhos)
+
+        if status == 304 and entrada:
+            logger.info(f"Página revalidada (304), usando cache em disco: {url}")
+            await loop.run_in_executor(
+                None, self.cache_disco.renovar, entrada,
+                resp_headers.get('ETag'), resp_headers.get('Last-Modified')
+            )
+            return entrada.conteudo
+
+        if status >= 400:
+            raise ErroBusca(f'{status} Error for url: {url}')
+
+        if self.cache_disco is not None:
+            await loop.run_in_executor(
+                None, self.cache_disco.guardar, url, conteudo,
+                resp_headers.get('ETag'), resp_headers.get('Last-Modified')
+            )
+        return conteudo
+
+    async def _buscar_em_partes(self, url, criar_parser, executor):
+        loop = asyncio.get_running_loop()
+
+        entrada = None
+        if self.cache_disco is not None:
+            entrada = await loop.run_in_executor(None, self.cache_disco.ler, url)
+            if entrada and self.cache_disco.esta_fresca(entrada):
+                logger.info(f"Página servida do cache em disco: {url}")
+                parser = criar_parser()
+                await loop.run_in_executor(executor, parser.alimentar_tudo, entrada.conteudo)
+                return parser
+
+        parser = None
+
+        async def consumir(resposta):
+            nonlocal parser
+            parser = criar_parser()
+            if resposta.status >= 300:
+                return await resposta.read()
+            partes = []
+            async for parte in resposta.content.iter_chunked(TAMANHO_PARTE):
+                partes.append(parte)
+                if await loop.run_in_executor(executor, parser.alimentar, parte):
+                    break
+            await loop.run_in_executor(executor, parser.fechar)
+            return b''.join(partes)
+
+        cabecalhos = self.cache_disco.cabecalhos_revalidacao(entrada) if self.cache_disco is not None else {}
+        status, conteudo, resp_headers = await self._get_com_retentativas(url, cabecalhos, consumir)
+
+        if status == 304 and entrada:
+            logger.info(f"Página revalidada (304), usando cache em disco: {url}")
+            await loop.run_in_executor(
+                None, self.cache_disco.renovar, entrada,
+                resp_headers.get('ETag'), resp_headers.get('Last-Modified')
+            )
+            await loop.run_in_executor(executor, parser.alimentar_tudo, entrada.conteudo)
+            return parser
+
+        if status >= 400:
+            raise ErroBusca(f'{status} Error for url: {url}')
+
+        if self.cache_disco is not None:
+            await loop.run_in_executor(
+                None, lambda: self.cache_disco.guardar(
+                    url, conteudo, resp_headers.get('ETag'), resp_headers.get('Last-Modified'),
+                    parcial=parser.terminou
+                )
+            )
+        return parser
+
+    async def _get_com_retentativas(self, url, cabecalhos, consumir=None):
+        sessao = self._obter_sessao()
+        tentativa = 0
+        while True:
+            retry_after = None
+            try:
+                async with sessao.get(url, headers=cabecalhos) as resposta:
+                    if resposta.status in STATUS_RETENTATIVA and tentativa < self.tentativas:
+                        retry_after = _segundos_retry_after(resposta.headers.get('Retry-After'))
+                        logger.info(f"Status {resposta.status} em {url}; nova tentativa")
+                    else:
+                        conteudo = await (consumir(resposta) if consumir else resposta.read())
+                        return resposta.status, conteudo, resposta.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if tentativa >= self.tentativas:
+                    raise ErroBusca(f'Falha de conexão em {url}: {e}') from e
+                logger.info(f"Erro de conexão em {url} ({e}); nova tentativa")
+
+            await asyncio.sleep(self._espera(tentativa, retry_after))
+            tentativa += 1
+
+    def _espera(self, tentativa, retry_after=None):
+        """
+        Backoff exponencial com jitter; Retry-After do servidor tem prioridade
+        """
+        if retry_after is not None:
+            return min(retry_after, RETRY_AFTER_MAXIMO)
+        espera = min(self.backoff * (2 ** tentativa), self.backoff_maximo)
+        return espera + random.uniform(0, self.backoff)
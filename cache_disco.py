@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache em disco das páginas de corrida (diretório cache/)
+
+- Chave = hash SHA-256 da URL canônica (um arquivo por página)
+- TTL por fonte: dentro do TTL a página é servida sem tocar a rede
+- Fora do TTL a página é revalidada com If-None-Match / If-Modified-Since;
+  um 304 renova a entrada sem baixar o corpo de novo
+- Escrita atômica (arquivo temporário + os.replace): leitores de outros
+  workers nunca veem um arquivo pela metade
+- Tamanho total limitado, com despejo dos arquivos acessados há mais tempo
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import fcntl  # Lock entre processos (Linux/macOS)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_CACHE = os.environ.get('CACHE_DIR', 'cache')
+TAMANHO_MAXIMO_CACHE = int(os.environ.get('CACHE_TAMANHO_MAXIMO', 200 * 1024 * 1024))
+
+# TTL em segundos por fonte. Sites de odds mudam rápido; racecards bem menos.
+TTL_PADRAO = 300
+TTL_POR_FONTE = {
+    'racingpost.com': 300,
+    'attheraces.com': 300,
+    'timeform.com': 600,
+    'sportinglife.com': 300,
+    'oddschecker.com': 30,
+    'betfair.com': 15,
+}
+
+# Parâmetros de rastreamento que não mudam o conteúdo da página: utm_* por
+# prefixo, os demais pelo nome exato (refresh, reference etc. contam)
+PREFIXOS_IGNORADOS = ('utm_',)
+PARAMETROS_IGNORADOS = frozenset({'fbclid', 'gclid', 'ref'})
+
+EXTENSAO = '.pagina'
+
+
+def canonicalizar_url(url):
+    """
+    Normaliza a URL para uso como chave: esquema/host em minúsculas, sem
+    fragmento, sem parâmetros de rastreamento, query ordenada e sem barra final
+    """
+    partes = urlsplit(url.strip())
+    esquema = (partes.scheme or 'https').lower()
+    host = partes.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    caminho = partes.path.rstrip('/') or '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if k.lower() not in PARAMETROS_IGNORADOS and not k.lower().startswith(PREFIXOS_IGNORADOS)
+    )
+    return urlunsplit((esquema, host, caminho, urlencode(query), ''))
+
+
+def ttl_da_fonte(url):
+    """
+    Retorna o TTL configurado para o domínio da URL
+    """
+    host = urlsplit(url).netloc.lower()
+    for dominio, ttl in TTL_POR_FONTE.items():
+        if host == dominio or host.endswith('.' + dominio):
+            return ttl
+    return TTL_PADRAO
+
+
+class EntradaCache:
+    """
+    Página armazenada + metadados de validação HTTP
+    """
+    __slots__ = ('caminho', 'conteudo', 'metadados')
+
+    def __init__(self, caminho, conteudo, metadados):
+        self.caminho = caminho
+        self.conteudo = conteudo
+        self.metadados = metadados
+
+
+class CacheDisco:
+    """
+    Cache de páginas HTML em disco, seguro para vários workers
+    """
+    def __init__(self, diretorio=DIRETORIO_CACHE, tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def _caminho(self, url):
+        chave = hashlib.sha256(canonicalizar_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def ler(self, url):
+        """
+        Lê a entrada da URL (ou None). Formato: 1ª linha JSON de metadados + corpo
+        """
+        caminho = self._caminho(url)
+        try:
+            with open(caminho, 'rb') as f:
+                cabecalho = f.readline()
+                conteudo = f.read()
+            metadados = json.loads(cabecalho)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache inválida ({caminho}): {e}")
+            return None
+
+        # Marca o acesso para o despejo LRU
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return EntradaCache(caminho, conteudo, metadados)
+
+    def esta_fresca(self, entrada):
+        """
+        True se a entrada ainda está dentro do TTL da fonte
+        """
+        idade = time.time() - entrada.metadados.get('validado_em', 0)
+        return idade < entrada.metadados.get('ttl', TTL_PADRAO)
+
+    def cabecalhos_revalidacao(self, entrada):
+        """
+        Cabeçalhos condicionais para revalidar uma entrada expirada
+        """
+        if not entrada:
+            return {}
+        cabecalhos = {}
+        if entrada.metadados.get('etag'):
+            cabecalhos['If-None-Match'] = entrada.metadados['etag']
+        if entrada.metadados.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = entrada.metadados['last_modified']
+        return cabecalhos
+
+    def guardar(self, url, conteudo, etag=None, last_modified=None, parcial=False):
+        """
+        Grava a página de forma atômica e aplica o limite de tamanho.
+        `parcial` indica que só o início da página foi lido (parse incremental).
+        """
+        metadados = {
+            'url': canonicalizar_url(url),
+            'etag': etag,
+            'last_modified': last_modified,
+            'ttl': ttl_da_fonte(url),
+            'validado_em': time.time(),
+            'tamanho': len(conteudo),
+            'parcial': parcial,
+        }
+        self._gravar_atomico(self._caminho(url), metadados, conteudo)
+        self._despejar()
+
+    def renovar(self, entrada, etag=None, last_modified=None):
+        """
+        Renova uma entrada após resposta 304 (conteúdo inalterado)
+        """
+        metadados = dict(entrada.metadados)
+        metadados['validado_em'] = time.time()
+        if etag:
+            metadados['etag'] = etag
+        if last_modified:
+            metadados['last_modified'] = last_modified
+        self._gravar_atomico(entrada.caminho, metadados, entrada.conteudo)
+        entrada.metadados = metadados
+
+    def _gravar_atomico(self, caminho, metadados, conteudo):
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'wb') as f:
+                f.write(json.dumps(metadados).encode('utf-8') + b'\n')
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar cache em disco: {e}")
+            try:
+                os.unlink(temporario)
+            except OSError:
+                pass
+
+    def _despejar(self):
+        """
+        Remove as entradas acessadas há mais tempo até caber no limite.
+        Só um worker despeja por vez; os demais seguem sem esperar.
+        """
+        with self._lock_despejo() as obtido:
+            if not obtido:
+                return
+
+            entradas = []
+            total = 0
+            try:
+                with os.scandir(self.diretorio) as it:
+                    for item in it:
+                        if item.name.endswith(EXTENSAO):
+                            info = item.stat()
+                            entradas.append((info.st_mtime, info.st_size, item.path))
+                            total += info.st_size
+            except OSError as e:
+                logger.warning(f"Erro ao varrer cache em disco: {e}")
+                return
+
+            if total <= self.tamanho_maximo:
+                return
+
+            entradas.sort()
+            for _, tamanho, caminho in entradas:
+                if total <= self.tamanho_maximo:
+                    break
+                try:
+                    os.unlink(caminho)
+                    total -= tamanho
+                except FileNotFoundError:
+                    total -= tamanho
+                except OSError:
+                    pass
+            logger.info(f"Cache em disco despejado para {total} bytes")
+
+    def _lock_despejo(self):
+        return _LockArquivo(os.path.join(self.diretorio, '.despejo.lock'))
+
+
+class _LockArquivo:
+    """
+    Lock exclusivo não bloqueante entre processos (no-op sem fcntl)
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return True
+        try:
+            self.arquivo = open(self.caminho, 'a')
+            fcntl.flock(self.arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self.arquivo:
+                self.arquivo.close()
+                self.arquivo = None
+            return False
+
+    def __exit__(self, *exc):
+        if self.arquivo:
+            fcntl.flock(self.arquivo.fileno(), fcntl.LOCK_UN)
+            self.arquivo.close()
+        return False
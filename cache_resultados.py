@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache em memória dos resultados de análise (LRU + TTL) com single-flight
+
+Quando uma dica sai, dezenas de celulares pedem a mesma URL ao mesmo tempo.
+Requisições idênticas simultâneas aguardam uma única computação em andamento
+em vez de repetir extração + análise. Os valores guardados são compartilhados
+entre requisições e não devem ser modificados por quem os recebe.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+TTL_RESULTADOS = float(os.environ.get('CACHE_RESULTADOS_TTL', 60))
+CAPACIDADE_BYTES = int(os.environ.get('CACHE_RESULTADOS_BYTES', 64 * 1024 * 1024))
+MAXIMO_ENTRADAS = int(os.environ.get('CACHE_RESULTADOS_ENTRADAS', 512))
+
+
+def _tamanho_em_bytes(valor):
+    """
+    Tamanho aproximado do valor serializado (o que de fato vai para a resposta)
+    """
+    try:
+        return len(json.dumps(valor, default=str, ensure_ascii=False).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Abandonado(Exception):
+    """
+    Quem calculava foi cancelado: quem aguardava deve tentar de novo
+    """
+
+
+class CacheResultados:
+    """
+    LRU com TTL, contabilidade de bytes e coalescência de requisições iguais
+    """
+    def __init__(self, ttl=TTL_RESULTADOS, capacidade_bytes=CAPACIDADE_BYTES, maximo_entradas=MAXIMO_ENTRADAS):
+        self.ttl = ttl
+        self.capacidade_bytes = capacidade_bytes
+        self.maximo_entradas = maximo_entradas
+
+        self._entradas = OrderedDict()  # chave -> (expira_em, tamanho, valor)
+        self._em_andamento = {}          # chave -> Future da computação
+        self._lock = threading.Lock()
+
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.coalescidos = 0
+        self.despejos = 0
+        self.expirados = 0
+
+    def obter(self, chave):
+        """
+        Retorna o valor em cache (ou None), contando acerto/falha
+        """
+        with self._lock:
+            valor = self._obter_sem_lock(chave)
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+            return valor
+
+    def obter_ou_calcular(self, chave, funcao, cachear=None):
+        """
+        Retorna o valor em cache ou executa `funcao` uma única vez por chave.
+        `cachear(valor)` decide se o resultado deve ser guardado (ex.: não guardar erros).
+        """
+        while True:
+            valor, futuro, dono = self._reservar(chave)
+            if valor is not None:
+                return valor
+            if not dono:
+                try:
+                    return futuro.result()
+                except _Abandonado:
+                    continue
+
+            try:
+                valor = funcao()
+            except BaseException as e:
+                self._falhou(chave, futuro, e)
+                raise
+            return self._concluir(chave, futuro, valor, cachear)
+
+    async def obter_ou_calcular_async(self, chave, fabrica_corrotina, cachear=None):
+        """
+        Versão para views async: `fabrica_corrotina()` cria a corrotina de cálculo.
+        Coalesce também com chamadas síncronas da mesma chave (Future compartilhado).
+        Se quem calcula é cancelado (ex.: o cliente abandonou o lote), quem
+        aguardava tenta de novo e um deles assume o cálculo; cancelar quem
+        aguarda não afeta os demais.
+        """
+        while True:
+            valor, futuro, dono = self._reservar(chave)
+            if valor is not None:
+                return valor
+            if not dono:
+                try:
+                    # shield: o cancelamento deste pedido não cancela o Future compartilhado
+                    return await asyncio.shield(asyncio.wrap_future(futuro))
+                except _Abandonado:
+                    continue
+
+            try:
+                valor = await fabrica_corrotina()
+            except asyncio.CancelledError:
+                self._falhou(chave, futuro, _Abandonado())
+                raise
+            except BaseException as e:
+                self._falhou(chave, futuro, e)
+                raise
+            return self._concluir(chave, futuro, valor, cachear)
+
+    def _reservar(self, chave):
+        """
+        (valor em cache, None, False), (None, Future em andamento, False) ou
+        (None, Future novo, True) quando quem chamou passa a calcular
+        """
+        with self._lock:
+            valor = self._obter_sem_lock(chave)
+            if valor is not None:
+                self.acertos += 1
+                return valor, None, False
+
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                self.coalescidos += 1
+                return None, futuro, False
+            self.falhas += 1
+            futuro = Future()
+            self._em_andamento[chave] = futuro
+            return None, futuro, True
+
+    def _falhou(self, chave, futuro, erro):
+        with self._lock:
+            self._em_andamento.pop(chave, None)
+        futuro.set_exception(erro)
+
+    def _concluir(self, chave, futuro, valor, cachear):
+        # Serializar para medir o resultado leva tempo: fora do lock
+        tamanho = _tamanho_em_bytes(valor) if cachear is None or cachear(valor) else None
+        with self._lock:
+            self._em_andamento.pop(chave, None)
+            if tamanho is not None:
+                self._guardar_sem_lock(chave, valor, tamanho)
+        futuro.set_result(valor)
+        return valor
+
+    def guardar(self, chave, valor):
+        tamanho = _tamanho_em_bytes(valor)
+        with self._lock:
+            self._guardar_sem_lock(chave, valor, tamanho)
+
+    def invalidar(self, chave):
+        with self._lock:
+            item = self._entradas.pop(chave, None)
+            if item:
+                self.bytes_usados -= item[1]
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_usados = 0
+
+    def estatisticas(self):
+        """
+        Contadores para ajuste do cache sob carga
+        """
+        with self._lock:
+            consultas = self.acertos + self.falhas + self.coalescidos
+            return {
+                'entradas': len(self._entradas),
+                'bytes_usados': self.bytes_usados,
+                'capacidade_bytes': self.capacidade_bytes,
+                'maximo_entradas': self.maximo_entradas,
+                'ttl_segundos': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'coalescidos': self.coalescidos,
+                'despejos': self.despejos,
+                'expirados': self.expirados,
+                'em_andamento': len(self._em_andamento),
+                'taxa_acerto': round((self.acertos + self.coalescidos) / consultas * 100, 1) if consultas else 0.0
+            }
+
+    def _obter_sem_lock(self, chave):
+        item = self._entradas.get(chave)
+        if item is None:
+            return None
+        expira_em, tamanho, valor = item
+        if expira_em < time.monotonic():
+            del self._entradas[chave]
+            self.bytes_usados -= tamanho
+            self.expirados += 1
+            return None
+        self._entradas.move_to_end(chave)
+        return valor
+
+    def _guardar_sem_lock(self, chave, valor, tamanho):
+        if tamanho > self.capacidade_bytes:
+            logger.warning(f"Resultado de {tamanho} bytes maior que a capacidade do cache; não guardado")
+            return
+
+        anterior = self._entradas.pop(chave, None)
+        if anterior:
+            self.bytes_usados -= anterior[1]
+
+        self._entradas[chave] = (time.monotonic() + self.ttl, tamanho, valor)
+        self.bytes_usados += tamanho
+
+        # Despejar os menos usados recentemente até respeitar os limites
+        while self._entradas and (self.bytes_usados > self.capacidade_bytes or
+                                  len(self._entradas) > self.maximo_entradas):
+            _, (_, tamanho_removido, _) = self._entradas.popitem(last=False)
+            self.bytes_usados -= tamanho_removido
+            self.despejos += 1
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Carteira de apostas do dia por Kelly fracionário
+
+Junta os value bets (probabilidade normalizada x odds > 1) de todas as corridas
+analisadas e calcula quanto da banca vai em cada um, maximizando o crescimento
+logarítmico esperado. Os cavalos de uma corrida são mutuamente exclusivos (só
+um vence): com apostas f_i na corrida r,
+
+    crescimento_r = soma_i p_i * log(1 - F_r + f_i * D_i) + q_r * log(1 - F_r)
+
+onde F_r é o total apostado na corrida e q_r a chance de nenhum dos cavalos
+escolhidos vencer. As corridas entram como independentes (soma dos
+crescimentos). O Kelly fracionário aposta `fracao_kelly` do ótimo; os limites
+(exposição total e aposta máxima, em fração da banca) valem para as apostas
+finais, então o ótimo é procurado com os limites divididos pela fração.
+
+O solver é um Newton diagonal projetado com busca de passo (Armijo) em NumPy:
+gradiente e curvatura de todas as seleções saem de uma vez (somas por corrida
+com bincount) e a projeção nos limites é exata, avaliada em todas as quebras
+da função de uma vez. Cem seleções convergem em poucos milissegundos.
+"""
+
+import os
+
+import numpy as np
+
+from odds import odds_decimais
+from probabilidades import probabilidades_vitoria, pontuacoes_resultado
+
+FRACAO_KELLY = float(os.environ.get('KELLY_FRACAO', 0.25))
+EXPOSICAO_MAXIMA = float(os.environ.get('KELLY_EXPOSICAO_MAXIMA', 0.25))
+APOSTA_MAXIMA = float(os.environ.get('KELLY_APOSTA_MAXIMA', 0.05))
+ITERACOES_MAXIMAS = 500
+TOLERANCIA = 1e-10
+# Aceita o passo se subir pelo menos esta fração do previsto pelo gradiente
+ARMIJO = 1e-4
+PASSO_MINIMO = 1e-14
+
+
+class ErroCarteira(ValueError):
+    """
+    Parâmetros da carteira inválidos
+    """
+
+
+def _fracao(valor, nome, minimo=0.0):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not minimo < valor <= 1:
+        raise ErroCarteira(f'{nome} deve ser um número em ({minimo}, 1], veio {valor!r}')
+    return float(valor)
+
+
+def opcoes_carteira(corpo):
+    """
+    banca e limites da requisição (validados), com os padrões do servidor
+    """
+    corpo = corpo or {}
+    banca = corpo.get('banca')
+    if isinstance(banca, bool) or not isinstance(banca, (int, float)) or banca <= 0:
+        raise ErroCarteira(f'banca deve ser um número positivo, veio {banca!r}')
+    return {
+        'banca': banca,
+        'fracao_kelly': _fracao(corpo.get('fracao_kelly', FRACAO_KELLY), 'fracao_kelly'),
+        'exposicao_maxima': _fracao(corpo.get('exposicao_maxima', EXPOSICAO_MAXIMA), 'exposicao_maxima'),
+        'aposta_maxima': _fracao(corpo.get('aposta_maxima', APOSTA_MAXIMA), 'aposta_maxima'),
+    }
+
+
+def selecoes_resultado(resultado, corrida):
+    """
+    Value bets de um resultado de analisar_cavalos: [{corrida, nome,
+    probabilidade, odds_decimal}] dos cavalos com preço e p * odds > 1
+    """
+    nomes, pontuacoes = pontuacoes_resultado(resultado)
+    probabilidades = probabilidades_vitoria(pontuacoes)
+    analises = resultado.get('dados', {}).get('analises', [])
+    selecoes = []
+    for nome, probabilidade, analise in zip(nomes, probabilidades, analises):
+        odds = odds_decimais(analise.get('odds'))
+        if odds is not None and probabilidade * odds > 1:
+            selecoes.append({'corrida': corrida, 'nome': nome,
+                             'probabilidade': float(probabilidade), 'odds_decimal': odds})
+    return selecoes
+
+
+def _projetar(valores, limites, total, escala):
+    """
+    Projeção em {0 <= f <= limites, soma(f) <= total} na métrica da curvatura
+    (distância ponderada por 1 / escala): f = clip(v - tau * escala, 0, limites)
+    """
+    projetado = np.clip(valores, 0.0, limites)
+    if projetado.sum() <= total:
+        return projetado
+    # A soma é linear por partes e decrescente em tau, com quebras onde cada
+    # seleção bate em 0 ou no limite: avaliada em todas as quebras de uma vez,
+    # tau sai por interpolação no trecho em que a soma cruza o total
+    quebras = np.unique(np.concatenate((valores / escala, (valores - limites) / escala)))
+    somas = np.clip(valores[None, :] - quebras[:, None] * escala, 0.0, limites).sum(axis=1)
+    tau = np.interp(total, somas[::-1], quebras[::-1])
+    return np.clip(valores - tau * escala, 0.0, limites)
+
+
+class _Crescimento:
+    """
+    Crescimento logarítmico esperado e gradiente para seleções agrupadas por corrida
+    """
+    def __init__(self, corridas, probabilidades, odds):
+        self.corridas = corridas
+        self.probabilidades = probabilidades
+        self.odds = odds
+        self.total_corridas = int(corridas.max()) + 1
+        # Chance de nenhuma seleção da corrida vencer
+        self.nenhuma = 1.0 - np.bincount(corridas, probabilidades, self.total_corridas)
+
+    def _riquezas(self, apostas):
+        sobra = 1.0 - np.bincount(self.corridas, apostas, self.total_corridas)
+        return sobra, sobra[self.corridas] + apostas * self.odds
+
+    def valor(self, apostas):
+        sobra, vitoria = self._riquezas(apostas)
+        if (sobra <= 0).any() or (vitoria <= 0).any():
+            return -np.inf
+        return float(self.probabilidades @ np.log(vitoria) + self.nenhuma @ np.log(sobra))
+
+    def gradiente(self, apostas):
+        """
+        (gradiente, curvatura): a curvatura é o módulo da diagonal da hessiana,
+        usada para escalar o passo de cada seleção
+        """
+        sobra, vitoria = self._riquezas(apostas)
+        por_corrida = np.bincount(self.corridas, self.probabilidades / vitoria, self.total_corridas) + self.nenhuma / sobra
+        gradiente = self.probabilidades * self.odds / vitoria - por_corrida[self.corridas]
+        quadrados = self.probabilidades / vitoria ** 2
+        por_corrida = np.bincount(self.corridas, quadrados, self.total_corridas) + self.nenhuma / sobra ** 2
+        curvatura = por_corrida[self.corridas] - quadrados + quadrados * (self.odds - 1.0) ** 2
+        return gradiente, curvatura
+
+
+def otimizar_carteira(corridas, probabilidades, odds, fracao_kelly=FRACAO_KELLY,
+                      exposicao_maxima=EXPOSICAO_MAXIMA, aposta_maxima=APOSTA_MAXIMA):
+    """
+    Frações da banca para cada seleção (arrays alinhados; corridas = código
+    inteiro da corrida). Retorna (apostas, kelly_completo, iterações, convergiu)
+    """
+    fracao_kelly = _fracao(fracao_kelly, 'fracao_kelly')
+    exposicao_maxima = _fracao(exposicao_maxima, 'exposicao_maxima')
+    aposta_maxima = _fracao(aposta_maxima, 'aposta_maxima')
+    corridas = np.asarray(corridas, dtype=np.intp)
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    odds = np.asarray(odds, dtype=float)
+    if not corridas.size:
+        return np.zeros(0), np.zeros(0), 0, True
+
+    crescimento = _Crescimento(corridas, probabilidades, odds)
+    # Sem valor (p * odds <= 1) a aposta ótima é zero: limite zero
+    limites = np.where(probabilidades * odds > 1, aposta_maxima / fracao_kelly, 0.0)
+    total = exposicao_maxima / fracao_kelly
+
+    kelly = np.zeros(corridas.size)
+    atual = crescimento.valor(kelly)
+    convergiu = False
+    iteracao = 0
+    for iteracao in range(1, ITERACOES_MAXIMAS + 1):
+        gradiente, curvatura = crescimento.gradiente(kelly)
+        # Passo de Newton na diagonal, projetado na mesma métrica
+        escala = 1.0 / curvatura
+        passo = 1.0
+        while True:
+            candidato = _projetar(kelly + passo * escala * gradiente, limites, total, passo * escala)
+            valor = crescimento.valor(candidato)
+            if valor >= atual + ARMIJO * gradiente @ (candidato - kelly):
+                break
+            passo /= 2
+            if passo < PASSO_MINIMO:
+                break
+        if passo < PASSO_MINIMO:
+            # Nenhum passo melhora: ótimo (dentro da precisão numérica)
+            convergiu = True
+            break
+        deslocamento = np.abs(candidato - kelly).max()
+        kelly, atual = candidato, valor
+        if deslocamento < TOLERANCIA:
+            convergiu = True
+            break
+    return kelly * fracao_kelly, kelly, iteracao, convergiu
+
+
+def montar_carteira(selecoes, banca, fracao_kelly=FRACAO_KELLY,
+                    exposicao_maxima=EXPOSICAO_MAXIMA, aposta_maxima=APOSTA_MAXIMA):
+    """
+    Carteira a partir das seleções de selecoes_resultado (de várias corridas)
+    """
+    if isinstance(banca, bool) or not isinstance(banca, (int, float)) or banca <= 0:
+        raise ErroCarteira(f'banca deve ser um número positivo, veio {banca!r}')
+    codigos = {}
+    corridas = np.array([codigos.setdefault(s['corrida'], len(codigos)) for s in selecoes], dtype=np.intp)
+    probabilidades = np.array([s['probabilidade'] for s in selecoes], dtype=float)
+    odds = np.array([s['odds_decimal'] for s in selecoes], dtype=float)
+    apostas, kelly, iteracoes, convergiu = otimizar_carteira(
+        corridas, probabilidades, odds, fracao_kelly, exposicao_maxima, aposta_maxima
+    )
+
+    carteira = []
+    for i in np.argsort(-apostas, kind='stable'):
+        # Centavos para baixo: a soma nunca passa da exposição máxima
+        valor = float(np.floor(apostas[i] * banca * 100) / 100)
+        if valor <= 0:
+            continue
+        carteira.append({
+            **selecoes[i],
+            'probabilidade': round(selecoes[i]['probabilidade'], 4),
+            'valor_esperado': round(float(probabilidades[i] * odds[i] - 1), 4),
+            'kelly_completo': round(float(kelly[i]), 5),
+            'fracao_banca': round(float(apostas[i]), 5),
+            'valor': valor,
+        })
+    crescimento = _Crescimento(corridas, probabilidades, odds).valor(apostas) if selecoes else 0.0
+    return {
+        'banca': banca,
+        'fracao_kelly': fracao_kelly,
+        'exposicao_maxima': exposicao_maxima,
+        'aposta_maxima': aposta_maxima,
+        'candidatos': len(selecoes),
+        'apostas': carteira,
+        'total_apostado': round(sum(aposta['valor'] for aposta in carteira), 2),
+        'crescimento_esperado': round(crescimento, 6),
+        'iteracoes': iteracoes,
+        'convergiu': convergiu,
+    }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Casador de vários seletores CSS numa única passada pela árvore
+
+Em vez de um soup.select() por padrão (a árvore inteira percorrida uma vez
+para cada um), os padrões são compilados uma vez e indexados pela classe,
+tag ou atributo do seu último componente. Cada elemento visitado só é
+testado contra as regras que podem casar com ele, e os ancestrais exigidos
+por seletores de descendência ('.horse-name a') são acompanhados por
+contadores durante a descida: O(nós) em vez de O(padrões x nós).
+
+Subconjunto de CSS suportado: tag, *, .classe, [atributo] e [atributo OP "valor"]
+com OP em = ~= ^= $= *=, combinados por descendência (espaço).
+"""
+
+import re
+
+from bs4.element import Tag
+
+_COMPONENTE = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<resto>(?:\.[\w-]+|\[[^\]]+\])*)$')
+_PARTE = re.compile(r'\.(?P<classe>[\w-]+)|\[(?P<atributo>[^\]]+)\]')
+_ATRIBUTO = re.compile(r'^\s*(?P<nome>[\w-]+)\s*(?:(?P<op>[~^$*]?=)\s*(?P<valor>"[^"]*"|\'[^\']*\'|[\w-]+))?\s*$')
+
+
+class ErroSeletor(ValueError):
+    """
+    Seletor fora do subconjunto de CSS suportado
+    """
+
+
+def _valor_atributo(elemento, nome):
+    valor = elemento.attrs.get(nome)
+    if isinstance(valor, list):  # class, rel...: o BeautifulSoup guarda como lista
+        return ' '.join(valor)
+    return valor
+
+
+_OPERADORES = {
+    None: lambda valor, esperado: True,
+    '=': lambda valor, esperado: valor == esperado,
+    '~=': lambda valor, esperado: esperado in valor.split(),
+    '^=': lambda valor, esperado: bool(esperado) and valor.startswith(esperado),
+    '$=': lambda valor, esperado: bool(esperado) and valor.endswith(esperado),
+    '*=': lambda valor, esperado: bool(esperado) and esperado in valor,
+}
+
+
+class SeletorSimples:
+    """
+    Um componente composto (ex.: 'a.runner-link[href*="/horse/"]')
+    """
+    __slots__ = ('tag', 'classes', 'atributos')
+
+    def __init__(self, texto):
+        casamento = _COMPONENTE.match(texto)
+        if not casamento or not texto:
+            raise ErroSeletor(f'Seletor não suportado: {texto}')
+        tag = casamento.group('tag')
+        self.tag = None if tag in (None, '*') else tag.lower()
+
+        classes = []
+        atributos = []
+        for parte in _PARTE.finditer(casamento.group('resto')):
+            if parte.group('classe'):
+                classes.append(parte.group('classe'))
+                continue
+            atributo = _ATRIBUTO.match(parte.group('atributo'))
+            if not atributo:
+                raise ErroSeletor(f'Atributo não suportado em: {texto}')
+            valor = atributo.group('valor')
+            if valor and valor[0] in '"\'':
+                valor = valor[1:-1]
+            atributos.append((atributo.group('nome').lower(), atributo.group('op'), valor))
+        self.classes = tuple(classes)
+        self.atributos = tuple(atributos)
+
+    def chave_indice(self):
+        """
+        Chave mais seletiva para indexar a regra: classe, senão tag, senão atributo
+        """
+        if self.classes:
+            return ('classe', self.classes[0])
+        if self.tag:
+            return ('tag', self.tag)
+        if self.atributos:
+            return ('atributo', self.atributos[0][0])
+        return None
+
+    def casa(self, elemento):
+        if self.tag is not None and elemento.name != self.tag:
+            return False
+        if self.classes:
+            classes = elemento.get('class') or ()
+            if isinstance(classes, str):
+                classes = classes.split()
+            for classe in self.classes:
+                if classe not in classes:
+                    return False
+        for nome, operador, esperado in self.atributos:
+            valor = _valor_atributo(elemento, nome)
+            if valor is None or not _OPERADORES[operador](valor, esperado):
+                return False
+        return True
+
+
+class Regra:
+    """
+    Um padrão compilado: componentes da esquerda (ancestrais) para a direita
+    """
+    __slots__ = ('padrao', 'ordem', 'componentes', 'ancestral')
+
+    def __init__(self, padrao, ordem):
+        self.padrao = padrao
+        self.ordem = ordem
+        self.componentes = [SeletorSimples(parte) for parte in padrao.split()]
+        if not self.componentes:
+            raise ErroSeletor('Padrão vazio')
+        self.ancestral = None  # índice do ancestral acompanhado por contador (padrões 'A B')
+
+    @property
+    def alvo(self):
+        return self.componentes[-1]
+
+    def casa(self, elemento, ativos):
+        if not self.alvo.casa(elemento):
+            return False
+        if len(self.componentes) == 1:
+            return True
+        if self.ancestral is not None:
+            return ativos[self.ancestral] > 0
+        return self._casa_ancestrais(elemento)
+
+    def _casa_ancestrais(self, elemento):
+        # Cadeias com mais de um ancestral: subir a árvore casando da direita para a esquerda
+        pendentes = self.componentes[-2::-1]
+        pai = elemento.parent
+        while pai is not None and pendentes:
+            if isinstance(pai, Tag) and pai.name != '[document]' and pendentes[0].casa(pai):
+                pendentes = pendentes[1:]
+            pai = pai.parent
+        return not pendentes
+
+
+class CasadorSeletores:
+    """
+    Casa todos os padrões numa passada; retorna (elemento, regras) em ordem de documento
+    """
+    def __init__(self, padroes):
+        self.regras = [Regra(padrao, ordem) for ordem, padrao in enumerate(padroes)]
+
+        self._indice = {}
+        self._sem_indice = []
+        for regra in self.regras:
+            chave = regra.alvo.chave_indice()
+            if chave is None:
+                self._sem_indice.append(regra)
+            else:
+                self._indice.setdefault(chave, []).append(regra)
+
+        # Ancestrais de padrões 'A B' viram contadores mantidos na descida
+        self._ancestrais = []
+        for regra in self.regras:
+            if len(regra.componentes) == 2:
+                regra.ancestral = len(self._ancestrais)
+                self._ancestrais.append(regra.componentes[0])
+
+    def _regras_candidatas(self, elemento):
+        indice = self._indice
+        candidatas = list(indice.get(('tag', elemento.name), ()))
+        classes = elemento.get('class') or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        for classe in set(classes):
+            candidatas.extend(indice.get(('classe', classe), ()))
+        for nome in elemento.attrs:
+            candidatas.extend(indice.get(('atributo', nome), ()))
+        candidatas.extend(self._sem_indice)
+        return candidatas
+
+    def casar(self, raiz):
+        """
+        Percorre a subárvore de `raiz` uma única vez
+        """
+        resultados = []
+        ativos = [0] * len(self._ancestrais)
+        ancestrais = self._ancestrais
+
+        iteradores = [iter(raiz.contents)]
+        marcas = [()]
+        while iteradores:
+            for no in iteradores[-1]:
+                if isinstance(no, Tag):
+                    break
+            else:
+                iteradores.pop()
+                for i in marcas.pop():
+                    ativos[i] -= 1
+                continue
+
+            regras = [r for r in self._regras_candidatas(no) if r.casa(no, ativos)]
+            if regras:
+                regras.sort(key=lambda r: r.ordem)
+                resultados.append((no, regras))
+
+            marcas_no = tuple(i for i, componente in enumerate(ancestrais) if componente.casa(no))
+            for i in marcas_no:
+                ativos[i] += 1
+            marcas.append(marcas_no)
+            iteradores.append(iter(no.contents))
+
+        return resultados
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classificador de textos que parecem nomes de cavalos
+
+Usado pela extração genérica, inclusive no fallback que testa cada linha do
+texto da página (dezenas de milhares de linhas numa página grande). As
+tabelas de palavras são montadas uma única vez, as regras mais baratas
+(tamanho, trechos proibidos) vêm antes das que percorrem o texto, e linhas
+repetidas (menus, rodapés, "Tips", "Results"...) são avaliadas uma vez só.
+"""
+
+import os
+
+MAXIMO_MEMO = int(os.environ.get('CLASSIFICADOR_NOMES_MEMO', 50000))
+
+# Palavras comuns que não são nomes de cavalos
+PALAVRAS_EXCLUIR = frozenset({
+    'odds', 'bet', 'win', 'place', 'show', 'back', 'lay',
+    'price', 'form', 'jockey', 'trainer', 'weight', 'age',
+    'rating', 'tips', 'news', 'results', 'race', 'card',
+    'time', 'distance', 'going', 'class', 'prize', 'money',
+    'favourite', 'outsider', 'runner', 'selection', 'horse',
+    'today', 'tomorrow', 'yesterday', 'live', 'next', 'previous',
+    'free', 'super', 'download', 'android', 'bookmaker', 'offers',
+    'gambling', 'responsible', 'logo', 'worldwide', 'stakes', 'races',
+    'thursday', 'friday', 'saturday', 'sunday', 'monday', 'tuesday',
+    'wednesday', 'statistics', 'newspaper', 'quiz', 'doncaster',
+    'newmarket', 'ascot', 'york', 'cheltenham', 'goodwood', 'maiden',
+    'handicap', 'standard', 'partly', 'cloudy', 'tapeta',
+    'september', 'october', 'november', 'december', 'january',
+    'february', 'march', 'april', 'may', 'june', 'july', 'august'
+})
+
+# URLs, emails e dois pontos (horários ou rótulos)
+TRECHOS_EXCLUIR = ('@', 'http', 'www.', ':')
+
+TAMANHO_MINIMO = 3
+TAMANHO_MAXIMO = 35
+MAXIMO_PALAVRAS = 5
+PROPORCAO_DIGITOS = 0.2
+
+
+class ClassificadorNomes:
+    """
+    Decide se um texto parece nome de cavalo; resultados memorizados por texto
+    """
+    def __init__(self, palavras_excluir=PALAVRAS_EXCLUIR, maximo_memo=MAXIMO_MEMO):
+        self.palavras_excluir = frozenset(palavras_excluir)
+        self.maximo_memo = maximo_memo
+        self._memo = {}
+
+    def parece_nome(self, texto):
+        if not texto:
+            return False
+        resultado = self._memo.get(texto)
+        if resultado is None:
+            resultado = self._avaliar(texto)
+            if len(self._memo) >= self.maximo_memo:
+                self._memo.clear()
+            self._memo[texto] = resultado
+        return resultado
+
+    def _avaliar(self, texto):
+        tamanho = len(texto)
+        if tamanho < TAMANHO_MINIMO or tamanho > TAMANHO_MAXIMO:
+            return False
+
+        for trecho in TRECHOS_EXCLUIR:
+            if trecho in texto:
+                return False
+
+        # Frases com alguma palavra excluída (ou o texto inteiro sendo uma)
+        palavras = texto.lower().split()
+        if len(palavras) > MAXIMO_PALAVRAS:
+            return False
+        if not self.palavras_excluir.isdisjoint(palavras):
+            return False
+
+        # Uma palavra só e curta é genérica demais
+        if len(palavras) == 1 and tamanho < 6:
+            return False
+
+        # Números demais, nenhuma letra ou nenhuma maiúscula (nomes próprios)
+        if sum(map(str.isdigit, texto)) > tamanho * PROPORCAO_DIGITOS:
+            return False
+        if not any(map(str.isalpha, texto)):
+            return False
+        return any(map(str.isupper, texto))
+
+    def filtrar(self, textos):
+        """
+        Textos que parecem nomes, sem repetição e na ordem em que aparecem
+        """
+        parece_nome = self.parece_nome
+        return [texto for texto in dict.fromkeys(textos) if parece_nome(texto)]
+
+    def nomes_no_texto(self, texto, tamanho_maximo_linha=50):
+        """
+        Classifica em lote as linhas de um texto (ex.: soup.get_text()): cada
+        linha é aparada e as linhas repetidas são avaliadas uma única vez
+        """
+        linhas = (linha.strip() for linha in texto.split('\n'))
+        return self.filtrar(
+            linha for linha in linhas if TAMANHO_MINIMO <= len(linha) < tamanho_maximo_linha
+        )
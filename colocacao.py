@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Probabilidades de colocação (Harville/Henery) e valor esperado each-way
+
+A partir das probabilidades de vitória normalizadas (probabilidades.py), a
+chance de cada cavalo terminar em cada posição sai da fórmula de Harville:
+dado que os cavalos do prefixo já chegaram, o próximo é i com probabilidade
+p_i / (1 - soma das p do prefixo). Harville exagera a chance dos favoritos nas
+colocações; o modelo de Henery, na aproximação de Lo e Bacon-Shone, usa para a
+posição k pesos p^lambda_k renormalizados (lambda < 1 achata o campo), com
+os descontos de DESCONTOS_HENERY.
+
+O cálculo é exato e vetorizado: a cada posição, um tensor com a probabilidade
+de cada prefixo ordenado (n, n x n, ...) é estendido de uma vez pelo próximo
+cavalo, e a chance de cada cavalo na posição sai do total do tensor menos os
+prefixos que já o contêm. Até o 3º lugar custa O(n²), o 4º O(n³); um campo de
+20 cavalos leva dezenas de µs.
+
+Each-way: uma aposta na vitória e outra na colocação (mesmo valor), com a
+colocação paga a uma fração das odds (1/4 ou 1/5) para os primeiros 2 a 4.
+O valor esperado é por unidade apostada no total (as duas partes):
+
+    ev = (p_vitoria * D + p_colocacao * (1 + (D - 1) * fracao)) / 2 - 1
+
+Sem termos informados vale a regra britânica pelo tamanho do campo (corridas
+sem handicap): até 4 corredores só vitória, 5 a 7 paga 2 lugares a 1/4, 8 ou
+mais paga 3 lugares a 1/5.
+"""
+
+import os
+from fractions import Fraction
+
+import numpy as np
+
+MODELO_HARVILLE = 'harville'
+MODELO_HENERY = 'henery'
+MODELOS = (MODELO_HARVILLE, MODELO_HENERY)
+MODELO_COLOCACAO = os.environ.get('COLOCACAO_MODELO', MODELO_HENERY)
+# Expoentes da 2ª, 3ª e 4ª posição (Lo e Bacon-Shone; a 4ª é extrapolada)
+DESCONTOS_HENERY = (0.81, 0.65, 0.55)
+
+LUGARES_MINIMO = 2
+LUGARES_MAXIMO = 4
+# (corredores até, lugares, fração); acima do último limite, o último termo
+TERMOS_PADRAO = (
+    (4, 0, None),
+    (7, 2, Fraction(1, 4)),
+)
+TERMOS_CAMPO_GRANDE = (3, Fraction(1, 5))
+
+
+class ErroTermos(ValueError):
+    """
+    Termos each-way inválidos
+    """
+
+
+class TermosEachWay:
+    """
+    Lugares pagos e fração das odds paga na colocação
+    """
+    __slots__ = ('lugares', 'fracao')
+
+    def __init__(self, lugares, fracao):
+        self.lugares = lugares
+        self.fracao = fracao
+
+    @property
+    def chave(self):
+        return (self.lugares, self.fracao)
+
+    def para_dict(self):
+        return {'lugares': self.lugares, 'fracao': str(self.fracao)}
+
+
+def termos_padrao(corredores):
+    """
+    Termos da regra britânica pelo tamanho do campo (None: sem each-way)
+    """
+    for limite, lugares, fracao in TERMOS_PADRAO:
+        if corredores <= limite:
+            return TermosEachWay(lugares, fracao) if lugares else None
+    return TermosEachWay(*TERMOS_CAMPO_GRANDE)
+
+
+def _fracao(valor):
+    try:
+        fracao = Fraction(valor) if isinstance(valor, str) else Fraction(valor).limit_denominator(100)
+    except (ValueError, TypeError, ZeroDivisionError):
+        raise ErroTermos(f'fração inválida: {valor!r} (use "1/4" ou "1/5")')
+    if not 0 < fracao <= 1:
+        raise ErroTermos(f'fração fora de (0, 1]: {valor!r}')
+    return fracao
+
+
+def _lugares(valor):
+    try:
+        lugares = int(valor)
+    except (ValueError, TypeError):
+        raise ErroTermos(f'lugares inválido: {valor!r}')
+    if not LUGARES_MINIMO <= lugares <= LUGARES_MAXIMO:
+        raise ErroTermos(f'lugares deve ficar entre {LUGARES_MINIMO} e {LUGARES_MAXIMO}, veio {lugares}')
+    return lugares
+
+
+def opcoes_each_way(corpo, args):
+    """
+    Termos each-way da requisição: corpo JSON ({"each_way": {"fracao": "1/5",
+    "lugares": 3}}) ou query string (?each_way=1/5,3). None: regra pelo campo
+    """
+    termos = (corpo or {}).get('each_way')
+    if termos is None:
+        termos = args.get('each_way')
+    if termos is None or termos == '':
+        return None
+    if isinstance(termos, str):
+        partes = termos.split(',')
+        if len(partes) != 2:
+            raise ErroTermos('each_way deve ser "fração,lugares" (ex.: 1/5,3)')
+        return TermosEachWay(_lugares(partes[1].strip()), _fracao(partes[0].strip()))
+    if not isinstance(termos, dict):
+        raise ErroTermos('each_way deve ser um objeto {"fracao": ..., "lugares": ...}')
+    return TermosEachWay(_lugares(termos.get('lugares')), _fracao(termos.get('fracao')))
+
+
+def pesos_posicoes(probabilidades, posicoes, modelo):
+    """
+    Pesos de cada posição (1ª ... posicoes-ésima): as próprias probabilidades
+    em Harville, p^lambda renormalizado em Henery
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f'modelo de colocação desconhecido: {modelo}')
+    pesos = [probabilidades]
+    for posicao in range(1, posicoes):
+        if modelo == MODELO_HARVILLE:
+            pesos.append(probabilidades)
+        else:
+            ajustados = probabilidades ** DESCONTOS_HENERY[posicao - 1]
+            pesos.append(ajustados / ajustados.sum())
+    return pesos
+
+
+def probabilidades_posicao(probabilidades, posicoes=LUGARES_MAXIMO, modelo=MODELO_COLOCACAO):
+    """
+    Matriz (posicoes x n): [k, i] = probabilidade de o cavalo i chegar
+    exatamente em k+1º
+    """
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    n = probabilidades.size
+    posicoes = min(posicoes, n)
+    resultado = np.zeros((posicoes, n))
+    if not n:
+        return resultado
+
+    pesos = pesos_posicoes(probabilidades, posicoes, modelo)
+    prefixos = pesos[0]
+    resultado[0] = prefixos
+    # indices[s]: índice do cavalo na posição s do prefixo (eixo s, difundido nos demais)
+    indices = [np.arange(n)]
+    for posicao in range(1, posicoes):
+        peso = pesos[posicao]
+        restante = 1.0 - sum(peso[indice] for indice in indices)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            razao = prefixos / restante
+        razao[~np.isfinite(razao)] = 0.0
+        # P(i nesta posição) = peso_i * soma de razao nos prefixos sem i: o total
+        # menos os prefixos que contêm i (cada cavalo aparece no máximo uma vez)
+        contem = sum(
+            np.bincount(np.broadcast_to(indice, razao.shape).ravel(), weights=razao.ravel(), minlength=n)
+            for indice in indices
+        )
+        resultado[posicao] = peso * (razao.sum() - contem)
+        if posicao + 1 == posicoes:
+            break
+        # Prefixos da próxima posição; quem já está no prefixo não chega de novo
+        proximo = np.arange(n).reshape((1,) * posicao + (n,))
+        estendidos = razao[..., None] * peso
+        for indice in indices:
+            estendidos[np.broadcast_to(indice[..., None] == proximo, estendidos.shape)] = 0.0
+        prefixos = estendidos
+        indices = [indice[..., None] for indice in indices] + [proximo]
+    return resultado
+
+
+def probabilidades_colocacao(probabilidades, lugares, modelo=MODELO_COLOCACAO):
+    """
+    Probabilidade de cada cavalo terminar entre os `lugares` primeiros
+    """
+    return probabilidades_posicao(probabilidades, lugares, modelo).sum(axis=0)
+
+
+def valor_esperado_each_way(p_vitoria, p_colocacao, odds_decimal, fracao):
+    """
+    Valor esperado por unidade apostada (vitória + colocação); odds NaN -> NaN
+    """
+    odds_colocacao = 1.0 + (odds_decimal - 1.0) * float(fracao)
+    return (p_vitoria * odds_decimal + p_colocacao * odds_colocacao) / 2.0 - 1.0
+
+
+def analisar_colocacao(probabilidades, odds_decimais, termos, modelo=MODELO_COLOCACAO):
+    """
+    Por cavalo: probabilidade de colocação nos termos, valor esperado da
+    aposta simples e da each-way (NaN sem preço, odds None; each-way NaN sem termos)
+    """
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    odds_decimais = np.array([np.nan if odds is None else odds for odds in odds_decimais], dtype=float)
+    ev_vitoria = probabilidades * odds_decimais - 1.0
+    if termos is None:
+        nan = np.full(probabilidades.size, np.nan)
+        return nan, ev_vitoria, nan
+    colocacao = probabilidades_colocacao(probabilidades, termos.lugares, modelo)
+    ev_each_way = valor_esperado_each_way(probabilidades, colocacao, odds_decimais, termos.fracao)
+    return colocacao, ev_vitoria, ev_each_way
+
+
+def valor_resposta(valor, casas):
+    """
+    float arredondado para o JSON da resposta; NaN -> None
+    """
+    valor = float(valor)
+    return None if np.isnan(valor) else round(valor, casas)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro compacto de um corredor, com os campos já convertidos
+
+Os extratores produzem dicionários de texto ("5/2", "9-4", "1P23", "85"). O
+Corredor é montado uma única vez por cavalo, ao fim da extração, e guarda
+junto do texto original (que vai na resposta) os valores já interpretados:
+odds decimais (odds.py), peso em libras, forma tokenizada (forma.py), OR, idade e draw. Os
+cálculos de pontuação leem esses atributos em vez de refazer split/float a
+cada fator.
+"""
+
+from operator import attrgetter
+
+from forma import analisar_forma
+from odds import converter_odds, ODDS_PADRAO
+
+# Campos do dicionário de extração e o padrão usado pela análise quando faltam
+PADROES = (
+    ('nome', ''),
+    ('joquei', 'Desconhecido'),
+    ('odds', 'N/A'),
+    ('peso', 'N/A'),
+    ('idade', 'N/A'),
+    ('forma', ''),
+    ('official_rating', 'N/A'),
+    ('treinador', 'Desconhecido'),
+)
+
+VALORES_FALTANDO = ('N/A', 'Desconhecido', '')
+
+# Campos que não são preço: se só as odds mudaram, o resto da análise vale
+CAMPOS_SEM_PRECO = (
+    'nome', 'joquei', 'peso', 'idade', 'forma', 'official_rating', 'draw', 'treinador',
+    'joquei_stats', 'treinador_stats', 'historico_detalhado', 'condicoes_pista',
+    'joquei_conhecido', 'treinador_conhecido',
+)
+_dados_sem_preco = attrgetter(*CAMPOS_SEM_PRECO)
+
+
+def peso_em_libras(peso):
+    """
+    "9-4" (stones-libras) -> 130; None para outros formatos
+    """
+    if not isinstance(peso, str) or '-' not in peso:
+        return None
+    try:
+        stones, libras = peso.split('-')
+        return int(stones) * 14 + int(libras)
+    except ValueError:
+        return None
+
+
+def _float(valor):
+    if not valor or valor == 'N/A':
+        return None
+    try:
+        return float(valor)
+    except (ValueError, TypeError):
+        return None
+
+
+def _inteiro(valor, limpar=None):
+    try:
+        texto = str(valor)
+        if limpar:
+            texto = texto.replace(limpar, '').strip()
+        return int(texto)
+    except ValueError:
+        return None
+
+
+class Corredor:
+    """
+    Um cavalo da corrida: texto original + valores convertidos uma vez
+    """
+    __slots__ = (
+        'nome', 'joquei', 'odds', 'peso', 'idade', 'forma', 'official_rating', 'draw', 'treinador',
+        'joquei_stats', 'treinador_stats', 'historico_detalhado', 'condicoes_pista',
+        # Convertidos
+        'odds_decimal', 'odds_probabilidade', 'odds_numericas', 'peso_lbs', 'forma_analisada', 'posicoes', 'or_valor', 'or_inteiro',
+        'idade_anos', 'draw_num', 'joquei_conhecido', 'treinador_conhecido', 'campos_faltando', 'campos_faltando_ranking',
+    )
+
+    def __init__(self, dados):
+        for campo, padrao in PADROES:
+            setattr(self, campo, dados.get(campo, padrao))
+        self.draw = dados.get('draw')  # None: a análise usa a posição
+        self.joquei_stats = dados.get('joquei_stats')
+        self.treinador_stats = dados.get('treinador_stats')
+        self.historico_detalhado = dados.get('historico_detalhado', [])
+        self.condicoes_pista = dados.get('condicoes_pista', 'N/A')
+
+        precos = converter_odds(self.odds)
+        self.odds_decimal, self.odds_probabilidade = precos if precos else (None, None)
+        self.odds_numericas = self.odds_decimal if precos else ODDS_PADRAO
+        self.peso_lbs = peso_em_libras(self.peso)
+        self.forma_analisada = analisar_forma(self.forma)
+        self.posicoes = self.forma_analisada.posicoes
+        self.or_valor = _float(self.official_rating)
+        self.or_inteiro = _inteiro(self.official_rating)
+        self.idade_anos = _inteiro(self.idade, 'yo') if self.idade and self.idade != 'N/A' else None
+        self.draw_num = None
+        if self.draw is not None:
+            try:
+                self.draw_num = int(self.draw)
+            except (ValueError, TypeError):
+                pass
+
+        # Fator de contexto: nome ausente conta como informado, só 'N/A'/'Desconhecido' não
+        self.joquei_conhecido = dados.get('joquei', '') not in ('N/A', 'Desconhecido')
+        self.treinador_conhecido = dados.get('treinador', '') not in ('N/A', 'Desconhecido')
+
+        self.campos_faltando = sum(
+            1 for valor in (self.official_rating, self.joquei, self.peso, self.idade, self.forma)
+            if not valor or valor in VALORES_FALTANDO
+        )
+        self.campos_faltando_ranking = sum(
+            1 for valor in (self.official_rating, self.forma, self.peso, self.idade)
+            if not valor or valor in VALORES_FALTANDO
+        )
+
+    @classmethod
+    def de(cls, cavalo):
+        """
+        Aceita um Corredor já montado ou um dicionário de extração
+        """
+        return cavalo if isinstance(cavalo, cls) else cls(cavalo)
+
+    def mesmos_dados_sem_preco(self, outro):
+        """
+        True se os dois corredores só podem diferir nas odds
+        """
+        if self is outro:
+            return True
+        antes, agora = _dados_sem_preco(self), _dados_sem_preco(outro)
+        # 1 e 1.0 (ou True) são iguais mas aparecem diferentes na resposta
+        return antes == agora and list(map(type, antes)) == list(map(type, agora))
+
+    def get(self, campo, padrao=None):
+        """
+        Leitura no estilo dict dos campos originais (código que ainda trata dicts)
+        """
+        valor = getattr(self, campo, None) if campo in self.__slots__ else None
+        return padrao if valor is None else valor
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração dos corredores a partir de dados estruturados embutidos na página
+
+Páginas modernas de corrida costumam trazer o campo inteiro como JSON:
+__NEXT_DATA__ (Next.js), estado inicial (window.__INITIAL_STATE__ = {...}),
+JSON-LD (application/ld+json) ou atributos data-* com JSON. Uma varredura
+barata dos bytes localiza esses blocos, que são decodificados e convertidos
+direto no dicionário de corredor usado pelos analisadores (nome, joquei,
+odds, peso, forma, official_rating...), sem montar árvore DOM. Sem bloco
+reconhecível o extrator segue para o scraping do HTML.
+"""
+
+import re
+import html
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+MINIMO_CORREDORES = 2
+MAXIMO_CORREDORES = 40
+MAXIMO_NOS = 200000  # Limite da varredura em blocos JSON enormes
+
+_NEXT_DATA = re.compile(rb'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S | re.I)
+_JSON_LD = re.compile(rb'<script[^>]*\btype=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+_ESTADO = re.compile(rb'(?:__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__)\s*=\s*(?=[\[{])')
+_DATA_JSON = re.compile(rb'data-[\w-]+=(?:"\s*([\[{][^"]*)"|\'\s*([\[{][^\']*)\')')
+_CHARSET = re.compile(rb'charset=["\']?([\w-]+)', re.I)
+_H1 = re.compile(rb'<h1[^>]*>(.*?)</h1>', re.S | re.I)
+_TITLE = re.compile(rb'<title[^>]*>(.*?)</title>', re.S | re.I)
+_TAGS = re.compile(r'<[^>]+>')
+
+# Só vale decodificar blocos data-* que falam de corredores
+_INDICIOS_CORREDOR = (b'jockey', b'horse', b'runner', b'trainer')
+
+
+def _normalizar_chave(chave):
+    return chave.lower().replace('_', '').replace('-', '').replace(' ', '')
+
+
+# Campo do corredor -> chaves aceitas (normalizadas), em ordem de preferência
+ALIASES = {
+    'nome': ('horsename', 'horse', 'runnername', 'selectionname', 'name'),
+    'joquei': ('jockeyname', 'jockey', 'rider', 'ridername'),
+    'treinador': ('trainername', 'trainer'),
+    'odds': ('odds', 'currentodds', 'bestodds', 'price', 'fractionalodds', 'oddsfractional',
+             'decimalodds', 'oddsdecimal'),
+    'peso': ('weight', 'weightcarried', 'wgt', 'weightlbs'),
+    'idade': ('age', 'horseage'),
+    'forma': ('form', 'formfigures', 'recentform', 'formsummary'),
+    'official_rating': ('officialrating', 'or', 'ratingor', 'rating'),
+    'draw': ('draw', 'stall', 'stallnumber'),
+    'numero': ('saddlecloth', 'saddleclothnumber', 'clothnumber', 'runnernumber', 'number'),
+}
+# Campos que indicam que um objeto com "name" é mesmo um corredor
+CAMPOS_EVIDENCIA = ('joquei', 'treinador', 'odds', 'peso', 'idade', 'forma', 'official_rating')
+
+CHAVES_NAO_CORREDOR = frozenset(('nonrunner', 'isnonrunner', 'scratched', 'isscratched', 'withdrawn', 'nr'))
+STATUS_NAO_CORREDOR = frozenset(('nr', 'nonrunner', 'removed', 'withdrawn', 'scratched'))
+CHAVES_TITULO = ('racename', 'racetitle', 'title', 'name')
+CHAVES_PISTA = ('going', 'goingdescription', 'trackcondition')
+# Listas do JSON-LD em que só o nome já identifica o corredor
+CHAVES_COMPETIDORES = frozenset(('competitor', 'competitors'))
+
+
+def _texto(valor):
+    """
+    Valor escalar como texto (números inteiros sem ".0"); None se vazio
+    """
+    if isinstance(valor, bool) or valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return valor or None
+    if isinstance(valor, dict):
+        for chave in ('name', 'fullname', 'displayname', 'value'):
+            for original, interno in valor.items():
+                if _normalizar_chave(original) == chave:
+                    return _texto(interno)
+    return None
+
+
+def _odds(valor):
+    if isinstance(valor, dict):
+        campos = {_normalizar_chave(k): v for k, v in valor.items()}
+        if 'numerator' in campos and 'denominator' in campos:
+            return f"{_texto(campos['numerator'])}/{_texto(campos['denominator'])}"
+        for chave in ('fractional', 'display', 'decimal', 'value'):
+            if chave in campos:
+                return _texto(campos[chave])
+        return None
+    return _texto(valor)
+
+
+def _peso(valor, chave):
+    if isinstance(valor, dict):
+        campos = {_normalizar_chave(k): v for k, v in valor.items()}
+        if 'stones' in campos:
+            return f"{_texto(campos['stones'])}-{_texto(campos.get('pounds', 0))}"
+        return _texto(campos.get('display') or campos.get('value'))
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool) and (chave == 'weightlbs' or valor >= 70):
+        libras = int(valor)
+        return f'{libras // 14}-{libras % 14}'
+    return _texto(valor)
+
+
+def _forma(valor):
+    if isinstance(valor, list):
+        return ''.join(str(item) for item in valor if item is not None) or None
+    return _texto(valor)
+
+
+def _campos_normalizados(objeto):
+    campos = {}
+    for chave, valor in objeto.items():
+        if isinstance(chave, str):
+            campos.setdefault(_normalizar_chave(chave), valor)
+    return campos
+
+
+def _nao_corredor(campos):
+    if any(campos.get(chave) is True for chave in CHAVES_NAO_CORREDOR):
+        return True
+    status = campos.get('status')
+    return isinstance(status, str) and _normalizar_chave(status) in STATUS_NAO_CORREDOR
+
+
+def converter_corredor(objeto, posicao, so_nome=False):
+    """
+    Objeto JSON -> dicionário de corredor (None se não parece um corredor)
+    """
+    campos = _campos_normalizados(objeto)
+    if _nao_corredor(campos):
+        return None
+
+    # {"horse": {"name": ..., "age": ...}}: os dados do cavalo valem como do corredor
+    cavalo = campos.get('horse')
+    if isinstance(cavalo, dict):
+        for chave, valor in _campos_normalizados(cavalo).items():
+            campos.setdefault('horse' + chave if chave == 'name' else chave, valor)
+
+    valores = {}
+    for campo, aliases in ALIASES.items():
+        for chave in aliases:
+            if chave not in campos:
+                continue
+            valor = campos[chave]
+            if campo == 'odds':
+                valor = _odds(valor)
+            elif campo == 'peso':
+                valor = _peso(valor, chave)
+            elif campo == 'forma':
+                valor = _forma(valor)
+            else:
+                valor = _texto(valor)
+            if valor:
+                valores[campo] = valor
+                break
+
+    nome = valores.get('nome')
+    if not nome or len(nome) < 2:
+        return None
+    if not so_nome and not any(campo in valores for campo in CAMPOS_EVIDENCIA):
+        return None
+
+    rating = valores.get('official_rating', 'N/A')
+    return {
+        'nome': nome,
+        'joquei': valores.get('joquei', 'Jóquei N/A'),
+        'odds': valores.get('odds', 'N/A'),
+        'peso': valores.get('peso', 'N/A'),
+        'idade': valores.get('idade', 'N/A'),
+        'forma': valores.get('forma', 'N/A'),
+        'official_rating': rating if rating.isdigit() else 'N/A',
+        'draw': valores.get('draw') or valores.get('numero') or str(posicao + 1),
+        'treinador': valores.get('treinador', 'N/A'),
+        'historico_detalhado': [],
+    }
+
+
+def _valor_de(contexto, chaves):
+    if not contexto:
+        return None
+    campos = _campos_normalizados(contexto)
+    for chave in chaves:
+        valor = _texto(campos.get(chave))
+        if valor:
+            return valor
+    return None
+
+
+def localizar_corredores(dados):
+    """
+    Percorre o JSON e retorna (corredores, objeto que contém a lista) da lista
+    com mais corredores reconhecidos; ([], None) se nenhuma tiver o mínimo
+    """
+    melhor, contexto_melhor = [], None
+    pilha = [(dados, None, None)]
+    visitados = 0
+    while pilha and visitados < MAXIMO_NOS:
+        valor, chave, contexto = pilha.pop()
+        visitados += 1
+        if isinstance(valor, dict):
+            for filho_chave, filho in valor.items():
+                if isinstance(filho, (dict, list)):
+                    pilha.append((filho, filho_chave, valor))
+        elif isinstance(valor, list):
+            objetos = [item for item in valor if isinstance(item, dict)]
+            if len(objetos) >= MINIMO_CORREDORES:
+                so_nome = isinstance(chave, str) and _normalizar_chave(chave) in CHAVES_COMPETIDORES
+                corredores = []
+                for objeto in objetos:
+                    corredor = converter_corredor(objeto, len(corredores), so_nome)
+                    if corredor:
+                        corredores.append(corredor)
+                if len(corredores) >= MINIMO_CORREDORES and len(corredores) > len(melhor):
+                    melhor, contexto_melhor = corredores, contexto
+            for item in reversed(valor):
+                if isinstance(item, (dict, list)):
+                    pilha.append((item, chave, contexto))
+    return melhor, contexto_melhor
+
+
+def _encoding(conteudo):
+    casamento = _CHARSET.search(conteudo, 0, 4096)
+    if casamento:
+        nome = casamento.group(1).decode('ascii', 'ignore')
+        try:
+            ''.encode(nome)
+            return nome
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def blocos_json(conteudo):
+    """
+    Gera (tipo, objeto JSON) de cada bloco embutido na página
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode('utf-8')
+    encoding = _encoding(conteudo)
+    decodificador = json.JSONDecoder()
+
+    def decodificar(trecho, escapado=False):
+        texto = trecho.decode(encoding, 'replace')
+        if escapado:
+            texto = html.unescape(texto)
+        try:
+            return decodificador.raw_decode(texto.strip())[0]
+        except ValueError:
+            return None
+
+    if b'__NEXT_DATA__' in conteudo:
+        for casamento in _NEXT_DATA.finditer(conteudo):
+            objeto = decodificar(casamento.group(1))
+            if objeto is not None:
+                yield '__NEXT_DATA__', objeto
+
+    if b'_STATE__' in conteudo:
+        for casamento in _ESTADO.finditer(conteudo):
+            objeto = decodificar(conteudo[casamento.end():])
+            if objeto is not None:
+                yield 'estado inicial', objeto
+
+    if b'ld+json' in conteudo:
+        for casamento in _JSON_LD.finditer(conteudo):
+            objeto = decodificar(casamento.group(1))
+            if objeto is not None:
+                yield 'JSON-LD', objeto
+
+    # find() de bytes até cada 'data-' e só então a regex, ancorada ali
+    posicao = conteudo.find(b'data-')
+    while posicao != -1:
+        casamento = _DATA_JSON.match(conteudo, posicao) if conteudo[posicao - 1:posicao].isspace() else None
+        if casamento:
+            trecho = casamento.group(1) or casamento.group(2)
+            minusculo = trecho.lower()
+            if any(indicio in minusculo for indicio in _INDICIOS_CORREDOR):
+                objeto = decodificar(trecho, escapado=True)
+                if objeto is not None:
+                    yield 'atributo data-*', objeto
+            posicao = casamento.end()
+        posicao = conteudo.find(b'data-', posicao + 1)
+
+
+def _titulo_html(conteudo, encoding):
+    for expressao in (_H1, _TITLE):
+        casamento = expressao.search(conteudo)
+        if casamento:
+            texto = html.unescape(_TAGS.sub('', casamento.group(1).decode(encoding, 'replace')))
+            return ' '.join(texto.split())
+    return None
+
+
+def extrair_dados_embutidos(conteudo, titulo_padrao='Corrida'):
+    """
+    Dicionário da corrida a partir do primeiro bloco JSON com corredores (ou None)
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode('utf-8')
+    for tipo, objeto in blocos_json(conteudo):
+        corredores, contexto = localizar_corredores(objeto)
+        if not corredores:
+            continue
+        logger.info(f"Dados embutidos ({tipo}): {len(corredores)} corredores, sem parse do HTML")
+        titulo = _valor_de(contexto, CHAVES_TITULO) or _titulo_html(conteudo, _encoding(conteudo))
+        return {
+            'cavalos': corredores[:MAXIMO_CORREDORES],
+            'titulo_corrida': titulo or titulo_padrao,
+            'condicoes_pista': _valor_de(contexto, CHAVES_PISTA) or 'N/A',
+            'clima': 'N/A',
+            'origem_dados': tipo,
+        }
+    return None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estado das corridas já analisadas, para a reanálise incremental
+
+Perto da largada, de uma atualização para a outra só mudam as odds e saem
+cavalos retirados. Para cada corrida (URL canônica + campos calculados) fica
+guardado, por cavalo, o Corredor, a posição no campo e os valores de todos os
+nós do grafo de fatores. Na próxima análise da mesma corrida, se nenhum cavalo
+entrou e nenhum dado além do preço mudou, só os nós que dependem das odds (e
+da posição, para quem mudou de lugar) são recalculados; o ranking, a
+normalização e os grupos são refeitos sobre o campo inteiro.
+
+Os dicionários guardados são os mesmos das respostas em cache: a reanálise
+monta dicionários novos e nunca altera os anteriores.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+MAXIMO_CORRIDAS = int(os.environ.get('ESTADO_CORRIDAS_MAXIMO', 256))
+
+
+class EstadoCorrida:
+    """
+    Última análise de uma corrida: modelo, versão do índice de pessoas e,
+    por nome, (Corredor, posição, análise, intermediários)
+    """
+    __slots__ = ('modelo', 'versao_pessoas', 'corredores')
+
+    def __init__(self, modelo, versao_pessoas, corredores):
+        self.modelo = modelo
+        self.versao_pessoas = versao_pessoas
+        self.corredores = corredores
+
+
+class EstadosCorrida:
+    """
+    LRU dos estados por corrida, com contadores de reanálises
+    """
+    def __init__(self, maximo=MAXIMO_CORRIDAS):
+        self.maximo = maximo
+        self._estados = OrderedDict()
+        self._lock = threading.Lock()
+        self.incrementais = 0
+        self.completas = 0
+
+    def obter(self, chave):
+        with self._lock:
+            estado = self._estados.get(chave)
+            if estado is not None:
+                self._estados.move_to_end(chave)
+            return estado
+
+    def guardar(self, chave, estado, incremental):
+        with self._lock:
+            self._estados[chave] = estado
+            self._estados.move_to_end(chave)
+            while len(self._estados) > self.maximo:
+                self._estados.popitem(last=False)
+            if incremental:
+                self.incrementais += 1
+            else:
+                self.completas += 1
+
+    def limpar(self):
+        with self._lock:
+            self._estados.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'corridas': len(self._estados),
+                'maximo': self.maximo,
+                'incrementais': self.incrementais,
+                'completas': self.completas,
+            }
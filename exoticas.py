@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Apostas exóticas: forecasts e tricasts de todas as ordens, por valor esperado
+
+A partir das probabilidades de vitória normalizadas (probabilidades.py) e dos
+pesos por posição de Harville/Henery (colocacao.py), a probabilidade de cada
+ordem exata sai por broadcasting, sem laço por permutação:
+
+    forecast  P[i, j]    = p_i * w2_j / (1 - w2_i)                 (n x n)
+    tricast   P[i, j, k] = P[i, j] * w3_k / (1 - w3_i - w3_j)      (n x n x n)
+
+Num campo de 20 cavalos são 380 forecasts e 6.840 tricasts. O dividendo de
+cada linha é o informado na requisição ou, sem ele, uma estimativa: a mesma
+fórmula aplicada às probabilidades do mercado (odds normalizadas, sem a margem
+da vitória) e acrescida da margem das exóticas:
+
+    dividendo = 1 / (Q_mercado * (1 + margem))
+    valor esperado = P_modelo * dividendo - 1      (por unidade apostada)
+
+Reverse forecast (2 linhas) e combination tricast (6 linhas) são a média das
+linhas diretas. Só os `limite` melhores viram dicionários na resposta.
+"""
+
+import os
+from itertools import permutations
+
+import numpy as np
+
+from colocacao import MODELO_COLOCACAO, pesos_posicoes
+from odds import probabilidade_implicita
+from probabilidades import probabilidades_vitoria, pontuacoes_resultado
+
+FORECAST = 'forecast'
+REVERSE_FORECAST = 'reverse_forecast'
+TRICAST = 'tricast'
+COMBINATION_TRICAST = 'combination_tricast'
+# tipo -> (cavalos na ordem, aposta em qualquer ordem)
+TIPOS = {
+    FORECAST: (2, False),
+    REVERSE_FORECAST: (2, True),
+    TRICAST: (3, False),
+    COMBINATION_TRICAST: (3, True),
+}
+MARGEM_PADRAO = float(os.environ.get('EXOTICAS_MARGEM', 0.25))
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 500
+
+
+class ErroExoticas(ValueError):
+    """
+    Pedido de exóticas inválido
+    """
+
+
+def probabilidades_ordem(probabilidades, tamanho, modelo=MODELO_COLOCACAO):
+    """
+    Tensor (n x n [x n]) com a probabilidade de cada ordem exata dos
+    `tamanho` primeiros; ordens com cavalo repetido valem zero
+    """
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    n = probabilidades.size
+    pesos = pesos_posicoes(probabilidades, tamanho, modelo)
+    indices = np.arange(n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ordens = probabilidades[:, None] * pesos[1][None, :] / (1.0 - pesos[1][:, None])
+        ordens[indices, indices] = 0.0
+        if tamanho == 3:
+            terceiro = pesos[2]
+            ordens = ordens[:, :, None] * terceiro[None, None, :] / (
+                1.0 - terceiro[:, None, None] - terceiro[None, :, None]
+            )
+            ordens[indices, :, indices] = 0.0
+            ordens[:, indices, indices] = 0.0
+    ordens[~np.isfinite(ordens)] = 0.0
+    return ordens
+
+
+def probabilidades_mercado(odds):
+    """
+    Probabilidades implícitas nas odds normalizadas para somar 1 (NaN sem preço)
+    """
+    implicitas = np.array([np.nan if p is None else p for p in map(probabilidade_implicita, odds)], dtype=float)
+    total = np.nansum(implicitas)
+    return implicitas / total if total > 0 else implicitas
+
+
+def _indices_dividendos(dividendos, nomes, tamanho):
+    """
+    [{"ordem": [nome, ...], "dividendo": x}, ...] -> (índices por posição, dividendos)
+    """
+    if not isinstance(dividendos, list):
+        raise ErroExoticas('dividendos deve ser uma lista de {"ordem": [...], "dividendo": ...}')
+    posicao_nome = {nome: i for i, nome in enumerate(nomes)}
+    linhas, valores = [], []
+    for item in dividendos:
+        ordem = item.get('ordem') if isinstance(item, dict) else None
+        if not isinstance(ordem, list) or len(ordem) != tamanho:
+            raise ErroExoticas(f'cada dividendo precisa de uma ordem com {tamanho} cavalos')
+        desconhecidos = [nome for nome in ordem if nome not in posicao_nome]
+        if desconhecidos:
+            raise ErroExoticas(f"cavalos desconhecidos nos dividendos: {', '.join(map(str, desconhecidos))}")
+        if len(set(ordem)) != tamanho:
+            raise ErroExoticas(f"ordem com cavalo repetido: {' - '.join(ordem)}")
+        valor = item.get('dividendo')
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 1:
+            raise ErroExoticas(f"dividendo inválido para {' - '.join(ordem)}: {valor!r} (decimal, maior que 1)")
+        linhas.append([posicao_nome[nome] for nome in ordem])
+        valores.append(float(valor))
+    if not linhas:
+        return None, None
+    return tuple(np.array(linhas).T), np.array(valores)
+
+
+def precificar_exoticas(nomes, probabilidades, odds, tipo=FORECAST, margem=MARGEM_PADRAO,
+                        dividendos=None, limite=LIMITE_PADRAO, modelo=MODELO_COLOCACAO):
+    """
+    As `limite` combinações do tipo com maior valor esperado
+    """
+    if tipo not in TIPOS:
+        raise ErroExoticas(f"Tipo desconhecido: {tipo} (use {', '.join(TIPOS)})")
+    if isinstance(margem, bool) or not isinstance(margem, (int, float)) or not 0 <= margem < 1:
+        raise ErroExoticas(f'margem deve ser um número em [0, 1), veio {margem!r}')
+    if isinstance(limite, bool) or not isinstance(limite, int) or not 1 <= limite <= LIMITE_MAXIMO:
+        raise ErroExoticas(f'limite deve ser um inteiro entre 1 e {LIMITE_MAXIMO}, veio {limite!r}')
+    tamanho, qualquer_ordem = TIPOS[tipo]
+    n = len(nomes)
+    if n < tamanho:
+        raise ErroExoticas(f'{tipo} precisa de pelo menos {tamanho} cavalos, a corrida tem {n}')
+
+    modelo_ordens = probabilidades_ordem(probabilidades, tamanho, modelo)
+    mercado = probabilidades_mercado(odds)
+    with np.errstate(divide='ignore'):
+        dividendos_linha = 1.0 / (probabilidades_ordem(np.nan_to_num(mercado), tamanho, modelo) * (1.0 + margem))
+    # Ordem impossível ou com cavalo sem preço: sem dividendo estimado
+    dividendos_linha[~np.isfinite(dividendos_linha)] = np.nan
+    sem_preco = np.isnan(mercado)
+    for eixo in range(tamanho):
+        dividendos_linha[(slice(None),) * eixo + (sem_preco,)] = np.nan
+    informados = np.zeros(dividendos_linha.shape, dtype=bool)
+    if dividendos:
+        indices, valores = _indices_dividendos(dividendos, nomes, tamanho)
+        if indices is not None:
+            dividendos_linha[indices] = valores
+            informados[indices] = True
+
+    retorno = modelo_ordens * dividendos_linha
+    linhas = 1
+    probabilidade = modelo_ordens
+    if qualquer_ordem:
+        # Média das linhas diretas de cada conjunto, guardada na ordem crescente de índices
+        eixos = list(permutations(range(tamanho)))
+        linhas = len(eixos)
+        retorno = sum(np.transpose(retorno, eixo) for eixo in eixos) / linhas
+        probabilidade = sum(np.transpose(modelo_ordens, eixo) for eixo in eixos)
+        grade = np.indices(retorno.shape)
+        crescente = np.all(grade[:-1] < grade[1:], axis=0)
+        retorno[~crescente] = np.nan
+    valor_esperado = (retorno - 1.0).ravel()
+
+    validos = np.flatnonzero(np.isfinite(valor_esperado))
+    limite = min(limite, validos.size)
+    if limite:
+        melhores = validos[np.argpartition(-valor_esperado[validos], limite - 1)[:limite]]
+        melhores = melhores[np.argsort(-valor_esperado[melhores], kind='stable')]
+    else:
+        melhores = validos[:0]
+
+    combinacoes = []
+    for codigo in melhores:
+        ordem = np.unravel_index(codigo, retorno.shape)
+        combinacoes.append({
+            'ordem': [nomes[i] for i in ordem],
+            'linhas': linhas,
+            'probabilidade': round(float(probabilidade[ordem]), 5),
+            'dividendo': None if qualquer_ordem else round(float(dividendos_linha[ordem]), 2),
+            'dividendo_informado': None if qualquer_ordem else bool(informados[ordem]),
+            'valor_esperado': round(float(valor_esperado[codigo]), 4),
+        })
+    return {
+        'tipo': tipo,
+        'margem': margem,
+        'modelo': modelo,
+        'combinacoes_avaliadas': int(validos.size),
+        'combinacoes': combinacoes,
+    }
+
+
+def exoticas_resultado(resultado, tipo=FORECAST, margem=MARGEM_PADRAO, dividendos=None, limite=LIMITE_PADRAO):
+    """
+    Exóticas a partir do resultado de analisar_cavalos
+    """
+    nomes, pontuacoes = pontuacoes_resultado(resultado)
+    odds = [analise.get('odds') for analise in resultado.get('dados', {}).get('analises', [])]
+    return precificar_exoticas(nomes, probabilidades_vitoria(pontuacoes), odds, tipo, margem, dividendos, limite)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração declarativa de corredores a partir de especificações por site
+
+As especificações ficam em especificacoes_extracao.json: para cada domínio,
+o container de corredor e, para cada campo (nome, jóquei, treinador, odds,
+peso, OR, forma...), os seletores alternativos, limpeza e validação. Na
+carga tudo é compilado em expressões XPath do lxml (regex de classe/atributo
+via EXSLT); a extração avalia essas expressões direto na árvore lxml, uma
+passada por corredor. Ajustar ou incluir um site é só editar o JSON.
+
+Seletor compacto (objeto) -> XPath relativo ao container:
+    {"tag": "a", "classe": "RC-runnerName"}          .//a[re:test(@class, ...)]
+    {"tag": "a", "tem": "data-order-jockey",
+     "ler": "@data-order-jockey"}                     valor do atributo
+    {"tag": "a", "atributos": {"href": "/horse/"}}   regex no atributo
+Um seletor string é usado como XPath literal (ex.: "@data-diffusion-horsename").
+"""
+
+import os
+import re
+import json
+import logging
+
+from lxml import etree
+from bs4 import UnicodeDammit
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_ESPECIFICACOES = os.environ.get(
+    'ESPECIFICACOES_EXTRACAO',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'especificacoes_extracao.json')
+)
+
+NAMESPACES = {'re': 'http://exslt.org/regular-expressions'}
+
+# Mesmo texto que o get_text(strip=True) do BeautifulSoup (sem script/style)
+_TEXTOS = etree.XPath('.//text()[not(parent::script or parent::style)]')
+_TITULO = (etree.XPath('(//h1)[1]'), etree.XPath('(//title)[1]'))
+
+
+class ErroEspecificacao(Exception):
+    """
+    Especificação de extração inválida
+    """
+
+
+def texto_elemento(elemento):
+    """
+    Texto do elemento com cada trecho aparado e concatenado
+    """
+    return ''.join(trecho.strip() for trecho in _TEXTOS(elemento))
+
+
+def analisar_html(conteudo):
+    """
+    Árvore lxml do documento; a decodificação segue a mesma detecção do BeautifulSoup
+    """
+    if isinstance(conteudo, bytes):
+        conteudo = UnicodeDammit(conteudo, is_html=True).unicode_markup
+    return etree.HTML(conteudo)
+
+
+def _literal(texto):
+    """
+    Literal de string XPath
+    """
+    if "'" not in texto:
+        return f"'{texto}'"
+    if '"' not in texto:
+        return f'"{texto}"'
+    raise ErroEspecificacao(f'Padrão com aspas simples e duplas não suportado: {texto}')
+
+
+def _predicados(seletor):
+    predicados = []
+    if 'classe' in seletor:
+        predicados.append(f"re:test(@class, {_literal(seletor['classe'])})")
+    if 'tem' in seletor:
+        predicados.append(f"@{seletor['tem']}")
+    for atributo, padrao in seletor.get('atributos', {}).items():
+        predicados.append(f"re:test(@{atributo}, {_literal(padrao)})")
+    return seletor.get('tag', '*') + ''.join(f'[{p}]' for p in predicados)
+
+
+def _compilar(expressao):
+    try:
+        return etree.XPath(expressao, namespaces=NAMESPACES)
+    except etree.XPathSyntaxError as e:
+        raise ErroEspecificacao(f'XPath inválido ({expressao}): {e}') from e
+
+
+def compilar_seletor(seletor):
+    """
+    Seletor de campo -> XPath compilado que retorna o primeiro nó (ou atributo)
+    """
+    if isinstance(seletor, str):
+        return _compilar(seletor)
+    expressao = f'(.//{_predicados(seletor)})[1]'
+    ler = seletor.get('ler', 'texto')
+    if ler != 'texto':
+        if not ler.startswith('@'):
+            raise ErroEspecificacao(f"'ler' deve ser 'texto' ou '@atributo': {ler}")
+        expressao += '/' + ler
+    return _compilar(expressao)
+
+
+class Campo:
+    """
+    Um campo do corredor: alternativas de seletor, limpeza, validação e padrão
+    """
+    __slots__ = ('nome', 'seletores', 'se_vazio', 'limpar', 'invalidos', 'formato',
+                 'tamanho_minimo', 'obrigatorio', 'padrao', 'tipo')
+
+    def __init__(self, nome, config):
+        self.nome = nome
+        self.seletores = [compilar_seletor(s) for s in config.get('seletores', [])]
+        self.se_vazio = [compilar_seletor(s) for s in config.get('se_vazio', [])]
+        self.limpar = [(re.compile(padrao), substituto) for padrao, substituto in config.get('limpar', [])]
+        self.invalidos = frozenset(config.get('invalidos', []))
+        self.formato = re.compile(config['formato']) if 'formato' in config else None
+        self.tamanho_minimo = config.get('tamanho_minimo', 0)
+        self.obrigatorio = config.get('obrigatorio', False)
+        self.padrao = config.get('padrao', 'N/A')
+        self.tipo = config.get('tipo', 'texto')
+        if self.tipo not in ('texto', 'inteiro'):
+            raise ErroEspecificacao(f"Tipo de campo desconhecido em {nome}: {self.tipo}")
+
+    def _valido(self, valor):
+        if valor is None or len(valor) < self.tamanho_minimo or valor in self.invalidos:
+            return False
+        return self.formato is None or bool(self.formato.match(valor))
+
+    @staticmethod
+    def _primeiro(seletores, elemento):
+        """
+        Valor do primeiro seletor que encontra algo (None se nenhum encontra)
+        """
+        for seletor in seletores:
+            resultado = seletor(elemento)
+            if resultado:
+                no = resultado[0]
+                return texto_elemento(no) if isinstance(no, etree._Element) else str(no).strip()
+        return None
+
+    def extrair(self, elemento, indice):
+        """
+        Valor do campo, ou None se o campo é obrigatório e não foi encontrado
+        """
+        valor = self._primeiro(self.seletores, elemento)
+        if valor is not None and self.se_vazio and not self._valido(valor):
+            valor = self._primeiro(self.se_vazio, elemento)
+
+        if valor is not None:
+            for padrao, substituto in self.limpar:
+                valor = padrao.sub(substituto, valor)
+            if self.limpar:
+                valor = valor.strip()
+
+        if not self._valido(valor):
+            if self.obrigatorio:
+                return None
+            valor = self._valor_padrao(indice)
+        elif self.tipo == 'inteiro':
+            valor = int(valor)
+        return valor
+
+    def _valor_padrao(self, indice):
+        if isinstance(self.padrao, list):
+            return list(self.padrao)
+        if isinstance(self.padrao, str):
+            valor = self.padrao.replace('{posicao}', str(indice + 1))
+            return int(valor) if self.tipo == 'inteiro' else valor
+        return self.padrao
+
+
+class EspecificacaoFonte:
+    """
+    Especificação compilada de um site
+    """
+    def __init__(self, dominio, config):
+        self.dominio = dominio
+        self.nome_fonte = config.get('nome_fonte', dominio)
+        self.titulo_padrao = config.get('titulo_padrao', f'Corrida {self.nome_fonte}')
+        self.maximo = config.get('maximo', 15)
+        self.deduplicar = config.get('deduplicar', False)
+
+        containers = config.get('containers')
+        if not containers:
+            raise ErroEspecificacao(f'{dominio}: nenhum container de corredor definido')
+        self._containers = [_compilar(f'//{_predicados(c)}') for c in containers]
+        # Teste do próprio elemento (parse incremental): só o container principal
+        self._e_container = _compilar(f'self::{_predicados(containers[0])}')
+
+        campos = config.get('campos', {})
+        if 'nome' not in campos:
+            raise ErroEspecificacao(f"{dominio}: campo 'nome' é obrigatório na especificação")
+        self.campos = [Campo(nome, campo) for nome, campo in campos.items()]
+
+    def e_container(self, elemento):
+        return bool(self._e_container(elemento))
+
+    def containers(self, arvore):
+        """
+        Containers da primeira alternativa que encontra algum
+        """
+        for expressao in self._containers:
+            encontrados = expressao(arvore)
+            if encontrados:
+                return encontrados
+        return []
+
+    def extrair_corredor(self, elemento, indice):
+        """
+        Uma passada pelo container: dict do corredor ou None (campo obrigatório ausente)
+        """
+        cavalo = {}
+        for campo in self.campos:
+            valor = campo.extrair(elemento, indice)
+            if valor is None:
+                return None
+            cavalo[campo.nome] = valor
+        return cavalo
+
+    def extrair_documento(self, arvore):
+        """
+        Extrai título e corredores de uma árvore lxml (None se não há corredores)
+        """
+        cavalos = []
+        nomes_vistos = set()
+        for elemento in self.containers(arvore):
+            if len(cavalos) >= self.maximo:
+                break
+            try:
+                cavalo = self.extrair_corredor(elemento, len(cavalos))
+            except Exception as e:
+                logger.debug(f"{self.nome_fonte} - erro ao processar container: {e}")
+                continue
+            if cavalo is None:
+                continue
+            if self.deduplicar:
+                if cavalo['nome'] in nomes_vistos:
+                    continue
+                nomes_vistos.add(cavalo['nome'])
+            cavalos.append(cavalo)
+
+        logger.info(f"{self.nome_fonte} - {len(cavalos)} cavalos extraídos pela especificação")
+        return self.montar_dados(cavalos, self.titulo(arvore))
+
+    def titulo(self, arvore):
+        for expressao in _TITULO:
+            encontrados = expressao(arvore)
+            if encontrados:
+                return texto_elemento(encontrados[0])
+        return None
+
+    def montar_dados(self, cavalos, titulo=None):
+        """
+        Dicionário da corrida no formato dos extratores (None se vazio)
+        """
+        if self.deduplicar:
+            unicos = []
+            nomes_vistos = set()
+            for cavalo in cavalos:
+                if cavalo['nome'] not in nomes_vistos:
+                    unicos.append(cavalo)
+                    nomes_vistos.add(cavalo['nome'])
+            cavalos = unicos
+        if not cavalos:
+            return None
+        return {
+            'cavalos': cavalos[:self.maximo],
+            'titulo_corrida': self.titulo_padrao if titulo is None else titulo,
+            'condicoes_pista': 'N/A',
+            'clima': 'N/A'
+        }
+
+
+class EspecificacoesExtracao:
+    """
+    Todas as especificações, compiladas uma vez na carga
+    """
+    def __init__(self, caminho=CAMINHO_ESPECIFICACOES):
+        self.caminho = caminho
+        self.fontes = {}
+        self.carregar()
+
+    def carregar(self):
+        try:
+            with open(self.caminho, encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"Especificações de extração não encontradas: {self.caminho}")
+            self.fontes = {}
+            return
+        self.fontes = {
+            dominio: EspecificacaoFonte(dominio, fonte)
+            for dominio, fonte in config.get('fontes', {}).items()
+        }
+        logger.info(f"Especificações de extração carregadas: {', '.join(self.fontes) or 'nenhuma'}")
+
+    def para_url(self, url):
+        """
+        Especificação do site da URL (ou None)
+        """
+        url_lower = url.lower()
+        for dominio, especificacao in self.fontes.items():
+            if dominio in url_lower:
+                return especificacao
+        return None
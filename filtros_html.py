@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backend de parse do HTML e filtros (SoupStrainer) por fonte
+
+O BeautifulSoup usa o lxml por padrão (PARSER_HTML=html.parser volta ao parser
+puro Python). Cada extrator de site declara um filtro que só materializa o
+título e os elementos ligados aos corredores; rodapés, menus e scripts
+enormes nem chegam a virar objetos Tag.
+"""
+
+import os
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+PARSERS_SUPORTADOS = ('lxml', 'html.parser', 'html5lib')
+PARSER_HTML = os.environ.get('PARSER_HTML', 'lxml')
+
+if PARSER_HTML not in PARSERS_SUPORTADOS:
+    logger.warning(f"PARSER_HTML inválido ({PARSER_HTML}); usando lxml")
+    PARSER_HTML = 'lxml'
+
+# Sempre mantidos: o título da corrida vem do h1 (ou do <title>)
+TAGS_TITULO = ('h1', 'title')
+
+
+def filtro_corredores(tags=(), classes=(), hrefs=()):
+    """
+    Cria um SoupStrainer que mantém (com toda a subárvore) os elementos:
+    - cujo nome está em `tags` (além de h1/title)
+    - que casam com algum par (tag ou None, regex da classe) de `classes`
+    - links <a> cujo href contém algum trecho de `hrefs`
+
+    O filtro só é consultado para elementos fora de um elemento já mantido,
+    então ele precisa cobrir o ancestral mais externo que cada seletor do
+    extrator usa (ex.: '.runner a' -> elementos com classe runner).
+    """
+    tags = frozenset(TAGS_TITULO + tuple(tags))
+
+    def aceitar(nome, atributos):
+        if nome in tags:
+            return True
+        classe = atributos.get('class') or ''
+        if isinstance(classe, list):
+            classe = ' '.join(classe)
+        if classe:
+            for tag, padrao in classes:
+                if (tag is None or tag == nome) and padrao.search(classe):
+                    return True
+        if nome == 'a' and hrefs:
+            href = atributos.get('href') or ''
+            return any(trecho in href for trecho in hrefs)
+        return False
+
+    return SoupStrainer(aceitar)
+
+
+def criar_soup(conteudo, filtro=None, parser=None):
+    """
+    Monta o soup com o backend configurado, restrito ao filtro (se houver)
+    """
+    return BeautifulSoup(conteudo, parser or PARSER_HTML, parse_only=filtro)
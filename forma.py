@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenizador das strings de forma ("1121-3", "P/4U0", "(12)31")
+
+Convenções:
+    1-9      posição de chegada
+    0        10º ou pior (POSICAO_DEZ_OU_PIOR)
+    (12)     posição com mais de um dígito
+    letras   não terminou (P pulled up, F fell, U unseated, R refused,
+             B brought down...): SEM_POSICAO
+    -        quebra de temporada
+    /        ausência longa (uma temporada inteira ou mais)
+    espaços e outras pontuações são ignorados
+
+Cada corrida vira um inteiro em `posicoes`; os separadores não ocupam
+posição e ficam em `quebras` / `quebras_longas` pelo índice da corrida que
+vem logo depois deles. Os fatores leem as primeiras corridas da string como
+as recentes, como a análise sempre fez.
+
+Vitórias, colocações, pontos ponderados, momentum e tendência são calculados
+numa única passada pelas últimas 5 corridas, e a Forma fica memorizada por
+string distinta (num campo, e mais ainda num lote, as formas se repetem).
+"""
+
+import os
+
+from tabelas_pontuacao import PONTOS_POSICAO_FORMA, PESOS_POSICAO_FORMA, PONTOS_MOMENTUM
+
+MAXIMO_MEMO = int(os.environ.get('FORMA_MEMO', 20000))
+
+SEM_POSICAO = -1          # Não terminou (P, F, U, R, B...)
+POSICAO_DEZ_OU_PIOR = 10  # '0' na forma
+QUEBRA_TEMPORADA = '-'
+QUEBRA_LONGA = '/'
+SEM_FORMA = ('N/A', 'NA')  # Texto que os extratores usam para forma ausente
+
+
+class Forma:
+    """
+    Forma já tokenizada e os números que os fatores de forma usam
+    """
+    __slots__ = (
+        'texto', 'posicoes', 'quebras', 'quebras_longas', 'corridas',
+        'vitorias_3', 'colocacoes_3', 'vitorias_5', 'colocacoes_5',
+        'pontos_forma', 'pontos_momentum', 'tendencia', 'top2_ultimas_2',
+    )
+
+    def __init__(self, texto, posicoes=(), quebras=(), quebras_longas=()):
+        self.texto = texto
+        self.posicoes = posicoes
+        self.quebras = quebras
+        self.quebras_longas = quebras_longas
+        self.corridas = len(posicoes)
+
+        # Uma passada pelas últimas 5 corridas
+        vitorias_3 = colocacoes_3 = vitorias_5 = colocacoes_5 = 0
+        pontos_forma = 0
+        pontos_momentum = 0
+        for i, posicao in enumerate(posicoes[:5]):
+            vitoria = posicao == 1
+            colocacao = posicao == 2 or posicao == 3
+            vitorias_5 += vitoria
+            colocacoes_5 += colocacao
+            pontos = PONTOS_POSICAO_FORMA.get(posicao)
+            if pontos is not None:
+                pontos_forma += pontos * PESOS_POSICAO_FORMA[i]
+            if i < 3:
+                vitorias_3 += vitoria
+                colocacoes_3 += colocacao
+                pontos_momentum += PONTOS_MOMENTUM.get(posicao, 1)
+        self.vitorias_3 = vitorias_3
+        self.colocacoes_3 = colocacoes_3
+        self.vitorias_5 = vitorias_5
+        self.colocacoes_5 = colocacoes_5
+        self.pontos_forma = pontos_forma
+        self.pontos_momentum = pontos_momentum
+        self.top2_ultimas_2 = 1 in posicoes[:2] or 2 in posicoes[:2]
+
+        # Tendência das últimas 3 (melhorando +3/+2, piorando -2), só com 3 chegadas
+        tendencia = 0
+        if self.corridas >= 3 and SEM_POSICAO not in posicoes[:3]:
+            pos1, pos2, pos3 = posicoes[:3]
+            if pos1 < pos2 < pos3:
+                tendencia = 3
+            elif pos1 < pos2:
+                tendencia = 2
+            elif pos1 > pos2 > pos3:
+                tendencia = -2
+        self.tendencia = tendencia
+
+    def __repr__(self):
+        return f'Forma({self.texto!r}, posicoes={self.posicoes}, quebras={self.quebras})'
+
+
+FORMA_VAZIA = Forma('')
+
+
+def tokenizar_forma(texto):
+    """
+    String de forma -> Forma (sem memorização; use analisar_forma)
+    """
+    if not isinstance(texto, str) or not texto or texto.strip() in SEM_FORMA:
+        return FORMA_VAZIA
+
+    posicoes = []
+    quebras = []
+    quebras_longas = []
+    i = 0
+    tamanho = len(texto)
+    while i < tamanho:
+        c = texto[i]
+        if '1' <= c <= '9':
+            posicoes.append(ord(c) - 48)
+        elif c == '0':
+            posicoes.append(POSICAO_DEZ_OU_PIOR)
+        elif c == '(':
+            fim = texto.find(')', i)
+            numero = texto[i + 1:fim] if fim > 0 else ''
+            if numero.isascii() and numero.isdigit():
+                posicoes.append(int(numero) or POSICAO_DEZ_OU_PIOR)
+                i = fim + 1
+                continue
+        elif c == QUEBRA_TEMPORADA or c == QUEBRA_LONGA:
+            indice = len(posicoes)
+            if not quebras or quebras[-1] != indice:
+                quebras.append(indice)
+            if c == QUEBRA_LONGA and (not quebras_longas or quebras_longas[-1] != indice):
+                quebras_longas.append(indice)
+        elif c.isalnum():
+            posicoes.append(SEM_POSICAO)
+        i += 1
+
+    return Forma(texto, tuple(posicoes), tuple(quebras), tuple(quebras_longas))
+
+
+class TokenizadorForma:
+    """
+    tokenizar_forma com memória por string distinta
+    """
+    def __init__(self, maximo_memo=MAXIMO_MEMO):
+        self.maximo_memo = maximo_memo
+        self._memo = {}
+
+    def analisar(self, texto):
+        if not isinstance(texto, str):
+            return FORMA_VAZIA
+        forma = self._memo.get(texto)
+        if forma is None:
+            forma = tokenizar_forma(texto)
+            if len(self._memo) >= self.maximo_memo:
+                self._memo.clear()
+            self._memo[texto] = forma
+        return forma
+
+    def limpar(self):
+        self._memo.clear()
+
+
+TOKENIZADOR_FORMA = TokenizadorForma()
+
+
+def analisar_forma(texto):
+    """
+    Forma tokenizada de `texto`, memorizada por string distinta
+    """
+    return TOKENIZADOR_FORMA.analisar(texto)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grafo de dependências dos fatores de análise
+
+Cada fator é um nó com as entradas que usa (outros nós ou valores de
+origem, como o cavalo e o modelo). Pedidas as saídas, o grafo separa só os
+nós de que elas dependem, em ordem topológica, e compila esse plano numa
+função Python de linha reta (um cálculo por nó, cada um feito uma única vez,
+valores em variáveis locais), guardada por conjunto de saídas. Assim o
+ranking rápido não calcula tendências, distância, pista nem probabilidade de
+vitória, e a análise completa custa o mesmo que o código escrito à mão.
+
+    grafo = GrafoFatores(fontes=('cavalo',))
+    grafo.no('rating', ('cavalo',), lambda cavalo: ...)
+    grafo.no('total', ('rating', 'forma'), lambda rating, forma: ...)
+    avaliar = grafo.compilar(('total',))
+    avaliar(cavalo)   # -> {'total': ...}
+
+Quando só algumas entradas mudam (odds, posição), compilar_atualizacao
+gera a função que recalcula apenas os nós que dependem delas e copia os
+demais da avaliação anterior.
+"""
+
+MAXIMO_PLANOS = 256
+
+
+class ErroGrafo(ValueError):
+    """
+    Nó repetido, entrada desconhecida ou saída inexistente
+    """
+
+
+class GrafoFatores:
+    """
+    Nós registrados em ordem (cada entrada precisa existir antes), o que
+    exclui ciclos por construção
+    """
+    def __init__(self, fontes=()):
+        self.fontes = tuple(fontes)
+        self._nos = {}       # nome -> (funcao, entradas)
+        self._planos = {}    # saidas -> função compilada
+
+    def no(self, nome, entradas, funcao):
+        if nome in self._nos or nome in self.fontes:
+            raise ErroGrafo(f"Nó repetido: {nome}")
+        desconhecidas = [entrada for entrada in entradas if entrada not in self._nos and entrada not in self.fontes]
+        if desconhecidas:
+            raise ErroGrafo(f"Nó {nome}: entradas desconhecidas {', '.join(desconhecidas)}")
+        self._nos[nome] = (funcao, tuple(entradas))
+        self._planos.clear()
+
+    def __contains__(self, nome):
+        return nome in self._nos or nome in self.fontes
+
+    @property
+    def nos(self):
+        return tuple(self._nos)
+
+    def plano(self, saidas):
+        """
+        Nomes dos nós necessários para `saidas`, na ordem de avaliação
+        """
+        inexistentes = [saida for saida in saidas if saida not in self]
+        if inexistentes:
+            raise ErroGrafo(f"Saídas inexistentes: {', '.join(inexistentes)}")
+        necessarios = set()
+        pendentes = list(saidas)
+        while pendentes:
+            nome = pendentes.pop()
+            if nome in necessarios or nome in self.fontes:
+                continue
+            necessarios.add(nome)
+            pendentes.extend(self._nos[nome][1])
+        # A ordem de registro já é topológica
+        return tuple(nome for nome in self._nos if nome in necessarios)
+
+    def dependentes(self, nomes):
+        """
+        Nós que dependem (direta ou indiretamente) de `nomes`, eles incluídos
+        """
+        sujos = set(nomes)
+        for nome, (_, entradas) in self._nos.items():
+            if any(entrada in sujos for entrada in entradas):
+                sujos.add(nome)
+        return sujos
+
+    def _gerar(self, chave, saidas, sujos=None):
+        """
+        Compila o plano de `saidas`. Com `sujos`, gera a atualização: só os
+        nós sujos são calculados, os demais vêm dos valores anteriores
+        """
+        funcao = self._planos.get(chave)
+        if funcao is not None:
+            return funcao
+
+        plano = self.plano(saidas)
+        saidas_set = set(saidas)
+        intermediarios = [nome for nome in plano if nome not in saidas_set]
+        variaveis = {fonte: f'a{i}' for i, fonte in enumerate(self.fontes)}
+        parametros = list(variaveis.values()) + (['anterior', 'intermediarios'] if sujos is not None else [])
+        ambiente = {}
+        linhas = [f"def avaliar({', '.join(parametros)}):"]
+        for i, nome in enumerate(plano):
+            variaveis[nome] = f'v{i}'
+            if sujos is not None and nome not in sujos:
+                origem = 'anterior' if nome in saidas_set else 'intermediarios'
+                linhas.append(f"    v{i} = {origem}[{nome!r}]")
+                continue
+            funcao_no, entradas = self._nos[nome]
+            ambiente[f'f{i}'] = funcao_no
+            linhas.append(f"    v{i} = f{i}({', '.join(variaveis[entrada] for entrada in entradas)})")
+        retorno = '{' + ', '.join(f'{saida!r}: {variaveis[saida]}' for saida in saidas) + '}'
+        if chave[1]:
+            retorno += ', {' + ', '.join(f'{nome!r}: {variaveis[nome]}' for nome in intermediarios) + '}'
+        linhas.append(f'    return {retorno}')
+        exec(compile('\n'.join(linhas), f'<plano de {len(saidas)} saídas>', 'exec'), ambiente)
+        funcao = ambiente['avaliar']
+
+        if len(self._planos) >= MAXIMO_PLANOS:
+            self._planos.clear()
+        self._planos[chave] = funcao
+        return funcao
+
+    def compilar(self, saidas, intermediarios=False):
+        """
+        Função (fontes na ordem de self.fontes) -> {saida: valor} que calcula
+        só o plano de `saidas`. Com intermediarios=True retorna também os
+        valores dos nós do plano que não são saídas (para atualizações)
+        """
+        saidas = tuple(saidas)
+        return self._gerar((saidas, intermediarios, None), saidas)
+
+    def compilar_atualizacao(self, alterados, saidas):
+        """
+        Função (fontes..., anterior, intermediarios) -> (saídas, intermediários)
+        que recalcula só o que depende de `alterados` (fontes ou nós) e copia
+        o resto da avaliação anterior (compilar(saidas, intermediarios=True))
+        """
+        saidas = tuple(saidas)
+        alterados = tuple(sorted(alterados))
+        chave = (saidas, True, alterados)
+        funcao = self._planos.get(chave)
+        if funcao is not None:
+            return funcao
+        return self._gerar(chave, saidas, self.dependentes(alterados))
+
+    def avaliar(self, fontes, saidas):
+        """
+        {saida: valor} a partir de um dicionário com os valores de origem
+        """
+        return self.compilar(saidas)(*(fontes[fonte] for fonte in self.fontes))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de jóqueis e treinadores: nome normalizado -> pessoa canônica
+
+As pessoas ficam em pessoas.json (ou no arquivo de PESSOAS_ARQUIVO):
+
+    {"id": "oisin-murphy", "nome": "Oisin Murphy", "nivel": "elite",
+     "variantes": ["..."], "stats": {"win_percentage": 21.5, "rides": 800}}
+
+`variantes` e `stats` são opcionais (treinadores usam "runs" em vez de
+"rides"). Na carga cada pessoa entra no índice pelo nome completo, pela
+inicial + sobrenome ("o murphy"), pelas iniciais + sobrenome quando há nome
+do meio ("a p obrien") e pelas variantes; chaves que apontam para pessoas
+diferentes são descartadas. Nomes da página passam pela mesma normalização
+(minúsculas, sem acentos, apóstrofos, pontuação, títulos nem descarga de
+aprendiz "(3)"), e a busca é um acesso a dicionário. Sobrenome sozinho não é
+chave: "J Murphy" não é "Oisin Murphy".
+
+O arquivo pode ser editado com o servidor no ar: recarregar_se_mudou() relê o
+arquivo quando a data de modificação muda (verificada no máximo a cada
+PESSOAS_VERIFICACAO segundos), e o índice novo substitui o antigo de uma vez.
+"""
+
+import os
+import re
+import logging
+import unicodedata
+
+from arquivo_recarregavel import ArquivoRecarregavel
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_PESSOAS = os.environ.get(
+    'PESSOAS_ARQUIVO',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pessoas.json')
+)
+INTERVALO_VERIFICACAO = float(os.environ.get('PESSOAS_VERIFICACAO', 5))
+MAXIMO_MEMO = int(os.environ.get('PESSOAS_MEMO', 20000))
+
+JOQUEI = 'joquei'
+TREINADOR = 'treinador'
+NIVEL_ELITE = 'elite'
+
+# Seção do arquivo de cada tipo de pessoa
+SECOES = {JOQUEI: 'joqueis', TREINADOR: 'treinadores'}
+
+TITULOS = frozenset(('mr', 'mrs', 'ms', 'miss', 'sir', 'dr', 'capt', 'lady', 'dame'))
+
+_DESCARGA = re.compile(r'\(\s*\d+\s*\)|\s+\d+$')
+_APOSTROFOS = re.compile(r"['’`´]")
+_PONTUACAO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar_nome(nome):
+    """
+    "O. Murphy (3)" -> "o murphy"; "Aidan O'Brien" -> "aidan obrien";
+    "Stoute, Sir Michael" -> "michael stoute"
+    """
+    if not isinstance(nome, str):
+        return ''
+    texto = unicodedata.normalize('NFKD', nome)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = _DESCARGA.sub(' ', texto)
+    # "Sobrenome, Nome"
+    if texto.count(',') == 1:
+        sobrenome, prenome = texto.split(',')
+        texto = f'{prenome} {sobrenome}'
+    texto = _APOSTROFOS.sub('', texto)
+    partes = _PONTUACAO.sub(' ', texto).split()
+    sem_titulo = [parte for parte in partes if parte not in TITULOS]
+    return ' '.join(sem_titulo or partes)
+
+
+def chaves_nome(normalizado):
+    """
+    Chaves de índice de um nome já normalizado: completo, inicial + sobrenome
+    e, com nome do meio, as iniciais + sobrenome ("a p obrien", "ap obrien")
+    """
+    partes = normalizado.split()
+    if not partes:
+        return set()
+    chaves = {normalizado}
+    if len(partes) >= 2:
+        sobrenome = partes[-1]
+        iniciais = [parte[0] for parte in partes[:-1]]
+        chaves.add(f'{iniciais[0]} {sobrenome}')
+        if len(iniciais) > 1:
+            chaves.add(f"{' '.join(iniciais)} {sobrenome}")
+            chaves.add(f"{''.join(iniciais)} {sobrenome}")
+    return chaves
+
+
+class Pessoa:
+    """
+    Jóquei ou treinador canônico do índice
+    """
+    __slots__ = ('id', 'tipo', 'nome', 'nivel', 'stats')
+
+    def __init__(self, tipo, dados):
+        self.id = dados['id']
+        self.tipo = tipo
+        self.nome = dados.get('nome', self.id)
+        self.nivel = dados.get('nivel')
+        stats = dados.get('stats')
+        self.stats = stats if isinstance(stats, dict) and stats else None
+
+    @property
+    def elite(self):
+        return self.nivel == NIVEL_ELITE
+
+    def __repr__(self):
+        return f'Pessoa({self.tipo}, {self.id!r}, nivel={self.nivel!r})'
+
+
+def montar_indice(config):
+    """
+    {tipo: {chave: Pessoa}} a partir do conteúdo do arquivo de pessoas
+    """
+    indices = {}
+    for tipo, secao in SECOES.items():
+        candidatos = {}
+        for dados in config.get(secao, []):
+            pessoa = Pessoa(tipo, dados)
+            chaves = chaves_nome(normalizar_nome(pessoa.nome))
+            for variante in dados.get('variantes', []):
+                chaves |= chaves_nome(normalizar_nome(variante))
+            for chave in chaves:
+                candidatos.setdefault(chave, {})[pessoa.id] = pessoa
+
+        indice = {}
+        for chave, pessoas in candidatos.items():
+            if len(pessoas) == 1:
+                indice[chave] = next(iter(pessoas.values()))
+            else:
+                logger.warning(f"Chave de {tipo} ambígua descartada: '{chave}' ({', '.join(pessoas)})")
+        indices[tipo] = indice
+    return indices
+
+
+class IndicePessoas(ArquivoRecarregavel):
+    """
+    Índice recarregável de jóqueis e treinadores
+    """
+    descricao = 'jóqueis/treinadores'
+
+    def __init__(self, caminho=CAMINHO_PESSOAS, intervalo_verificacao=INTERVALO_VERIFICACAO,
+                 maximo_memo=MAXIMO_MEMO):
+        super().__init__(caminho, intervalo_verificacao)
+        self.maximo_memo = maximo_memo
+        self.pessoas = {tipo: 0 for tipo in SECOES}
+        self._indices = {tipo: {} for tipo in SECOES}
+        self._memo = {}
+        self.carregar()
+
+    @property
+    def versao(self):
+        return self.versao_arquivo
+
+    def _montar(self, config):
+        return montar_indice(config)
+
+    def _aplicar(self, indices, config):
+        self._indices = indices
+        self.pessoas = {tipo: len(config.get(secao, [])) for tipo, secao in SECOES.items()}
+        logger.info(
+            f"Índice de pessoas carregado (versão {self.versao}): "
+            f"{self.pessoas[JOQUEI]} jóqueis, {self.pessoas[TREINADOR]} treinadores"
+        )
+
+    def normalizar(self, nome):
+        """
+        normalizar_nome com memória por string distinta
+        """
+        normalizado = self._memo.get(nome)
+        if normalizado is None:
+            normalizado = normalizar_nome(nome)
+            if len(self._memo) >= self.maximo_memo:
+                self._memo.clear()
+            self._memo[nome] = normalizado
+        return normalizado
+
+    def buscar(self, nome, tipo):
+        """
+        Pessoa do índice para o nome da página (ou None)
+        """
+        if not isinstance(nome, str) or not nome:
+            return None
+        return self._indices[tipo].get(self.normalizar(nome))
+
+    def elite(self, nome, tipo):
+        pessoa = self.buscar(nome, tipo)
+        return pessoa is not None and pessoa.elite
+
+    def estatisticas(self, stats, nome, tipo):
+        """
+        Estatísticas extraídas da página ou, sem elas, as do índice
+        """
+        if stats and isinstance(stats, dict):
+            return stats
+        pessoa = self.buscar(nome, tipo)
+        return pessoa.stats if pessoa is not None else None
+
+    def resumo(self):
+        return {
+            'versao': self.versao,
+            'caminho': self.caminho,
+            'joqueis': self.pessoas[JOQUEI],
+            'treinadores': self.pessoas[TREINADOR],
+            'chaves': {tipo: len(indice) for tipo, indice in self._indices.items()},
+        }
+
+
+INDICE_PESSOAS = IndicePessoas()
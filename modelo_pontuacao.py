@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelo de pontuação: pesos dos fatores e escadas de limites, num arquivo versionado
+
+O modelo fica em modelo_pontuacao.json (ou no arquivo de MODELO_PONTUACAO):
+nome, versão, os pesos dos 11 fatores da pontuação final, as escadas de
+pontos (odds, valor de aposta, peso, estatísticas de jóquei/treinador, bônus
+outsider) e os limites de value bet, dark horse e categorias. O
+modelo_pontuacao.json que acompanha o código é o modelo padrão: vale até o
+arquivo configurado ser lido, e também quando ele falta ou é inválido.
+
+Na carga o arquivo é validado e compilado num ModeloPontuacao imutável
+(pesos em tupla na ordem da soma, escadas em tuplas de limites/pontos).
+Cada análise pega MODELO_PONTUACAO.atual uma vez e usa esse objeto do
+começo ao fim; trocar o arquivo com o servidor no ar publica um modelo novo
+para as análises seguintes, sem afetar as que estão em andamento.
+
+Formato de uma escada (o primeiro degrau em que `valor <comparacao> limite`
+é verdadeiro dá os pontos; nenhum degrau: `padrao`):
+    {"comparacao": "<=", "degraus": [[2.0, 10], [3.0, 8]], "padrao": 1}
+"""
+
+import os
+import json
+import logging
+import operator
+
+from arquivo_recarregavel import ArquivoRecarregavel
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelo_pontuacao.json')
+CAMINHO_MODELO = os.environ.get('MODELO_PONTUACAO', CAMINHO_PADRAO)
+INTERVALO_VERIFICACAO = float(os.environ.get('MODELO_VERIFICACAO', 5))
+
+# Fatores da pontuação final, na ordem em que os termos são somados
+FATORES = (
+    'Rating', 'Forma', 'Peso', 'Jockey', 'Treinador', 'Idade_pts',
+    'Draw', 'Odds', 'Momentum', 'Contexto', 'Valor_Aposta',
+)
+ESCADAS = (
+    'odds', 'valor_aposta', 'peso_lbs', 'joquei_vitorias', 'joquei_experiencia',
+    'treinador_vitorias', 'treinador_experiencia', 'bonus_outsider',
+)
+LIMITES = (
+    'value_bet_score', 'value_bet_odds', 'dark_horse_score', 'dark_horse_odds',
+    'favorito_forte', 'bom_candidato', 'opcao_moderada',
+)
+COMPARACOES = {'<=': operator.le, '<': operator.lt, '>=': operator.ge, '>': operator.gt}
+
+
+class ErroModelo(ValueError):
+    """
+    Arquivo de modelo de pontuação inválido
+    """
+
+
+def _numero(valor, onde):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ErroModelo(f'{onde}: esperado um número, veio {valor!r}')
+    return valor
+
+
+class Escada:
+    """
+    Escada de limites -> pontos
+    """
+    __slots__ = ('comparacao', 'limites', 'pontos', 'padrao', '_comparar')
+
+    def __init__(self, nome, config):
+        self.comparacao = config.get('comparacao')
+        if self.comparacao not in COMPARACOES:
+            raise ErroModelo(f"escada '{nome}': comparação desconhecida {self.comparacao!r}")
+        degraus = config.get('degraus')
+        if not isinstance(degraus, list) or not degraus:
+            raise ErroModelo(f"escada '{nome}': sem degraus")
+        self.limites = tuple(_numero(degrau[0], f"escada '{nome}'") for degrau in degraus)
+        self.pontos = tuple(_numero(degrau[1], f"escada '{nome}'") for degrau in degraus)
+        self.padrao = _numero(config.get('padrao'), f"escada '{nome}' (padrao)")
+        self._comparar = COMPARACOES[self.comparacao]
+
+    def pontuar(self, valor):
+        comparar = self._comparar
+        for limite, pontos in zip(self.limites, self.pontos):
+            if comparar(valor, limite):
+                return pontos
+        return self.padrao
+
+    def para_dict(self):
+        return {
+            'comparacao': self.comparacao,
+            'degraus': [list(degrau) for degrau in zip(self.limites, self.pontos)],
+            'padrao': self.padrao,
+        }
+
+
+class ModeloPontuacao:
+    """
+    Modelo compilado e imutável: pesos na ordem de FATORES, escadas e limites
+    """
+    __slots__ = ('nome', 'versao', 'pesos', 'vetor_pesos', 'escadas', 'limites', 'origem')
+
+    def __init__(self, config, origem=CAMINHO_PADRAO):
+        if not isinstance(config, dict):
+            raise ErroModelo('o modelo deve ser um objeto JSON')
+        self.nome = str(config.get('nome', 'sem nome'))
+        self.versao = str(config.get('versao', 'sem versão'))
+        self.origem = origem
+
+        pesos = config.get('pesos', {})
+        faltando = [fator for fator in FATORES if fator not in pesos]
+        if faltando:
+            raise ErroModelo(f"pesos ausentes: {', '.join(faltando)}")
+        self.vetor_pesos = tuple(_numero(pesos[fator], f"peso '{fator}'") for fator in FATORES)
+        self.pesos = dict(zip(FATORES, self.vetor_pesos))
+
+        escadas = config.get('escadas', {})
+        faltando = [nome for nome in ESCADAS if nome not in escadas]
+        if faltando:
+            raise ErroModelo(f"escadas ausentes: {', '.join(faltando)}")
+        self.escadas = {nome: Escada(nome, escadas[nome]) for nome in ESCADAS}
+
+        limites = config.get('limites', {})
+        faltando = [nome for nome in LIMITES if nome not in limites]
+        if faltando:
+            raise ErroModelo(f"limites ausentes: {', '.join(faltando)}")
+        self.limites = {nome: _numero(limites[nome], f"limite '{nome}'") for nome in LIMITES}
+
+    def pontuacao(self, fatores):
+        """
+        Soma ponderada dos fatores (na ordem de FATORES). Laço explícito, termo
+        a termo da esquerda para a direita, como a soma escrita por extenso
+        (sum() de floats pode compensar arredondamentos e mudar o último bit)
+        """
+        total = 0.0
+        for valor, peso in zip(fatores, self.vetor_pesos):
+            total += valor * peso
+        return total
+
+    def resumo(self):
+        return {
+            'nome': self.nome,
+            'versao': self.versao,
+            'origem': self.origem,
+            'pesos': self.pesos,
+            'escadas': {nome: escada.para_dict() for nome, escada in self.escadas.items()},
+            'limites': self.limites,
+        }
+
+
+def modelo_padrao():
+    """
+    Modelo do modelo_pontuacao.json que acompanha o código
+    """
+    with open(CAMINHO_PADRAO, encoding='utf-8') as f:
+        return ModeloPontuacao(json.load(f))
+
+
+class GerenciadorModelo(ArquivoRecarregavel):
+    """
+    Modelo atual, trocado de uma vez quando o arquivo muda
+    """
+    descricao = 'modelo de pontuação'
+
+    def __init__(self, caminho=CAMINHO_MODELO, intervalo_verificacao=INTERVALO_VERIFICACAO):
+        super().__init__(caminho, intervalo_verificacao)
+        self.atual = modelo_padrao()
+        self.carregar()
+
+    @property
+    def chave(self):
+        """
+        Versão declarada + hash do conteúdo (para o cache de resultados)
+        """
+        return f'{self.atual.versao}+{self.versao_arquivo}'
+
+    def _montar(self, config):
+        return ModeloPontuacao(config, origem=self.caminho)
+
+    def _aplicar(self, modelo, config):
+        self.atual = modelo
+        logger.info(f"Modelo de pontuação carregado: {modelo.nome} {modelo.versao} ({self.versao_arquivo})")
+
+
+MODELO_PONTUACAO = GerenciadorModelo()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor vetorizado de pontuação (pandas/NumPy)
+
+Calcula os fatores de _analisar_cavalo_individual para um campo inteiro, ou
+para milhares de corridas de uma vez (backtests, lotes), em colunas: cada
+escada de limites do modelo de pontuação (modelo_pontuacao.py) vira um np.select, a forma vira uma matriz (corredores x
+últimas 5 posições) e os nomes de jóqueis/treinadores são avaliados uma vez
+por nome distinto. pontuacao_final, score_total, categoria_v2, is_value_bet e
+is_dark_horse saem idênticos bit a bit aos do cálculo por cavalo: as somas são
+feitas na mesma ordem e os arredondamentos seguem o round() do Python.
+
+Uso:
+    colunas = colunas_corredores([dados['cavalos'] for dados in corridas])
+    resultado = pontuar(colunas)
+
+Colunas de entrada de pontuar() (montadas por colunas_corredores, ou lidas
+direto de um histórico já tabulado):
+    corrida, posicao          corrida e ordem do cavalo nela (1, 2, ...)
+    nome, joquei, treinador   texto original
+    or_valor, tem_or          OR numérico (tem_or=False: sem OR)
+    or_inteiro                OR inteiro (NaN se não for inteiro)
+    rating_e_peso_informados  official_rating e peso diferentes de 'N/A'
+    pos1..pos5, corridas_forma  últimas 5 posições da forma tokenizada (forma.py;
+                              SEM_POSICAO completa formas curtas) e número de corridas
+    peso_lbs, peso_outro_formato  peso em libras (NaN se não for stones-libras) e
+                              se o peso é um texto informado em outro formato
+    idade_anos, draw_num      NaN quando ausentes
+    odds_decimal, odds_probabilidade  decimal e probabilidade implícita (odds.py; NaN sem preço)
+    odds_numericas            decimal ou ODDS_PADRAO
+    joquei_pct, joquei_corridas, tem_joquei_stats
+    treinador_pct, treinador_corridas, tem_treinador_stats
+    joquei_conhecido, treinador_conhecido, campos_faltando
+"""
+
+import numpy as np
+import pandas as pd
+
+from corredor import Corredor
+from indice_pessoas import INDICE_PESSOAS, JOQUEI, TREINADOR
+from forma import SEM_POSICAO, POSICAO_DEZ_OU_PIOR
+from modelo_pontuacao import MODELO_PONTUACAO, COMPARACOES
+from tabelas_pontuacao import (
+    PONTOS_POSICAO_FORMA, PESOS_POSICAO_FORMA,
+    CATEGORIA_VALUE_BET, CATEGORIA_DARK_HORSE, CATEGORIA_FAVORITO_FORTE,
+    CATEGORIA_BOM_CANDIDATO, CATEGORIA_OPCAO_MODERADA, CATEGORIA_RISCO_ALTO,
+)
+
+POSICOES_FORMA = ('pos1', 'pos2', 'pos3', 'pos4', 'pos5')
+
+# Pontos por posição indexados por posição + 1 (SEM_POSICAO=-1 ... POSICAO_DEZ_OU_PIOR)
+_PONTOS_FORMA = np.zeros(POSICAO_DEZ_OU_PIOR + 2)
+for _posicao, _pontos in PONTOS_POSICAO_FORMA.items():
+    _PONTOS_FORMA[_posicao + 1] = _pontos
+
+
+def _estatisticas(stats, chave_corridas):
+    if stats and isinstance(stats, dict):
+        return float(stats.get('win_percentage', 0)), float(stats.get(chave_corridas, 0)), True
+    return np.nan, np.nan, False
+
+
+def colunas_corredores(corridas):
+    """
+    Colunas de entrada de pontuar() a partir dos cavalos de cada corrida
+    (dicionários de extração ou Corredor), com a mesma remoção de nomes
+    vazios/duplicados e a mesma posição de analisar_cavalos
+    """
+    linhas = []
+    for indice_corrida, cavalos in enumerate(corridas):
+        nomes_vistos = set()
+        posicao = 0
+        for cavalo in map(Corredor.de, cavalos):
+            nome = cavalo.nome.strip()
+            if not nome or nome in nomes_vistos:
+                continue
+            nomes_vistos.add(nome)
+            posicao += 1
+
+            posicoes = cavalo.posicoes
+            ultimas = tuple(posicoes[:5]) + (SEM_POSICAO,) * (5 - min(len(posicoes), 5))
+            peso = cavalo.peso
+            joquei_pct, joquei_corridas, tem_joquei_stats = _estatisticas(
+                INDICE_PESSOAS.estatisticas(cavalo.joquei_stats, cavalo.joquei, JOQUEI), 'rides')
+            treinador_pct, treinador_corridas, tem_treinador_stats = _estatisticas(
+                INDICE_PESSOAS.estatisticas(cavalo.treinador_stats, cavalo.treinador, TREINADOR), 'runs')
+            if cavalo.draw is None:
+                draw_num = posicao  # Sem draw: a análise usa a posição
+            else:
+                draw_num = np.nan if cavalo.draw_num is None else cavalo.draw_num
+
+            linhas.append((
+                indice_corrida, posicao, cavalo.nome, cavalo.joquei, cavalo.treinador,
+                np.nan if cavalo.or_valor is None else cavalo.or_valor, cavalo.or_valor is not None,
+                np.nan if cavalo.or_inteiro is None else cavalo.or_inteiro,
+                cavalo.official_rating != 'N/A' and peso != 'N/A',
+                *ultimas, len(posicoes),
+                np.nan if cavalo.peso_lbs is None else cavalo.peso_lbs,
+                bool(peso) and peso != 'N/A' and isinstance(peso, str) and '-' not in peso,
+                np.nan if cavalo.idade_anos is None else cavalo.idade_anos,
+                draw_num,
+                np.nan if cavalo.odds_decimal is None else cavalo.odds_decimal,
+                np.nan if cavalo.odds_probabilidade is None else cavalo.odds_probabilidade,
+                cavalo.odds_numericas,
+                joquei_pct, joquei_corridas, tem_joquei_stats,
+                treinador_pct, treinador_corridas, tem_treinador_stats,
+                cavalo.joquei_conhecido, cavalo.treinador_conhecido, cavalo.campos_faltando,
+            ))
+
+    return pd.DataFrame.from_records(linhas, columns=[
+        'corrida', 'posicao', 'nome', 'joquei', 'treinador',
+        'or_valor', 'tem_or', 'or_inteiro', 'rating_e_peso_informados',
+        *POSICOES_FORMA, 'corridas_forma',
+        'peso_lbs', 'peso_outro_formato', 'idade_anos', 'draw_num',
+        'odds_decimal', 'odds_probabilidade', 'odds_numericas',
+        'joquei_pct', 'joquei_corridas', 'tem_joquei_stats',
+        'treinador_pct', 'treinador_corridas', 'tem_treinador_stats',
+        'joquei_conhecido', 'treinador_conhecido', 'campos_faltando',
+    ])
+
+
+def arredondar(valores, casas):
+    """
+    round(valor, casas) do Python sobre um array: decimal exato, empate para par
+    """
+    escala = 10.0 ** casas
+    escalados = valores * escala
+    resultado = np.round(escalados) / escala
+    # O produto em ponto flutuante só pode cair do lado errado do empate perto de x.5
+    fracao = escalados - np.floor(escalados)
+    duvidosos = np.abs(fracao - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(escalados))
+    for i in np.flatnonzero(duvidosos):
+        resultado[i] = round(float(valores[i]), casas)
+    return resultado
+
+
+def _base_por_nome(nomes, avaliar):
+    """
+    Aplica avaliar(nome) -> (base, tem_nome) uma vez por nome distinto
+    """
+    codigos, distintos = pd.factorize(nomes, use_na_sentinel=False)
+    bases, com_nome = zip(*map(avaliar, distintos)) if len(distintos) else ((), ())
+    return np.asarray(bases, dtype=float)[codigos], np.asarray(com_nome, dtype=bool)[codigos]
+
+
+def _avaliar_joquei(nome):
+    if not nome:
+        return 5, False
+    if INDICE_PESSOAS.elite(nome, JOQUEI):
+        return 8, True
+    if len(nome) > 5 and any(c.isupper() for c in nome):
+        return 6, True
+    return 5, True
+
+
+def _avaliar_treinador(nome):
+    if not nome or nome == 'Desconhecido':
+        return 5, False
+    if INDICE_PESSOAS.elite(nome, TREINADOR):
+        return 7, True
+    if len(nome) > 5:
+        return 6, True
+    return 5, True
+
+
+def _escada(valores, escada):
+    """
+    Escada.pontuar (modelo_pontuacao.py) sobre um array
+    """
+    comparar = COMPARACOES[escada.comparacao]
+    return np.select([comparar(valores, limite) for limite in escada.limites], escada.pontos, escada.padrao)
+
+
+def _com_estatisticas(base, com_nome, tem_stats, pct, corridas, escada_pct, escada_corridas):
+    bonus = _escada(pct, escada_pct)
+    experiencia = _escada(corridas, escada_corridas)
+    ajustado = np.clip(base + bonus + experiencia, 0, 10)
+    return np.where(com_nome & tem_stats, ajustado, base)
+
+
+def pontuar(colunas, modelo=None):
+    """
+    Pontua todos os corredores de `colunas` (DataFrame de colunas_corredores)
+    com `modelo` (ModeloPontuacao; padrão: o atual). Retorna um DataFrame
+    com o mesmo índice: os fatores, pontuacao_final, score_total,
+    categoria_v2, is_value_bet e is_dark_horse
+    """
+    if modelo is None:
+        modelo = MODELO_PONTUACAO.atual
+    escadas = modelo.escadas
+    limites = modelo.limites
+
+    def coluna(nome, tipo=float):
+        return colunas[nome].to_numpy(dtype=tipo)
+
+    posicao = coluna('posicao')
+    posicoes = colunas[list(POSICOES_FORMA)].to_numpy(dtype=np.int64)
+    corridas_forma = coluna('corridas_forma')
+    odds_numericas = coluna('odds_numericas')
+    odds_decimal = coluna('odds_decimal')
+    odds_probabilidade = coluna('odds_probabilidade')
+    com_odds = ~np.isnan(odds_decimal)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        # Rating (OR normalizado para 0-10)
+        rating_score = np.where(coluna('tem_or', bool), np.clip((coluna('or_valor') / 50) * 10, 0, 10), 5)
+
+        # Forma: últimas 5 posições com pesos decrescentes, somadas na ordem
+        pontos = _PONTOS_FORMA[np.minimum(posicoes, POSICAO_DEZ_OU_PIOR) + 1]
+        soma_forma = np.zeros(len(colunas))
+        for j, peso_posicao in enumerate(PESOS_POSICAO_FORMA):
+            soma_forma = soma_forma + pontos[:, j] * peso_posicao
+        forma_score = np.where(corridas_forma >= 3, np.minimum(soma_forma, 10), 5)
+
+        # Peso
+        peso_lbs = coluna('peso_lbs')
+        peso_score = np.where(
+            np.isnan(peso_lbs),
+            np.where(coluna('peso_outro_formato', bool), 10, 5),
+            _escada(peso_lbs, escadas['peso_lbs']),
+        )
+
+        # Jóquei e treinador: nome avaliado uma vez por nome distinto + estatísticas
+        base, com_nome = _base_por_nome(colunas['joquei'], _avaliar_joquei)
+        joquei_score = _com_estatisticas(
+            base, com_nome, coluna('tem_joquei_stats', bool), coluna('joquei_pct'), coluna('joquei_corridas'),
+            escadas['joquei_vitorias'], escadas['joquei_experiencia'],
+        )
+        base, com_nome = _base_por_nome(colunas['treinador'], _avaliar_treinador)
+        treinador_score = _com_estatisticas(
+            base, com_nome, coluna('tem_treinador_stats', bool), coluna('treinador_pct'), coluna('treinador_corridas'),
+            escadas['treinador_vitorias'], escadas['treinador_experiencia'],
+        )
+
+        idade = coluna('idade_anos')
+        idade_pts = np.select([(idade >= 4) & (idade <= 6), (idade == 3) | (idade == 7)], [10, 6], 5)
+
+        draw = coluna('draw_num')
+        draw_score = np.select([(draw >= 3) & (draw <= 8), (draw <= 2) | (draw >= 12)], [8, 6], 7)
+
+        # Value bets, dark horses e bônus outsider (antes do ajuste por dados faltando)
+        is_value_bet = (
+            (rating_score + forma_score >= limites['value_bet_score']) & (odds_numericas >= limites['value_bet_odds'])
+        )
+        is_dark_horse = (
+            ((joquei_score >= limites['dark_horse_score']) | (forma_score >= limites['dark_horse_score']))
+            & (odds_numericas >= limites['dark_horse_odds'])
+        )
+        bonus_outsider = _escada(odds_numericas, escadas['bonus_outsider'])
+
+        # Momentum qualitativo (últimas 3 corridas)
+        p1, p2, p3 = posicoes[:, 0], posicoes[:, 1], posicoes[:, 2]
+        tres_corridas = corridas_forma >= 3
+        sem_letras = tres_corridas & (p1 != SEM_POSICAO) & (p2 != SEM_POSICAO) & (p3 != SEM_POSICAO)
+        tendencia = np.select([(p1 < p2) & (p2 < p3), p1 < p2, (p1 > p2) & (p2 > p3)], [3, 2, -2], 0)
+        vitorias = (p1 == 1).astype(int) + (p2 == 1) + (p3 == 1)
+        placings = np.isin(posicoes[:, :3], (1, 2, 3)).sum(axis=1)
+        momentum_score = np.clip(
+            5 + np.where(sem_letras, tendencia, 0)
+            + np.where(tres_corridas, np.select([vitorias >= 2, vitorias == 1], [3, 1], 0), 0)
+            + (tres_corridas & (placings >= 2)),
+            0, 10,
+        )
+
+        # Contexto da corrida
+        or_inteiro = coluna('or_inteiro')
+        contexto_score = np.clip(
+            5 + (coluna('rating_e_peso_informados', bool) & (or_inteiro < 70)) * 1
+            + np.isin(posicoes[:, :2], (1, 2)).any(axis=1) * 2
+            + coluna('joquei_conhecido', bool) * 0.5
+            + coluna('treinador_conhecido', bool) * 0.5,
+            0, 10,
+        )
+
+        # Valor de aposta: nossa probabilidade x probabilidade implícita nas odds
+        diferenca = (rating_score / 10) * 100 - odds_probabilidade * 100
+        valor_aposta_score = np.where(com_odds, _escada(diferenca, escadas['valor_aposta']), 5)
+
+        odds_score = np.where(com_odds, _escada(odds_decimal, escadas['odds']), 5)
+
+        # Muitos dados faltando: score baseado na posição
+        faltando = coluna('campos_faltando') >= 3
+        score_posicao = np.maximum(5, 10 - (posicao * 0.5))
+        rating_final = np.where(faltando, score_posicao, rating_score)
+        joquei_final = np.where(faltando, score_posicao, joquei_score)
+        forma_final = np.where(faltando, score_posicao, forma_score)
+
+        # Soma ponderada termo a termo, na ordem de FATORES (como ModeloPontuacao.pontuacao)
+        fatores = (
+            rating_final, forma_final, peso_score, joquei_final, treinador_score, idade_pts,
+            draw_score, odds_score, momentum_score, contexto_score, valor_aposta_score,
+        )
+        pontuacao_final = np.zeros(len(colunas))
+        for valor, peso in zip(fatores, modelo.vetor_pesos):
+            pontuacao_final = pontuacao_final + valor * peso
+        score_total = arredondar(pontuacao_final * bonus_outsider * 10, 1)
+
+    categoria_v2 = np.select(
+        [is_value_bet, is_dark_horse, score_total >= limites['favorito_forte'],
+         score_total >= limites['bom_candidato'], score_total >= limites['opcao_moderada']],
+        [CATEGORIA_VALUE_BET, CATEGORIA_DARK_HORSE, CATEGORIA_FAVORITO_FORTE,
+         CATEGORIA_BOM_CANDIDATO, CATEGORIA_OPCAO_MODERADA],
+        CATEGORIA_RISCO_ALTO,
+    )
+
+    return pd.DataFrame({
+        'rating_score': rating_final,
+        'forma_score': forma_final,
+        'peso_score': peso_score,
+        'joquei_score': joquei_final,
+        'treinador_score': treinador_score,
+        'idade_pts': idade_pts,
+        'draw_score': draw_score,
+        'odds_score': odds_score,
+        'momentum_score': momentum_score,
+        'contexto_score': contexto_score,
+        'valor_aposta_score': valor_aposta_score,
+        'bonus_outsider': bonus_outsider,
+        'odds_numericas': odds_numericas,
+        'pontuacao_final': arredondar(pontuacao_final, 2),
+        'score_total': score_total,
+        'categoria_v2': categoria_v2,
+        'is_value_bet': is_value_bet,
+        'is_dark_horse': is_dark_horse,
+    }, index=colunas.index)
+
+
+def pontuar_corridas(corridas, modelo=None):
+    """
+    Atalho: colunas de entrada + pontuação, com corrida/posicao/nome na frente
+    """
+    colunas = colunas_corredores(corridas)
+    return pd.concat([colunas[['corrida', 'posicao', 'nome']], pontuar(colunas, modelo)], axis=1)
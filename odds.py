@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversão de odds para decimal e probabilidade implícita
+
+Um único ponto de entrada para todos os fatores de pontuação. Os preços da
+escada fracionária britânica (1/5 ... 1000/1, incluindo 100/30, 85/40 e
+Evens) vêm de uma tabela montada na importação; fora dela, frações
+("7/3", "7-3") são convertidas com aritmética exata (fractions.Fraction),
+números e strings decimais ("3.5", 4) viram float, e o que não é preço
+(SP, N/A, NR...) vira None.
+
+Marcas de favorito coladas ao preço ("5/2F", "11/4 JF", "EvsCF") e
+'$'/',' de alguns sites são ignorados.
+"""
+
+import math
+import re
+from fractions import Fraction
+
+# Usado por value bet, dark horse e bônus outsider quando não há preço
+ODDS_PADRAO = 5.0
+
+ESCADA_FRACIONARIA = (
+    '1/100', '1/50', '1/33', '1/25', '1/20', '1/16', '1/14', '1/12', '1/11', '1/10',
+    '1/9', '1/8', '2/15', '1/7', '2/13', '1/6', '2/11', '1/5', '2/9', '1/4',
+    '2/7', '3/10', '1/3', '4/11', '2/5', '4/9', '1/2', '8/15', '4/7', '8/13',
+    '4/6', '8/11', '4/5', '5/6', '10/11', '1/1', '11/10', '6/5', '5/4', '11/8',
+    '6/4', '13/8', '7/4', '15/8', '2/1', '85/40', '9/4', '5/2', '11/4', '3/1',
+    '10/3', '100/30', '7/2', '4/1', '9/2', '5/1', '11/2', '6/1', '13/2', '7/1',
+    '15/2', '8/1', '17/2', '9/1', '10/1', '11/1', '12/1', '14/1', '16/1', '18/1',
+    '20/1', '22/1', '25/1', '28/1', '33/1', '40/1', '50/1', '66/1', '80/1', '100/1',
+    '125/1', '150/1', '200/1', '250/1', '300/1', '400/1', '500/1', '1000/1',
+)
+EVENS = ('EVS', 'EVENS', 'EVEN', 'EVEN MONEY')
+SEM_PRECO = ('', 'N/A', 'NA', 'SP', 'NR', 'NON RUNNER', 'TBA', 'TBC', '-', '--')
+
+_FRACAO = re.compile(r'^(\d+)\s*[/-]\s*(\d+)$')
+_MARCA_FAVORITO = re.compile(r'\s*(?:J|C)?F$')
+
+
+def _de_fracao(numerador, denominador):
+    """
+    (decimal, probabilidade) exatos de uma fração numerador/denominador
+    """
+    fracao = Fraction(numerador, denominador)
+    return float(fracao + 1), float(1 / (fracao + 1))
+
+
+def _montar_tabela():
+    tabela = {}
+    for texto in ESCADA_FRACIONARIA:
+        numerador, denominador = map(int, texto.split('/'))
+        precos = _de_fracao(numerador, denominador)
+        tabela[texto] = precos
+        tabela[f'{numerador}-{denominador}'] = precos
+    for texto in EVENS:
+        tabela[texto] = tabela['1/1']
+    for texto in SEM_PRECO:
+        tabela[texto] = None
+    return tabela
+
+
+TABELA_ODDS = _montar_tabela()
+
+
+def _normalizar(texto):
+    texto = texto.strip().upper().replace('$', '').replace(',', '')
+    if texto and texto[-1] == 'F' and texto not in TABELA_ODDS:
+        texto = _MARCA_FAVORITO.sub('', texto)
+    return texto
+
+
+def converter_odds(odds):
+    """
+    Odds em qualquer formato -> (decimal, probabilidade implícita), ou None
+    se não há preço. Só valem preços finitos maiores que 1.0.
+    """
+    if isinstance(odds, str):
+        # Caminho rápido: preço da escada exatamente como veio
+        if odds in TABELA_ODDS:
+            return TABELA_ODDS[odds]
+        texto = _normalizar(odds)
+        if texto in TABELA_ODDS:
+            return TABELA_ODDS[texto]
+        casamento = _FRACAO.match(texto)
+        if casamento:
+            numerador, denominador = int(casamento.group(1)), int(casamento.group(2))
+            return _de_fracao(numerador, denominador) if numerador and denominador else None
+        try:
+            decimal = float(texto)
+        except ValueError:
+            return None
+    elif isinstance(odds, (int, float)) and not isinstance(odds, bool):
+        decimal = float(odds)
+    else:
+        return None
+
+    if not math.isfinite(decimal) or decimal <= 1.0:
+        return None
+    return decimal, 1 / decimal
+
+
+def odds_decimais(odds):
+    """
+    Decimal das odds ("5/2" -> 3.5, "Evens" -> 2.0), ou None sem preço
+    """
+    precos = converter_odds(odds)
+    return precos[0] if precos else None
+
+
+def probabilidade_implicita(odds):
+    """
+    Probabilidade implícita nas odds ("5/2" -> 0.2857...), ou None sem preço
+    """
+    precos = converter_odds(odds)
+    return precos[1] if precos else None
+
+
+def odds_numericas(odds):
+    """
+    Decimal das odds, ou ODDS_PADRAO quando não há preço
+    """
+    precos = converter_odds(odds)
+    return precos[0] if precos else ODDS_PADRAO
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parse incremental (streaming) das páginas de corrida com o lxml
+
+As páginas do Racing Post, Timeform etc. trazem rodapés enormes, scripts de
+anúncios e JSON embutido depois da tabela de corredores. Aqui o HTML é
+alimentado em pedaços (iter_content / aiohttp) num HTMLPullParser; cada
+container de corredor é convertido em registro assim que fecha, e a leitura
+para quando o elemento que agrupa os corredores termina.
+"""
+
+import logging
+
+from lxml import etree
+
+from extracao_declarativa import texto_elemento
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_PARTE = 16 * 1024
+
+
+class ParserIncremental:
+    """
+    Alimentado em pedaços; emite um registro por container de corredor fechado
+    e sinaliza o fim do bloco de corredores
+    """
+    def __init__(self, e_container, converter, encoding=None):
+        self.e_container = e_container  # e_container(elemento) -> bool
+        self.converter = converter      # converter(elemento lxml, indice) -> dict ou None
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        self._resto = b''
+
+        self.registros = []
+        self.bytes_lidos = 0
+        self.terminou = False   # bloco de corredores completo: pode parar de ler
+        self._container_atual = None
+        self._pai_corredores = None
+        self._h1 = None
+        self._title = None
+
+    @property
+    def titulo(self):
+        # Como soup.find('h1') or soup.find('title'): o primeiro h1 vale mesmo vazio
+        return self._h1 if self._h1 is not None else self._title
+
+    def alimentar(self, parte):
+        """
+        Processa mais um pedaço do HTML. Retorna True quando já pode parar de ler.
+        """
+        if self.terminou:
+            return True
+        self.bytes_lidos += len(parte)
+
+        # O push parser de HTML do libxml2 pode travar (parar de emitir eventos até o
+        # close) quando um pedaço termina no meio de uma tag; só alimentar até o último '>'
+        dados = self._resto + parte
+        corte = dados.rfind(b'>') + 1
+        self._resto = dados[corte:]
+        if corte:
+            self._feed(dados[:corte])
+        return self.terminou
+
+    def alimentar_tudo(self, conteudo, tamanho_parte=TAMANHO_PARTE):
+        """
+        Alimenta um conteúdo já em memória (cache), parando no fim do bloco
+        """
+        for inicio in range(0, len(conteudo), tamanho_parte):
+            if self.alimentar(conteudo[inicio:inicio + tamanho_parte]):
+                break
+        self.fechar()
+
+    def fechar(self):
+        """
+        Fim do documento (ou da leitura): processa o que restou no buffer
+        """
+        if self.terminou:
+            return
+        if self._resto:
+            self._feed(self._resto)
+            self._resto = b''
+            if self.terminou:
+                return
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self._processar_eventos()
+
+    def _feed(self, dados):
+        try:
+            self._parser.feed(dados)
+        except etree.XMLSyntaxError as e:
+            logger.debug(f"Parse incremental: {e}")
+        self._processar_eventos()
+
+    def _processar_eventos(self):
+        for evento, elemento in self._parser.read_events():
+            if self.terminou:
+                continue  # apenas esvaziar a fila de eventos
+
+            if evento == 'start':
+                # Só o container mais externo conta (classes parecidas aparecem nos filhos)
+                if self._container_atual is None and self.e_container(elemento):
+                    self._container_atual = elemento
+                    if self._pai_corredores is None:
+                        self._pai_corredores = elemento.getparent()
+                continue
+
+            tag = elemento.tag
+            if elemento is self._container_atual:
+                self._container_atual = None
+                try:
+                    registro = self.converter(elemento, len(self.registros))
+                except Exception as e:
+                    logger.debug(f"Erro ao converter container: {e}")
+                    registro = None
+                if registro:
+                    self.registros.append(registro)
+                # O container já virou registro: liberar a subárvore
+                elemento.clear(keep_tail=True)
+            elif elemento is self._pai_corredores:
+                self.terminou = True
+            elif tag == 'h1' and self._h1 is None:
+                self._h1 = texto_elemento(elemento)
+            elif tag == 'title' and self._title is None:
+                self._title = texto_elemento(elemento)
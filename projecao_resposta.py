@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo compacto e projeção de campos das respostas de /analisar
+
+Cada análise de cavalo tem uns 50 campos, parte deles repetidos para
+compatibilidade (score_joquei = joquei_score * 10, analise_hibrida repete os
+fatores). O cliente escolhe o que quer receber:
+
+    modo=compacto          tudo menos os campos de compatibilidade
+    campos=nome,score_total,categoria_v2
+                           só esses campos de cada cavalo (na ordem pedida)
+
+Os dois valem na query string ou no corpo JSON ("campos" como lista ou texto
+separado por vírgulas). O resultado completo continua no cache; a projeção
+monta só os dicionários enviados, antes da serialização.
+"""
+
+MODO_COMPLETO = 'completo'
+MODO_COMPACTO = 'compacto'
+MODOS = (MODO_COMPLETO, MODO_COMPACTO)
+
+# Repetições de outros campos, mantidas para clientes antigos
+CAMPOS_COMPATIBILIDADE = frozenset((
+    'score_odds', 'score_joquei', 'score_forma', 'score_peso', 'score_idade',
+    'analise_hibrida', 'algoritmo_versao',
+))
+
+
+class ErroProjecao(ValueError):
+    """
+    Parâmetros de projeção inválidos
+    """
+
+
+def opcoes_projecao(corpo, args):
+    """
+    (modo, campos) da requisição: corpo JSON primeiro, depois a query string.
+    campos é uma tupla de nomes ou None (todos os campos do modo)
+    """
+    corpo = corpo or {}
+    modo = corpo.get('modo') or args.get('modo') or MODO_COMPLETO
+    if modo not in MODOS:
+        raise ErroProjecao(f"Modo desconhecido: {modo} (use {' ou '.join(MODOS)})")
+
+    campos = corpo.get('campos')
+    if campos is None:
+        campos = args.get('campos')
+    if campos is None or campos == '':
+        return modo, None
+    if isinstance(campos, str):
+        campos = campos.split(',')
+    if not isinstance(campos, list) or not all(isinstance(campo, str) for campo in campos):
+        raise ErroProjecao('campos deve ser uma lista de nomes ou um texto separado por vírgulas')
+    campos = tuple(dict.fromkeys(campo.strip() for campo in campos if campo.strip()))
+    return modo, campos or None
+
+
+def projetar_analise(analise, modo=MODO_COMPLETO, campos=None):
+    """
+    Dicionário com os campos pedidos de uma análise de cavalo
+    """
+    if campos is not None:
+        return {campo: analise[campo] for campo in campos if campo in analise}
+    if modo == MODO_COMPACTO:
+        return {campo: valor for campo, valor in analise.items() if campo not in CAMPOS_COMPATIBILIDADE}
+    return analise
+
+
+def projetar_resultado(resultado, modo=MODO_COMPLETO, campos=None):
+    """
+    Resultado de analisar_cavalos com as análises projetadas (o original,
+    que pode estar no cache, não é alterado)
+    """
+    if (modo == MODO_COMPLETO and campos is None) or 'dados' not in resultado:
+        return resultado
+    dados = resultado['dados']
+    return {
+        **resultado,
+        'dados': {
+            **dados,
+            'analises': [projetar_analise(analise, modo, campos) for analise in dados.get('analises', [])],
+        },
+    }
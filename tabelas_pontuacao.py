@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tabelas do algoritmo de pontuação V2.0
+
+Compartilhadas pelo cálculo por cavalo (ExtractorCavalos em app.py) e pelo
+motor vetorizado (motor_vetorizado.py), para que os dois não divirjam. Pesos
+e escadas dos fatores vêm do modelo de pontuação (modelo_pontuacao.py).
+"""
+
+# Forma: pontos por posição (1º=10 ... 5º=2) e peso de cada uma das últimas 5 corridas
+PONTOS_POSICAO_FORMA = {1: 10, 2: 8, 3: 6, 4: 4, 5: 2}
+PESOS_POSICAO_FORMA = (1.0, 0.7, 0.5, 0.3, 0.2)
+# Momentum: pontos por posição nas últimas 3 corridas (5º ou pior = 1)
+PONTOS_MOMENTUM = {1: 10, 2: 7, 3: 5, 4: 3}
+
+# Categorias V2.0 (classificação baseada em Southwell)
+CATEGORIA_VALUE_BET = "🎯 VALUE BET"
+CATEGORIA_DARK_HORSE = "🌟 DARK HORSE"
+CATEGORIA_FAVORITO_FORTE = "🏆 FAVORITO FORTE"
+CATEGORIA_BOM_CANDIDATO = "⭐ BOM CANDIDATO"
+CATEGORIA_OPCAO_MODERADA = "📊 OPÇÃO MODERADA"
+CATEGORIA_RISCO_ALTO = "⚠️ RISCO ALTO"
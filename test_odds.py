@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conferência de odds.py sobre a escada fracionária inteira e as variações de
+escrita dos sites (python -m pytest test_odds.py)
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from odds import (
+    ESCADA_FRACIONARIA, EVENS, ODDS_PADRAO, SEM_PRECO,
+    converter_odds, odds_decimais, odds_numericas, probabilidade_implicita,
+)
+
+
+def _esperado(fracao):
+    decimal = fracao + 1
+    return float(decimal), float(1 / decimal)
+
+
+def _variantes(texto):
+    numerador, denominador = texto.split('/')
+    return (texto, f'{numerador}-{denominador}', f' {texto} ', f'{texto}F', f'{texto} JF', f'{texto}cf',
+            f'{numerador} / {denominador}')
+
+
+@pytest.mark.parametrize('texto', ESCADA_FRACIONARIA)
+def test_escada_fracionaria(texto):
+    esperado = _esperado(Fraction(texto))
+    for variante in _variantes(texto):
+        assert converter_odds(variante) == esperado, variante
+
+
+def test_escada_em_ordem():
+    decimais = [converter_odds(texto)[0] for texto in ESCADA_FRACIONARIA]
+    assert decimais == sorted(decimais)
+
+
+@pytest.mark.parametrize('texto', EVENS + ('Evens', 'evs', 'EvsF', '1/1'))
+def test_evens(texto):
+    assert converter_odds(texto) == (2.0, 0.5)
+
+
+@pytest.mark.parametrize('texto', SEM_PRECO + (
+    'sp', 'N/A', None, True, '5/0', '0/1', 'nan', 'inf', '1.0', '0.5', 'abc', '1/2/3',
+))
+def test_sem_preco(texto):
+    assert converter_odds(texto) is None
+    assert odds_decimais(texto) is None
+    assert probabilidade_implicita(texto) is None
+    assert odds_numericas(texto) == ODDS_PADRAO
+
+
+@pytest.mark.parametrize('texto, decimal', (
+    ('3.5', 3.5), (3.5, 3.5), (7, 7.0), ('$5', 5.0), ('1,000', 1000.0), ('7/3', float(Fraction(10, 3))),
+))
+def test_decimais_e_fracoes_fora_da_escada(texto, decimal):
+    assert converter_odds(texto) == (decimal, 1 / decimal)
+    assert odds_numericas(texto) == decimal